@@ -0,0 +1,212 @@
+# Load test for the exam hot path: every student starts an attempt, saves answers one at a
+# time, then submits. Students are seeded straight into the DB so the run measures the exam
+# endpoints rather than registration/argon2.
+#
+#   PYTHONPATH=src python benchmarks/exam_hot_path.py --base-url http://localhost:8000 \
+#       --students 5000 --questions 10
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+from sqlalchemy import insert, select
+
+from zenith_api.auth.security import create_access_token, hash_password
+from zenith_api.db.models import (
+    Batch,
+    BatchMember,
+    Membership,
+    Organization,
+    Question,
+    QuestionOption,
+    Role,
+    Test,
+    User,
+)
+from zenith_api.db.session import SessionLocal
+
+
+@dataclass
+class Exam:
+    org_id: uuid.UUID
+    test_id: uuid.UUID
+    questions: list[tuple[uuid.UUID, list[uuid.UUID]]]
+    tokens: list[str]
+
+
+@dataclass
+class Results:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+def seed(students: int, questions: int) -> Exam:
+    tag = uuid.uuid4().hex[:8]
+    password = hash_password("Password123!")
+    with SessionLocal() as db:
+        student_role = db.scalar(select(Role.id).where(Role.code == "student"))
+        assert student_role is not None, "run migrations first"
+
+        org = Organization(name=f"bench-{tag}")
+        db.add(org)
+        db.flush()
+        batch = Batch(organization_id=org.id, name="bench")
+        db.add(batch)
+        db.flush()
+        test = Test(organization_id=org.id, batch_id=batch.id, title=f"bench-{tag}")
+        db.add(test)
+        db.flush()
+
+        qs: list[tuple[uuid.UUID, list[uuid.UUID]]] = []
+        for pos in range(1, questions + 1):
+            q = Question(test_id=test.id, prompt=f"Q{pos}", position=pos)
+            db.add(q)
+            db.flush()
+            opts = [
+                QuestionOption(question_id=q.id, text=t, position=i, is_correct=i == 1)
+                for i, t in enumerate("ABCD", start=1)
+            ]
+            db.add_all(opts)
+            db.flush()
+            qs.append((q.id, [o.id for o in opts]))
+
+        user_ids = [uuid.uuid4() for _ in range(students)]
+        db.execute(
+            insert(User),
+            [
+                {"id": uid, "email": f"bench-{tag}-{i}@example.com", "hashed_password": password}
+                for i, uid in enumerate(user_ids)
+            ],
+        )
+        db.execute(
+            insert(Membership),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "organization_id": org.id,
+                    "user_id": uid,
+                    "role_id": student_role,
+                }
+                for uid in user_ids
+            ],
+        )
+        db.execute(
+            insert(BatchMember),
+            [{"id": uuid.uuid4(), "batch_id": batch.id, "user_id": uid} for uid in user_ids],
+        )
+        db.commit()
+        org_id, test_id = org.id, test.id
+
+    tokens = [create_access_token(user_id=str(uid), expires_minutes=120) for uid in user_ids]
+    return Exam(org_id=org_id, test_id=test_id, questions=qs, tokens=tokens)
+
+
+async def _timed(
+    results: Results, name: str, client: httpx.AsyncClient, method: str, url: str, **kw: object
+) -> httpx.Response | None:
+    started = time.perf_counter()
+    try:
+        r = await client.request(method, url, **kw)  # type: ignore[arg-type]
+    except httpx.HTTPError:
+        results.errors[name] += 1
+        return None
+    results.latencies[name].append(time.perf_counter() - started)
+    if r.status_code != 200:
+        results.errors[name] += 1
+        return None
+    return r
+
+
+async def student(client: httpx.AsyncClient, exam: Exam, idx: int, results: Results) -> None:
+    h = {"Authorization": f"Bearer {exam.tokens[idx]}"}
+    r = await _timed(
+        results,
+        "start",
+        client,
+        "POST",
+        f"/orgs/{exam.org_id}/tests/{exam.test_id}/attempts/start",
+        headers=h,
+    )
+    if r is None:
+        return
+    attempt_id = r.json()["attempt_id"]
+
+    for seq, (question_id, options) in enumerate(exam.questions):
+        await _timed(
+            results,
+            "answer",
+            client,
+            "PUT",
+            f"/orgs/{exam.org_id}/attempts/{attempt_id}/answers/{question_id}",
+            json={"selected_option_id": str(options[(idx + seq) % len(options)])},
+            headers=h,
+        )
+
+    await _timed(
+        results,
+        "submit",
+        client,
+        "POST",
+        f"/orgs/{exam.org_id}/attempts/{attempt_id}/submit",
+        headers=h,
+    )
+
+
+def _pct(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+
+async def run(base_url: str, exam: Exam, concurrency: int) -> None:
+    results = Results()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(i: int) -> None:
+            async with sem:
+                await student(client, exam, i, results)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(len(exam.tokens))))
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(v) for v in results.latencies.values())
+    print(f"students={len(exam.tokens)} concurrency={concurrency} elapsed={elapsed:.1f}s")
+    print(f"requests={total} rps={total / elapsed:.0f}")
+    for name in ("start", "answer", "submit"):
+        lat = results.latencies[name]
+        if not lat:
+            continue
+        print(
+            f"  {name:<7} n={len(lat):<6} p50={statistics.median(lat) * 1000:7.1f}ms "
+            f"p99={_pct(lat, 0.99):7.1f}ms errors={results.errors[name]}"
+        )
+    everything = [x for v in results.latencies.values() for x in v]
+    print(
+        f"  all     p50={statistics.median(everything) * 1000:7.1f}ms "
+        f"p99={_pct(everything, 0.99):7.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=None, help="defaults to --students")
+    args = parser.parse_args()
+
+    exam = seed(args.students, args.questions)
+    asyncio.run(run(args.base_url, exam, args.concurrency or args.students))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+# Capacity run for a full JEE-style mock: seeds an institute (org, batches, students, a
+# 90-question three-section test) straight into Postgres, then replays the exam day
+# against a running API, one phase after another:
+#
+#   login    --logins students sign in at once (argon2 bound; the rest get minted tokens)
+#   start    every student opens the attempt in the same moment
+#   answer   steady autosave: --answers answers per student via PUT .../answers/{question}
+#   submit   everyone submits at the bell
+#
+# Each phase reports throughput, p50/p95/p99 latency, errors, 429/503 retries and DB
+# queries per request (read from the Server-Timing header, so DB_QUERY_STATS must be on).
+# Results are written as JSON tagged with the git commit; --compare prints the change
+# against an earlier run.
+#
+#   RATE_LIMITS='{"auth.login": {"limit": 0}, "answers.save": {"limit": 0}}' \
+#       uvicorn zenith_api.main:app --workers 4
+#   PYTHONPATH=src python benchmarks/jee_mock_exam.py --base-url http://localhost:8000 \
+#       --students 50000 --concurrency 500 --compare benchmarks/results/<earlier>.json
+#
+# Every run seeds a fresh org, so runs don't disturb each other; --seed fixes which
+# options students pick.
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import subprocess
+import time
+import uuid
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import insert, select
+
+from zenith_api.auth.security import create_access_token, hash_password
+from zenith_api.db.models import (
+    Batch,
+    BatchMember,
+    Membership,
+    Organization,
+    Question,
+    QuestionOption,
+    Role,
+    Test,
+    User,
+)
+from zenith_api.db.session import SessionLocal
+
+PASSWORD = "Password123!"  # noqa: S105
+SECTIONS = ("Physics", "Chemistry", "Mathematics")
+PHASES = ("login", "start", "answer", "submit")
+RESULTS_DIR = Path(__file__).parent / "results"
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+_DB_DUR = re.compile(r"\bdb;dur=([\d.]+)")
+
+
+@dataclass
+class Exam:
+    org_id: uuid.UUID
+    test_id: uuid.UUID
+    questions: list[tuple[uuid.UUID, list[uuid.UUID]]]
+    emails: list[str]
+    user_ids: list[uuid.UUID]
+
+
+@dataclass
+class Phase:
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    db_ms: list[float] = field(default_factory=list)
+    errors: Counter[int | str] = field(default_factory=Counter)
+    retries: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> dict[str, Any]:
+        n = len(self.latencies)
+        return {
+            "requests": n,
+            "errors": dict(self.errors),
+            "retries": self.retries,
+            "elapsed_s": round(self.elapsed, 3),
+            "rps": round(n / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": _pct(self.latencies, 0.50),
+            "p95_ms": _pct(self.latencies, 0.95),
+            "p99_ms": _pct(self.latencies, 0.99),
+            "max_ms": round(max(self.latencies) * 1000, 2) if n else 0.0,
+            "queries_per_request": round(sum(self.queries) / len(self.queries), 2)
+            if self.queries
+            else None,
+            "db_ms_p50": _pct([ms / 1000 for ms in self.db_ms], 0.50) if self.db_ms else None,
+        }
+
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 2)
+
+
+def _chunks[T](items: list[T], size: int) -> Iterator[list[T]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def seed(students: int, questions: int, batches: int, duration_minutes: int) -> Exam:
+    # One test in the first batch; all students are enrolled there, and spread over the
+    # other batches too so membership tables have a realistic size.
+    tag = uuid.uuid4().hex[:8]
+    hashed = hash_password(PASSWORD)
+    with SessionLocal() as db:
+        student_role = db.scalar(select(Role.id).where(Role.code == "student"))
+        assert student_role is not None, "run migrations first"
+
+        org = Organization(name=f"bench-jee-{tag}")
+        db.add(org)
+        db.flush()
+        batch_rows = [Batch(organization_id=org.id, name=f"batch-{i}") for i in range(batches)]
+        db.add_all(batch_rows)
+        db.flush()
+        test = Test(
+            organization_id=org.id,
+            batch_id=batch_rows[0].id,
+            title=f"JEE mock {tag}",
+            duration_minutes=duration_minutes,
+            marks_correct=4,
+            marks_incorrect=-1,
+        )
+        db.add(test)
+        db.flush()
+
+        per_section = -(-questions // len(SECTIONS))
+        question_ids = [uuid.uuid4() for _ in range(questions)]
+        db.execute(
+            insert(Question),
+            [
+                {
+                    "id": qid,
+                    "test_id": test.id,
+                    "prompt": f"Q{pos}",
+                    "position": pos,
+                    "section": SECTIONS[(pos - 1) // per_section],
+                }
+                for pos, qid in enumerate(question_ids, start=1)
+            ],
+        )
+        qs: list[tuple[uuid.UUID, list[uuid.UUID]]] = []
+        options = []
+        for qid in question_ids:
+            opt_ids = [uuid.uuid4() for _ in range(4)]
+            qs.append((qid, opt_ids))
+            options += [
+                {
+                    "id": oid,
+                    "question_id": qid,
+                    "text": "ABCD"[i],
+                    "position": i + 1,
+                    "is_correct": i == 0,
+                }
+                for i, oid in enumerate(opt_ids)
+            ]
+        db.execute(insert(QuestionOption), options)
+
+        user_ids = [uuid.uuid4() for _ in range(students)]
+        emails = [f"bench-jee-{tag}-{i}@example.com" for i in range(students)]
+        for chunk in _chunks(list(zip(user_ids, emails, strict=True)), 10_000):
+            db.execute(
+                insert(User),
+                [{"id": uid, "email": e, "hashed_password": hashed} for uid, e in chunk],
+            )
+            db.execute(
+                insert(Membership),
+                [
+                    {
+                        "id": uuid.uuid4(),
+                        "organization_id": org.id,
+                        "user_id": uid,
+                        "role_id": student_role,
+                    }
+                    for uid, _ in chunk
+                ],
+            )
+            rows = [
+                {"id": uuid.uuid4(), "batch_id": batch_rows[0].id, "user_id": u} for u, _ in chunk
+            ]
+            if batches > 1:
+                rows += [
+                    {
+                        "id": uuid.uuid4(),
+                        "batch_id": batch_rows[1 + uid.int % (batches - 1)].id,
+                        "user_id": uid,
+                    }
+                    for uid, _ in chunk
+                ]
+            db.execute(insert(BatchMember), rows)
+        db.commit()
+        return Exam(org.id, test.id, qs, emails, user_ids)
+
+
+async def _drive(jobs: Iterable[Callable[[], Awaitable[None]]], concurrency: int) -> None:
+    # A fixed pool of clients working through the jobs in order: closed-loop load.
+    it = iter(jobs)
+
+    async def worker() -> None:
+        for job in it:
+            await job()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _call(
+    phase: Phase, client: httpx.AsyncClient, method: str, url: str, **kw: Any
+) -> httpx.Response | None:
+    # Honours Retry-After on 429/503 like the web client does; only the request that
+    # finally succeeds counts towards latency.
+    for _ in range(10):
+        started = time.perf_counter()
+        try:
+            r = await client.request(method, url, **kw)
+        except httpx.HTTPError as e:
+            phase.errors[type(e).__name__] += 1
+            return None
+        took = time.perf_counter() - started
+        if r.status_code in (429, 503) and "retry-after" in r.headers:
+            phase.retries += 1
+            await asyncio.sleep(min(float(r.headers["retry-after"]), 5.0))
+            continue
+        if r.status_code != 200:
+            phase.errors[r.status_code] += 1
+            return None
+        phase.latencies.append(took)
+        timing = r.headers.get("server-timing", "")
+        if m := _QUERIES.search(timing):
+            phase.queries.append(int(m.group(1)))
+        if m := _DB_DUR.search(timing):
+            phase.db_ms.append(float(m.group(1)))
+        return r
+    phase.errors["gave_up"] += 1
+    return None
+
+
+async def _timed(phase: Phase, jobs: Iterable[Callable[[], Awaitable[None]]], c: int) -> None:
+    started = time.perf_counter()
+    await _drive(jobs, c)
+    phase.elapsed = time.perf_counter() - started
+    s = phase.summary()
+    print(
+        f"  {phase.name:<7} n={s['requests']:<7} {s['rps']:>8.1f} req/s  p50={s['p50_ms']:7.1f}ms"
+        f"  p95={s['p95_ms']:7.1f}ms  p99={s['p99_ms']:7.1f}ms  q/req={s['queries_per_request']}"
+        f"  retries={s['retries']}  errors={s['errors']}"
+    )
+
+
+async def run(args: argparse.Namespace, exam: Exam) -> dict[str, Phase]:
+    phases = {name: Phase(name) for name in PHASES}
+    rng = random.Random(args.seed)  # noqa: S311
+    n = len(exam.user_ids)
+    tokens = [
+        create_access_token(user_id=str(uid), expires_minutes=args.duration + 60)
+        for uid in exam.user_ids
+    ]
+    attempts: list[str | None] = [None] * n
+    limits = httpx.Limits(max_connections=args.concurrency)
+    base = f"/orgs/{exam.org_id}"
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=120) as client:
+
+        def login(i: int) -> Callable[[], Awaitable[None]]:
+            async def job() -> None:
+                r = await _call(
+                    phases["login"],
+                    client,
+                    "POST",
+                    "/auth/login",
+                    json={"email": exam.emails[i], "password": PASSWORD},
+                )
+                if r is not None:
+                    tokens[i] = r.json()["access_token"]
+
+            return job
+
+        def start(i: int) -> Callable[[], Awaitable[None]]:
+            async def job() -> None:
+                r = await _call(
+                    phases["start"],
+                    client,
+                    "POST",
+                    f"{base}/tests/{exam.test_id}/attempts/start",
+                    headers={"Authorization": f"Bearer {tokens[i]}"},
+                )
+                if r is not None:
+                    attempts[i] = r.json()["attempt_id"]
+
+            return job
+
+        def answer(i: int, question: int, option: int) -> Callable[[], Awaitable[None]]:
+            async def job() -> None:
+                if attempts[i] is None:
+                    return
+                qid, opts = exam.questions[question]
+                if args.think_ms:
+                    await asyncio.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+                await _call(
+                    phases["answer"],
+                    client,
+                    "PUT",
+                    f"{base}/attempts/{attempts[i]}/answers/{qid}",
+                    json={"selected_option_id": str(opts[option])},
+                    headers={"Authorization": f"Bearer {tokens[i]}"},
+                )
+
+            return job
+
+        def submit(i: int) -> Callable[[], Awaitable[None]]:
+            async def job() -> None:
+                if attempts[i] is None:
+                    return
+                await _call(
+                    phases["submit"],
+                    client,
+                    "POST",
+                    f"{base}/attempts/{attempts[i]}/submit",
+                    headers={"Authorization": f"Bearer {tokens[i]}"},
+                )
+
+            return job
+
+        # Students answer questions in their own order and sometimes change their
+        # mind; rounds interleave students so the load stays even across the phase.
+        plans = [
+            [(rng.randrange(len(exam.questions)), rng.randrange(4)) for _ in range(args.answers)]
+            for _ in range(n)
+        ]
+        answer_jobs = (answer(i, *plans[i][k]) for k in range(args.answers) for i in range(n))
+
+        await _timed(
+            phases["login"], (login(i) for i in range(min(args.logins, n))), args.concurrency
+        )
+        await _timed(phases["start"], (start(i) for i in range(n)), args.concurrency)
+        await _timed(phases["answer"], answer_jobs, args.concurrency)
+        await _timed(phases["submit"], (submit(i) for i in range(n)), args.concurrency)
+    return phases
+
+
+def _git_commit() -> dict[str, Any]:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],  # noqa: S607
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {"sha": None, "dirty": None}
+    return {"sha": sha, "dirty": dirty}
+
+
+def compare(current: dict[str, Any], previous: dict[str, Any]) -> None:
+    print(f"vs {previous['commit']['sha']} ({previous['started_at']}):")
+    for name in PHASES:
+        now, then = current["phases"].get(name), previous["phases"].get(name)
+        if not now or not then or not then["requests"]:
+            continue
+        deltas = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            if then[key]:
+                deltas.append(
+                    f"{key} {then[key]:.1f} -> {now[key]:.1f} ({now[key] / then[key] - 1:+.0%})"
+                )
+        print(f"  {name:<7} " + "  ".join(deltas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--students", type=int, default=50_000)
+    parser.add_argument("--questions", type=int, default=90)
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--duration", type=int, default=180, help="test length in minutes")
+    parser.add_argument("--logins", type=int, default=2000, help="students who log in")
+    parser.add_argument("--answers", type=int, default=30, help="autosaves per student")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause per autosave")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    args = parser.parse_args()
+
+    started_at = datetime.now(UTC)
+    t = time.perf_counter()
+    exam = seed(args.students, args.questions, args.batches, args.duration)
+    took = time.perf_counter() - t
+    print(f"seeded {args.students} students, {args.questions} questions in {took:.1f}s")
+
+    phases = asyncio.run(run(args, exam))
+
+    commit = _git_commit()
+    report = {
+        "benchmark": "jee_mock_exam",
+        "commit": commit,
+        "started_at": started_at.isoformat(),
+        "config": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "phases": {name: p.summary() for name, p in phases.items()},
+    }
+    out = args.out or RESULTS_DIR / (
+        f"jee_mock_exam-{started_at:%Y%m%dT%H%M%S}-{(commit['sha'] or 'nogit')[:8]}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"wrote {out}")
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Login storm: N users log in at once with C in flight. Reports logins/s, logins/s per
+# hashing core, latency, and how many requests were shed with 503. Users are seeded with a
+# single precomputed hash, so the run measures /auth/login rather than seeding.
+#
+#   PYTHONPATH=src python benchmarks/login_throughput.py --base-url http://localhost:8000 \
+#       --users 500 --concurrency 100 --cores 2
+#
+# --cores is the number of CPUs doing argon2 work (PASSWORD_HASH_WORKERS on the server,
+# capped by the machine's CPU count).
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import httpx
+from sqlalchemy import insert
+
+from zenith_api.auth.security import hash_password
+from zenith_api.db.models import User
+from zenith_api.db.session import SessionLocal
+
+PASSWORD = "Password123!"  # noqa: S105
+
+
+def seed(users: int) -> list[str]:
+    tag = uuid.uuid4().hex[:8]
+    hashed = hash_password(PASSWORD)
+    emails = [f"bench-login-{tag}-{i}@example.com" for i in range(users)]
+    with SessionLocal() as db:
+        db.execute(insert(User), [{"email": e, "hashed_password": hashed} for e in emails])
+        db.commit()
+    return emails
+
+
+async def run(base_url: str, emails: list[str], concurrency: int, cores: int) -> None:
+    latencies: list[float] = []
+    statuses: Counter[int | str] = Counter()
+    sem = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+
+        async def login(email: str) -> None:
+            async with sem:
+                started = time.perf_counter()
+                try:
+                    r = await client.post(
+                        "/auth/login", json={"email": email, "password": PASSWORD}
+                    )
+                    statuses[r.status_code] += 1
+                    if r.status_code == 200:
+                        latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login(e) for e in emails))
+        elapsed = time.perf_counter() - started
+
+    ok = statuses[200]
+    print(f"elapsed {elapsed:.2f}s  statuses {dict(statuses)}")
+    print(f"logins/s {ok / elapsed:.1f}  per core {ok / elapsed / cores:.1f}")
+    if latencies:
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"latency p50 {statistics.median(latencies) * 1000:.0f}ms  p99 {p99 * 1000:.0f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--cores", type=int, default=1)
+    args = parser.parse_args()
+
+    emails = seed(args.users)
+    asyncio.run(run(args.base_url, emails, args.concurrency, args.cores))
+
+
+if __name__ == "__main__":
+    main()
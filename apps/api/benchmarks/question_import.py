@@ -0,0 +1,99 @@
+# Times the bulk question import against one-question-per-request add_question.
+#
+#   PYTHONPATH=src python benchmarks/question_import.py --base-url http://localhost:8000 \
+#       --questions 10000 100000 --baseline 500
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import uuid
+
+import httpx
+from sqlalchemy import select
+
+from zenith_api.auth.security import create_access_token, hash_password
+from zenith_api.db.models import Batch, Membership, Organization, Role, User
+from zenith_api.db.session import SessionLocal
+
+
+def seed_test() -> tuple[uuid.UUID, str, httpx.Headers]:
+    tag = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        admin_role = db.scalar(select(Role.id).where(Role.code == "admin"))
+        assert admin_role is not None, "run migrations first"
+        org = Organization(name=f"bench-import-{tag}")
+        user = User(email=f"bench-import-{tag}@example.com", hashed_password=hash_password(tag))
+        db.add_all([org, user])
+        db.flush()
+        db.add(Membership(organization_id=org.id, user_id=user.id, role_id=admin_role))
+        batch = Batch(organization_id=org.id, name="bench")
+        db.add(batch)
+        db.flush()
+        db.commit()
+        org_id, batch_id, user_id = org.id, batch.id, user.id
+
+    token = create_access_token(user_id=str(user_id), expires_minutes=120)
+    return org_id, str(batch_id), httpx.Headers({"Authorization": f"Bearer {token}"})
+
+
+def new_test(org_id: uuid.UUID, batch_id: str, client: httpx.Client) -> str:
+    r = client.post(f"/orgs/{org_id}/tests", json={"batch_id": batch_id, "title": "bench"})
+    r.raise_for_status()
+    return str(r.json()["test_id"])
+
+
+def question(pos: int) -> dict[str, object]:
+    return {
+        "prompt": f"Question {pos}: a JEE-style stem long enough to be realistic " * 3,
+        "position": pos,
+        "options": [{"text": f"Option {c}", "position": i} for i, c in enumerate("ABCD", 1)],
+        "correct_position": pos % 4 + 1,
+    }
+
+
+def bench_import(client: httpx.Client, org_id: uuid.UUID, batch_id: str, n: int) -> None:
+    test_id = new_test(org_id, batch_id, client)
+    body = "\n".join(json.dumps(question(pos)) for pos in range(1, n + 1)).encode()
+    started = time.perf_counter()
+    r = client.post(
+        f"/orgs/{org_id}/tests/{test_id}/questions/import",
+        files={"file": ("bank.jsonl", body, "application/jsonl")},
+    )
+    elapsed = time.perf_counter() - started
+    r.raise_for_status()
+    print(
+        f"bulk import  n={n:<7} {elapsed:7.2f}s  {n / elapsed:9.0f} questions/s  "
+        f"upload={len(body) / 1e6:.1f}MB"
+    )
+
+
+def bench_single(client: httpx.Client, org_id: uuid.UUID, batch_id: str, n: int) -> None:
+    test_id = new_test(org_id, batch_id, client)
+    started = time.perf_counter()
+    for pos in range(1, n + 1):
+        client.post(
+            f"/orgs/{org_id}/tests/{test_id}/questions", json=question(pos)
+        ).raise_for_status()
+    elapsed = time.perf_counter() - started
+    print(f"add_question n={n:<7} {elapsed:7.2f}s  {n / elapsed:9.0f} questions/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--questions", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--baseline", type=int, default=500, help="0 skips add_question")
+    args = parser.parse_args()
+
+    org_id, batch_id, headers = seed_test()
+    with httpx.Client(base_url=args.base_url, headers=headers, timeout=600) as client:
+        if args.baseline:
+            bench_single(client, org_id, batch_id, args.baseline)
+        for n in args.questions:
+            bench_import(client, org_id, batch_id, n)
+
+
+if __name__ == "__main__":
+    main()
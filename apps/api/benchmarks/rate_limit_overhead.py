@@ -0,0 +1,67 @@
+# Cost of one rate-limit check: the Redis token bucket (one EVALSHA round trip) against
+# the in-process fallback, sequentially and with many checks in flight.
+#
+#   PYTHONPATH=src python benchmarks/rate_limit_overhead.py --checks 20000 --concurrency 100
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from zenith_api import ratelimit
+from zenith_api.config import RateLimit, settings
+
+
+async def sequential(checks: int, subjects: int) -> list[float]:
+    latencies = []
+    for i in range(checks):
+        started = time.perf_counter()
+        await ratelimit.take("bench", f"user:{i % subjects}")
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def concurrent(checks: int, subjects: int, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            await ratelimit.take("bench", f"user:{i % subjects}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(checks)))
+    return time.perf_counter() - started
+
+
+async def run(checks: int, concurrency: int) -> None:
+    # Generous limit so every check is admitted and writes its key, the costlier path.
+    settings.rate_limits["bench"] = RateLimit(limit=1_000_000)
+    subjects = 1000
+    for backend in ("redis", "memory"):
+        settings.rate_limit_redis = backend == "redis"
+        ratelimit._local.clear()
+        await ratelimit.take("bench", f"warmup:{uuid.uuid4()}")
+
+        latencies = sorted(await sequential(checks, subjects))
+        p50 = statistics.median(latencies) * 1e6
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1e6
+        elapsed = await concurrent(checks, subjects, concurrency)
+        print(
+            f"{backend:<6}  sequential p50 {p50:7.1f}us  p99 {p99:7.1f}us  "
+            f"concurrent({concurrency}) {checks / elapsed:9.0f} checks/s"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.checks, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
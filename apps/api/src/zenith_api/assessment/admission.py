@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+import uuid
+
+from redis.exceptions import RedisError
+
+from zenith_api.config import settings
+from zenith_api.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# Admission gate for attempt starts, one per test. Virtual-scheduling token bucket:
+# KEYS[1] holds the theoretical arrival time of the next start; callers beyond the
+# burst are handed a slot in the future, remembered in KEYS[2], so coming back on
+# time admits them instead of sending them to the back of the queue.
+# Returns 0 when admitted, otherwise milliseconds until the caller's slot.
+_GATE_LUA = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local ticket = redis.call('GET', KEYS[2])
+if ticket then
+  local wait = tonumber(ticket) - now
+  if wait <= 0 then
+    return 0
+  end
+  return wait
+end
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+  tat = now
+end
+tat = tat + interval
+redis.call('SET', KEYS[1], tat, 'PX', math.ceil(tat - now + burst) + 1000)
+local wait = tat - now - burst
+if wait <= 0 then
+  return 0
+end
+redis.call('SET', KEYS[2], now + wait, 'PX', math.ceil(wait) + 60000)
+return wait
+"""
+
+
+async def admission_wait(test_id: uuid.UUID, user_id: uuid.UUID) -> int:
+    # Seconds the caller must wait before starting; 0 when admitted or the gate is off.
+    rate = settings.attempt_start_rate
+    if rate <= 0:
+        return 0
+
+    interval_ms = 1000 / rate
+    try:
+        wait_ms = await get_async_redis().eval(  # type: ignore[misc]
+            _GATE_LUA,
+            2,
+            f"admission:{test_id}",
+            f"admission:{test_id}:{user_id}",
+            str(int(time.time() * 1000)),
+            str(interval_ms),
+            str(settings.attempt_start_burst * interval_ms),
+        )
+    except RedisError:
+        # Fail open: the gate only smooths load, it must never block an exam.
+        logger.warning("admission gate unavailable", exc_info=True)
+        return 0
+    return math.ceil(float(wait_ms) / 1000)
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from zenith_api.db.models import (
+    Attempt,
+    AttemptRank,
+    Question,
+    QuestionAnalytics,
+    QuestionOption,
+    Test,
+    TestAnalytics,
+)
+from zenith_api.db.session import ReadSessionLocal
+from zenith_api.jobs import fail_job, finish_job
+
+# Analytics for a closed test: the response matrix (attempt x question -> chosen
+# option) is loaded once and everything else is array arithmetic, so a 50k-candidate
+# test costs one pass over attempt_answers instead of a query per statistic.
+
+# Share of candidates in each of the upper and lower groups for discrimination.
+GROUP_FRACTION = 0.27
+
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_COPY_HEADER_SIZE = 19  # signature, flags, header extension length
+# One binary COPY tuple of two non-null int4 columns.
+_PAIR_ROW = np.dtype(
+    [("fields", ">i2"), ("len_i", ">i4"), ("i", ">i4"), ("len_j", ">i4"), ("j", ">i4")]
+)
+
+# (attempt index, option index) per answer. The numbering matches the ORDER BYs in
+# _load, and both run in one snapshot.
+_ANSWERS_SQL = """
+WITH a AS (
+  SELECT id, (row_number() OVER (ORDER BY id) - 1)::int AS i
+  FROM attempts WHERE test_id = %(test_id)s AND submitted_at IS NOT NULL
+), o AS (
+  SELECT qo.id, (row_number() OVER (ORDER BY q.position, q.id, qo.position, qo.id) - 1)::int AS j
+  FROM question_options qo JOIN questions q ON q.id = qo.question_id
+  WHERE q.test_id = %(test_id)s
+)
+SELECT a.i, o.j
+FROM attempt_answers aa
+JOIN a ON a.id = aa.attempt_id
+JOIN o ON o.id = aa.selected_option_id
+"""
+
+
+@dataclass(slots=True)
+class Responses:
+    attempt_ids: list[uuid.UUID]
+    user_ids: list[uuid.UUID]
+    scores: npt.NDArray[np.float64]
+    question_ids: list[uuid.UUID]
+    option_ids: list[uuid.UUID]
+    option_positions: list[int]
+    option_question: npt.NDArray[np.intp]  # question index of each option
+    option_correct: npt.NDArray[np.bool_]
+    choice: npt.NDArray[np.int32]  # attempts x questions: option index, -1 if unanswered
+
+
+@dataclass(slots=True)
+class Analysis:
+    summary: dict[str, Any]
+    rank: npt.NDArray[np.int64]
+    percentile: npt.NDArray[np.float64]
+    questions: list[dict[str, Any]]
+
+
+def _copy_pairs(
+    db: Session, query: str, params: dict[str, Any]
+) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.intp]]:
+    # Binary COPY viewed as a record array: no Python object per answer row.
+    raw = db.connection().connection.driver_connection
+    assert raw is not None
+    buf = bytearray()
+    with raw.cursor() as cur, cur.copy(f"COPY ({query}) TO STDOUT (FORMAT binary)", params) as copy:
+        for block in copy:
+            buf += block
+    assert buf.startswith(_COPY_SIGNATURE)
+    rows = np.frombuffer(memoryview(buf)[_COPY_HEADER_SIZE:-2], dtype=_PAIR_ROW)
+    return rows["i"].astype(np.intp), rows["j"].astype(np.intp)
+
+
+def _load(db: Session, test_id: uuid.UUID) -> Responses:
+    # All reads share one REPEATABLE READ snapshot so the indexes line up.
+    db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    attempts = db.execute(
+        select(Attempt.id, Attempt.user_id, Attempt.score)
+        .where(Attempt.test_id == test_id, Attempt.submitted_at.is_not(None))
+        .order_by(Attempt.id)
+    ).all()
+    question_ids = list(
+        db.scalars(
+            select(Question.id)
+            .where(Question.test_id == test_id)
+            .order_by(Question.position, Question.id)
+        )
+    )
+    options = db.execute(
+        select(
+            QuestionOption.id,
+            QuestionOption.question_id,
+            QuestionOption.position,
+            QuestionOption.is_correct,
+        )
+        .join(Question, Question.id == QuestionOption.question_id)
+        .where(Question.test_id == test_id)
+        .order_by(Question.position, Question.id, QuestionOption.position, QuestionOption.id)
+    ).all()
+    a_idx, o_idx = _copy_pairs(db, _ANSWERS_SQL, {"test_id": test_id})
+
+    q_index = {qid: i for i, qid in enumerate(question_ids)}
+    option_question = np.array([q_index[o.question_id] for o in options], dtype=np.intp)
+    choice = np.full((len(attempts), len(question_ids)), -1, dtype=np.int32)
+    choice[a_idx, option_question[o_idx]] = o_idx
+    return Responses(
+        attempt_ids=[a.id for a in attempts],
+        user_ids=[a.user_id for a in attempts],
+        scores=np.array([a.score or 0 for a in attempts], dtype=np.float64),
+        question_ids=question_ids,
+        option_ids=[o.id for o in options],
+        option_positions=[o.position for o in options],
+        option_question=option_question,
+        option_correct=np.array([o.is_correct for o in options], dtype=np.bool_),
+        choice=choice,
+    )
+
+
+def _finite(x: float) -> float | None:
+    return float(x) if np.isfinite(x) else None
+
+
+def analyse(r: Responses) -> Analysis:
+    n = len(r.attempt_ids)
+    scores = r.scores
+    if n == 0:
+        summary: dict[str, Any] = {
+            "attempts": 0,
+            "mean_score": None,
+            "median_score": None,
+            "std_score": None,
+            "min_score": None,
+            "max_score": None,
+        }
+        return Analysis(summary, np.zeros(0, np.int64), np.zeros(0, np.float64), [])
+
+    summary = {
+        "attempts": n,
+        "mean_score": float(scores.mean()),
+        "median_score": float(np.median(scores)),
+        "std_score": float(scores.std()),
+        "min_score": int(scores.min()),
+        "max_score": int(scores.max()),
+    }
+
+    # Rank = 1 + candidates scoring strictly higher; percentile = share scoring <= own.
+    at_most = np.searchsorted(np.sort(scores), scores, side="right")
+    rank = (n - at_most + 1).astype(np.int64)
+    percentile = 100.0 * at_most / n
+
+    answered = r.choice >= 0
+    correct = answered & r.option_correct[np.maximum(r.choice, 0)]
+    attempted = answered.sum(axis=0)
+    n_correct = correct.sum(axis=0)
+    p_value = n_correct / n
+
+    # Point-biserial: Pearson r between the 0/1 item score and the test score.
+    x = correct.astype(np.float64)
+    centred = scores - scores.mean()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r_pb = (centred @ x / n) / (x.std(axis=0) * scores.std())
+
+    # Upper/lower groups by score; ties broken by attempt order, so they're stable.
+    k = max(1, round(GROUP_FRACTION * n))
+    by_score = np.argsort(-scores, kind="stable")
+    upper, lower = by_score[:k], by_score[-k:]
+    discrimination = correct[upper].mean(axis=0) - correct[lower].mean(axis=0)
+
+    n_options = len(r.option_ids)
+    chosen = r.choice[answered]
+    counts = np.bincount(chosen, minlength=n_options)
+    score_sums = np.bincount(
+        chosen, weights=np.broadcast_to(scores[:, None], r.choice.shape)[answered],
+        minlength=n_options,
+    )
+    upper_choice, lower_choice = r.choice[upper], r.choice[lower]
+    upper_counts = np.bincount(upper_choice[upper_choice >= 0], minlength=n_options)
+    lower_counts = np.bincount(lower_choice[lower_choice >= 0], minlength=n_options)
+
+    questions: list[dict[str, Any]] = [
+        {
+            "question_id": qid,
+            "attempted": int(attempted[i]),
+            "correct": int(n_correct[i]),
+            "p_value": float(p_value[i]),
+            "discrimination": float(discrimination[i]) if n > 1 else None,
+            "point_biserial": _finite(r_pb[i]),
+            "options": [],
+        }
+        for i, qid in enumerate(r.question_ids)
+    ]
+    for j, oid in enumerate(r.option_ids):
+        questions[int(r.option_question[j])]["options"].append(
+            {
+                "option_id": str(oid),
+                "position": r.option_positions[j],
+                "is_correct": bool(r.option_correct[j]),
+                "count": int(counts[j]),
+                "fraction": float(counts[j] / n),
+                "upper_fraction": float(upper_counts[j] / k),
+                "lower_fraction": float(lower_counts[j] / k),
+                "mean_score": float(score_sums[j] / counts[j]) if counts[j] else None,
+            }
+        )
+    return Analysis(summary, rank, percentile, questions)
+
+
+def _reader(db: Session) -> Session:
+    # The replica takes the heavy read, but only once it has replayed everything the
+    # primary had committed when we started, so late submissions are never missed.
+    # Either way the session returned has no transaction open yet, for _load's snapshot.
+    if ReadSessionLocal is None:
+        db.rollback()
+        return db
+    lsn = db.execute(text("SELECT pg_current_wal_lsn()")).scalar_one()
+    db.rollback()
+    read = ReadSessionLocal()
+    try:
+        caught_up = read.execute(
+            text("SELECT pg_last_wal_replay_lsn() >= CAST(:lsn AS pg_lsn)"), {"lsn": str(lsn)}
+        ).scalar()
+        read.rollback()
+    except SQLAlchemyError:
+        caught_up = False
+    if caught_up:
+        return read
+    read.close()
+    return db
+
+
+def _store(db: Session, test_id: uuid.UUID, r: Responses, a: Analysis) -> None:
+    # Replaced wholesale in one transaction; readers see the old results until commit.
+    # The upsert comes first so its row lock serializes concurrent refreshes.
+    values = {**a.summary, "computed_at": datetime.now(UTC)}
+    db.execute(
+        pg_insert(TestAnalytics)
+        .values(test_id=test_id, **values)
+        .on_conflict_do_update(index_elements=[TestAnalytics.test_id], set_=values)
+    )
+    db.execute(delete(AttemptRank).where(AttemptRank.test_id == test_id))
+    db.execute(delete(QuestionAnalytics).where(QuestionAnalytics.test_id == test_id))
+
+    raw = db.connection().connection.driver_connection
+    assert raw is not None
+    scores, ranks, percentiles = r.scores.tolist(), a.rank.tolist(), a.percentile.tolist()
+    with raw.cursor() as cur, cur.copy(
+        "COPY attempt_ranks (attempt_id, test_id, user_id, score, rank, percentile) FROM STDIN"
+    ) as copy:
+        for i, attempt_id in enumerate(r.attempt_ids):
+            copy.write_row(
+                (attempt_id, test_id, r.user_ids[i], int(scores[i]), ranks[i], percentiles[i])
+            )
+    if a.questions:
+        db.execute(insert(QuestionAnalytics), [{"test_id": test_id, **q} for q in a.questions])
+
+
+def refresh_analytics(db: Session, test_id: uuid.UUID) -> dict[str, Any]:
+    # Recomputes and stores everything for the test, then commits. Idempotent.
+    read = _reader(db)
+    try:
+        responses = _load(read, test_id)
+    finally:
+        if read is db:
+            db.rollback()
+        else:
+            read.close()
+    analysis = analyse(responses)
+    _store(db, test_id, responses, analysis)
+    db.commit()
+    return analysis.summary
+
+
+def run_analytics(db: Session, job_id: uuid.UUID, test_id: uuid.UUID) -> dict[str, Any]:
+    try:
+        out = refresh_analytics(db, test_id)
+    except Exception as e:
+        fail_job(db, job_id, str(e))
+        raise
+    finish_job(db, job_id, out)
+    return out
+
+
+def tests_due_for_analytics(db: Session, closed_before: datetime) -> list[uuid.UUID]:
+    # Tests that ended before the cutoff and have no analytics since they ended.
+    return list(
+        db.scalars(
+            select(Test.id)
+            .outerjoin(TestAnalytics, TestAnalytics.test_id == Test.id)
+            .where(
+                Test.ends_at <= closed_before,
+                (TestAnalytics.test_id.is_(None)) | (TestAnalytics.computed_at < Test.ends_at),
+            )
+        )
+    )
+
+
+def has_analytics(db: Session, test_id: uuid.UUID) -> bool:
+    found = db.scalar(select(TestAnalytics.test_id).where(TestAnalytics.test_id == test_id))
+    return found is not None
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import logging
+import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from zenith_api.cache import LRUCache
+from zenith_api.config import settings
+from zenith_api.db.models import Question, QuestionOption
+from zenith_api.redis_client import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class QuestionKey:
+    # Validates answer writes; grading itself happens in SQL (assessment.scoring).
+    position: int
+    option_ids: frozenset[uuid.UUID]
+
+
+@dataclass(frozen=True, slots=True)
+class AnswerKey:
+    test_id: uuid.UUID
+    version: int
+    questions: Mapping[uuid.UUID, QuestionKey]
+
+    def is_valid(self, question_id: uuid.UUID, option_id: uuid.UUID) -> bool:
+        q = self.questions.get(question_id)
+        return q is not None and option_id in q.option_ids
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "test_id": str(self.test_id),
+                "version": self.version,
+                "questions": {
+                    str(qid): [q.position, sorted(str(o) for o in q.option_ids)]
+                    for qid, q in self.questions.items()
+                },
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> AnswerKey:
+        data = json.loads(raw)
+        return cls(
+            test_id=uuid.UUID(data["test_id"]),
+            version=data["version"],
+            questions=MappingProxyType(
+                {
+                    uuid.UUID(qid): QuestionKey(
+                        position=position,
+                        option_ids=frozenset(uuid.UUID(o) for o in options),
+                    )
+                    for qid, (position, options) in data["questions"].items()
+                }
+            ),
+        )
+
+
+_local: LRUCache[tuple[uuid.UUID, int], AnswerKey] = LRUCache(
+    settings.answer_key_cache_size, name="answer_key"
+)
+
+
+def _redis_key(test_id: uuid.UUID, version: int) -> str:
+    return f"answer_key:v2:{test_id}:{version}"
+
+
+async def build_answer_key(db: AsyncSession, test_id: uuid.UUID, version: int) -> AnswerKey:
+    rows = (
+        await db.execute(
+            select(Question.id, Question.position, QuestionOption.id)
+            .outerjoin(QuestionOption, QuestionOption.question_id == Question.id)
+            .where(Question.test_id == test_id)
+        )
+    ).tuples()
+
+    positions: dict[uuid.UUID, int] = {}
+    options: dict[uuid.UUID, set[uuid.UUID]] = {}
+    for question_id, position, option_id in rows:
+        positions[question_id] = position
+        opts = options.setdefault(question_id, set())
+        if option_id is not None:
+            opts.add(option_id)
+
+    return AnswerKey(
+        test_id=test_id,
+        version=version,
+        questions=MappingProxyType(
+            {
+                qid: QuestionKey(
+                    position=positions[qid],
+                    option_ids=frozenset(options[qid]),
+                )
+                for qid in positions
+            }
+        ),
+    )
+
+
+async def get_answer_key(db: AsyncSession, test_id: uuid.UUID, version: int) -> AnswerKey:
+    # Keys are immutable per (test, content_version), so entries never need refreshing;
+    # a bumped version simply misses and gets rebuilt.
+    key = _local.get((test_id, version))
+    if key is not None:
+        return key
+
+    if settings.redis_cache_enabled:
+        try:
+            raw = await get_async_redis().get(_redis_key(test_id, version))
+        except RedisError:
+            logger.warning("answer key cache read failed", exc_info=True)
+            raw = None
+        if raw is not None:
+            key = AnswerKey.from_json(raw)
+            _local.set((test_id, version), key)
+            return key
+
+    key = await build_answer_key(db, test_id, version)
+    _local.set((test_id, version), key)
+    if settings.redis_cache_enabled:
+        try:
+            await get_async_redis().set(
+                _redis_key(test_id, version),
+                key.to_json(),
+                ex=settings.answer_key_redis_ttl_seconds,
+            )
+        except RedisError:
+            logger.warning("answer key cache write failed", exc_info=True)
+    return key
+
+
+def invalidate_answer_key(test_id: uuid.UUID, version: int) -> None:
+    _local.pop((test_id, version))
+    if settings.redis_cache_enabled:
+        try:
+            get_redis().delete(_redis_key(test_id, version))
+        except RedisError:
+            logger.warning("answer key cache invalidation failed", exc_info=True)
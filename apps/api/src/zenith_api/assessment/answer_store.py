@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from typing import Any, cast
+
+from redis.exceptions import LockNotOwnedError
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import ReturningInsert
+
+from zenith_api.config import settings
+from zenith_api.db.models import AttemptAnswer
+from zenith_api.redis_client import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY = "answers:dirty"  # zset: attempt_id -> time it first became dirty
+FLUSH_STATS_KEY = "answers:flush:last"
+FLUSH_LOCK_KEY = "answers:flush:lock"
+
+# Keeps at most this many rows per INSERT, well under Postgres' bind-parameter limit.
+_INSERT_CHUNK = 1000
+
+# An attempt is flushed by one caller at a time (the beat flusher, the deadline sweep
+# or its own submit): otherwise a flush that read the buffer earlier could commit
+# after a later one and put an older unsequenced answer back. A holder that dies
+# releases its locks on expiry.
+_FLUSH_LOCK_SECONDS = 60
+_LOCK_POLL_SECONDS = 0.02
+
+# Last applied sequence per question outlives the attempt; the exam is long over by then.
+_SEQ_TTL_SECONDS = 24 * 3600
+
+# Buffers answers for one attempt. Hash values are "<option_id>|<client_seq>"; a sequenced
+# write is dropped when the last one applied has an equal or newer sequence. Those
+# sequences are kept in their own hash, which flushes leave alone, so a late retry is
+# still reported as ignored after the newer answer has gone to Postgres.
+_BUFFER_LUA = """
+local applied = 0
+for i = 4, #ARGV, 3 do
+  local seq = ARGV[i + 2]
+  local stale = false
+  if seq ~= '' then
+    local cur_seq = redis.call('HGET', KEYS[3], ARGV[i])
+    if cur_seq and cur_seq ~= '' and tonumber(cur_seq) >= tonumber(seq) then
+      stale = true
+    end
+  end
+  if not stale then
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1] .. '|' .. seq)
+    redis.call('HSET', KEYS[3], ARGV[i], seq)
+    applied = applied + 1
+  end
+end
+if applied > 0 then
+  redis.call('ZADD', KEYS[2], 'NX', ARGV[1], ARGV[2])
+  redis.call('EXPIRE', KEYS[3], ARGV[3])
+end
+return applied
+"""
+
+# Drops flushed fields unless they changed since they were read, then clears or
+# re-stamps the attempt's dirty marker.
+_ACK_LUA = """
+for i = 3, #ARGV, 2 do
+  if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+    redis.call('HDEL', KEYS[1], ARGV[i])
+  end
+end
+if redis.call('HLEN', KEYS[1]) == 0 then
+  redis.call('ZREM', KEYS[2], ARGV[2])
+else
+  redis.call('ZADD', KEYS[2], 'XX', ARGV[1], ARGV[2])
+end
+return 1
+"""
+
+_UNLOCK_LUA = """
+for _, key in ipairs(KEYS) do
+  if redis.call('GET', key) == ARGV[1] then
+    redis.call('DEL', key)
+  end
+end
+return 1
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class AnswerWrite:
+    question_id: uuid.UUID
+    selected_option_id: uuid.UUID
+    client_seq: int | None = None
+
+
+def _buffer_key(attempt_id: uuid.UUID | str) -> str:
+    return f"answers:{attempt_id}"
+
+
+def _seq_key(attempt_id: uuid.UUID | str) -> str:
+    return f"answers:seq:{attempt_id}"
+
+
+def _lock_key(attempt_id: uuid.UUID | str) -> str:
+    return f"{FLUSH_LOCK_KEY}:{attempt_id}"
+
+
+def _upsert_stmts(rows: list[dict[str, Any]]) -> Iterator[ReturningInsert[tuple[uuid.UUID]]]:
+    for i in range(0, len(rows), _INSERT_CHUNK):
+        ins = pg_insert(AttemptAnswer).values(rows[i : i + _INSERT_CHUNK])
+        # Unsequenced writes always win; sequenced writes only replace older sequences.
+        yield ins.on_conflict_do_update(
+            constraint="uq_attempt_answers_attempt_question",
+            set_={
+                "selected_option_id": ins.excluded.selected_option_id,
+                "client_seq": ins.excluded.client_seq,
+            },
+            where=or_(
+                AttemptAnswer.client_seq.is_(None),
+                ins.excluded.client_seq.is_(None),
+                AttemptAnswer.client_seq < ins.excluded.client_seq,
+            ),
+        ).returning(AttemptAnswer.id)
+
+
+def _row(attempt_id: uuid.UUID, a: AnswerWrite) -> dict[str, Any]:
+    return {
+        "id": uuid.uuid4(),
+        "attempt_id": attempt_id,
+        "question_id": a.question_id,
+        "selected_option_id": a.selected_option_id,
+        "client_seq": a.client_seq,
+    }
+
+
+def _buffered_rows(
+    attempt_ids: Sequence[uuid.UUID | str], buffers: list[dict[str, str]]
+) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    for attempt_id, fields in zip(attempt_ids, buffers, strict=True):
+        for question_id, value in fields.items():
+            option_id, _, seq = value.partition("|")
+            rows.append(
+                _row(
+                    uuid.UUID(str(attempt_id)),
+                    AnswerWrite(
+                        question_id=uuid.UUID(question_id),
+                        selected_option_id=uuid.UUID(option_id),
+                        client_seq=int(seq) if seq else None,
+                    ),
+                )
+            )
+    return rows
+
+
+def _ack_args(attempt_id: uuid.UUID | str, fields: dict[str, str], started: str) -> list[str]:
+    return [started, str(attempt_id), *(x for item in fields.items() for x in item)]
+
+
+async def save_answers(
+    db: AsyncSession, attempt_id: uuid.UUID, answers: Sequence[AnswerWrite]
+) -> int:
+    # Answers must already be validated; returns how many were not stale.
+    if settings.answer_store == "redis":
+        args = [str(time.time()), str(attempt_id), str(_SEQ_TTL_SECONDS)]
+        for a in answers:
+            seq = "" if a.client_seq is None else str(a.client_seq)
+            args.extend([str(a.question_id), str(a.selected_option_id), seq])
+        r = get_async_redis()
+        applied = await r.eval(  # type: ignore[misc]
+            _BUFFER_LUA, 3, _buffer_key(attempt_id), DIRTY_KEY, _seq_key(attempt_id), *args
+        )
+        return int(applied)
+
+    applied = 0
+    for stmt in _upsert_stmts([_row(attempt_id, a) for a in answers]):
+        applied += len((await db.execute(stmt)).all())
+    await db.commit()
+    return applied
+
+
+async def flush_attempt(db: AsyncSession, attempt_id: uuid.UUID) -> int:
+    # Async counterpart of flush_attempts for a single attempt, used on submit: waits
+    # for a flush already holding the attempt, then closes it like closing=True.
+    if settings.answer_store != "redis":
+        return 0
+
+    r = get_async_redis()
+    lock, token = _lock_key(attempt_id), uuid.uuid4().hex
+    for _ in range(int(_FLUSH_LOCK_SECONDS / _LOCK_POLL_SECONDS)):
+        if await r.set(lock, token, nx=True, ex=_FLUSH_LOCK_SECONDS):
+            break
+        await asyncio.sleep(_LOCK_POLL_SECONDS)
+    else:
+        # The holder's lock would have expired by now; take it.
+        await r.set(lock, token, ex=_FLUSH_LOCK_SECONDS)
+    try:
+        started = str(time.time())
+        fields: dict[str, str] = await r.hgetall(_buffer_key(attempt_id))  # type: ignore[misc]
+        rows = _buffered_rows([attempt_id], [fields])
+        if rows:
+            for stmt in _upsert_stmts(rows):
+                await db.execute(stmt)
+            await db.commit()
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.eval(
+                _ACK_LUA,
+                2,
+                _buffer_key(attempt_id),
+                DIRTY_KEY,
+                *_ack_args(attempt_id, fields, started),
+            )
+            pipe.delete(_seq_key(attempt_id))
+            await pipe.execute()
+    finally:
+        await r.eval(_UNLOCK_LUA, 1, lock, token)  # type: ignore[misc]
+    return len(rows)
+
+
+def flush_attempts(
+    db: Session, attempt_ids: Sequence[uuid.UUID | str], *, closing: bool = False
+) -> int:
+    # Attempts another flush holds are skipped; that flush writes them. closing drops
+    # the attempts' sequence records too, for callers about to close them.
+    if settings.answer_store != "redis" or not attempt_ids:
+        return 0
+
+    r = get_redis()
+    token = uuid.uuid4().hex
+    pipe = r.pipeline(transaction=False)
+    for attempt_id in attempt_ids:
+        pipe.set(_lock_key(attempt_id), token, nx=True, ex=_FLUSH_LOCK_SECONDS)
+    held = [a for a, ok in zip(attempt_ids, pipe.execute(), strict=True) if ok]
+    if not held:
+        return 0
+
+    try:
+        started = str(time.time())
+        pipe = r.pipeline(transaction=False)
+        for attempt_id in held:
+            pipe.hgetall(_buffer_key(attempt_id))
+        buffers: list[dict[str, str]] = pipe.execute()
+
+        rows = _buffered_rows(held, buffers)
+        if rows:
+            for stmt in _upsert_stmts(rows):
+                db.execute(stmt)
+            db.commit()
+
+        # Only acknowledge once Postgres has committed, so a crash never loses answers.
+        pipe = r.pipeline(transaction=False)
+        for attempt_id, fields in zip(held, buffers, strict=True):
+            pipe.eval(
+                _ACK_LUA,
+                2,
+                _buffer_key(attempt_id),
+                DIRTY_KEY,
+                *_ack_args(attempt_id, fields, started),
+            )
+            if closing:
+                pipe.delete(_seq_key(attempt_id))
+        pipe.execute()
+    finally:
+        r.eval(_UNLOCK_LUA, len(held), *map(_lock_key, held), token)
+    return len(rows)
+
+
+def flush_dirty(db: Session, limit: int) -> int:
+    r = get_redis()
+    # A single flusher at a time; a crashed holder releases the lock on expiry.
+    lock = r.lock(FLUSH_LOCK_KEY, timeout=_FLUSH_LOCK_SECONDS, blocking=False)
+    if not lock.acquire():
+        return 0
+    try:
+        started = time.perf_counter()
+        attempt_ids = cast(list[str], r.zrange(DIRTY_KEY, 0, limit - 1))
+        written = flush_attempts(db, attempt_ids)
+        r.hset(
+            FLUSH_STATS_KEY,
+            mapping={
+                "at": time.time(),
+                "attempts": len(attempt_ids),
+                "rows": written,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+        )
+        return written
+    finally:
+        try:
+            lock.release()
+        except LockNotOwnedError:
+            # Outlived its timeout; another flusher may have started meanwhile, which
+            # the per-attempt locks make harmless.
+            logger.warning("answer flush ran past its lock timeout")
+
+
+def buffer_stats() -> dict[str, Any]:
+    if settings.answer_store != "redis":
+        return {"mode": settings.answer_store}
+
+    r = get_redis()
+    pipe = r.pipeline(transaction=False)
+    pipe.zcard(DIRTY_KEY)
+    pipe.zrange(DIRTY_KEY, 0, 0, withscores=True)
+    pipe.hgetall(FLUSH_STATS_KEY)
+    dirty, oldest, last = pipe.execute()
+
+    now = time.time()
+    return {
+        "mode": "redis",
+        "dirty_attempts": dirty,
+        "flush_lag_seconds": round(now - oldest[0][1], 3) if oldest else 0.0,
+        "last_flush_age_seconds": round(now - float(last["at"]), 3) if last else None,
+        "last_flush_attempts": int(last["attempts"]) if last else None,
+        "last_flush_rows": int(last["rows"]) if last else None,
+        "last_flush_duration_ms": float(last["duration_ms"]) if last else None,
+    }
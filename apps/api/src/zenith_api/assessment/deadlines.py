@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from zenith_api.assessment.answer_store import flush_attempts
+from zenith_api.assessment.scoring import finalize_attempts
+from zenith_api.config import settings
+from zenith_api.db.models import Attempt
+
+
+def finalize_overdue_attempts(db: Session, now: datetime) -> dict[uuid.UUID, int]:
+    # Submits and scores every open attempt past its deadline (plus the answer grace),
+    # a chunk of a test's attempts per UPDATE and commit. Returns {test_id: closed}.
+    cutoff = now - timedelta(seconds=settings.answer_grace_seconds)
+    overdue = (
+        Attempt.submitted_at.is_(None),
+        Attempt.deadline_at.is_not(None),
+        Attempt.deadline_at <= cutoff,
+    )
+    test_ids = db.scalars(select(Attempt.test_id).where(*overdue).distinct()).all()
+
+    closed: dict[uuid.UUID, int] = {}
+    size = settings.attempt_finalize_chunk_size
+    for test_id in test_ids:
+        closed[test_id] = 0
+        while True:
+            ids = db.scalars(
+                select(Attempt.id)
+                .where(Attempt.test_id == test_id, *overdue)
+                .order_by(Attempt.id)
+                .limit(size)
+            ).all()
+            if not ids:
+                break
+            # Answers still buffered in Redis count, as they would on a manual submit.
+            flush_attempts(db, ids, closing=True)
+            closed[test_id] += finalize_attempts(db, test_id, ids)
+            db.commit()
+            if len(ids) < size:
+                break
+    return closed
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import csv
+import io
+import os
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any, Literal
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from zenith_api.config import settings
+from zenith_api.db.models import Attempt, AttemptAnswer, Question, QuestionOption, Test, User
+from zenith_api.jobs import fail_job, finish_job, set_job_progress, set_job_total
+
+# Result exports, one CSV row per answer or per attempt, for a test or a whole batch.
+# Rows come off a server-side cursor export_chunk_rows at a time and are encoded
+# chunk by chunk, so memory stays flat however many rows there are. Answer rows are
+# not sorted: ordering millions of them would make Postgres sort before the first byte.
+
+Kind = Literal["answers", "scores"]
+Scope = Literal["test", "batch"]
+
+_BOM = "\ufeff"  # lets Excel detect UTF-8
+
+ANSWER_COLUMNS = [
+    "test_id",
+    "test_title",
+    "attempt_id",
+    "user_id",
+    "email",
+    "submitted_at",
+    "score",
+    "question_id",
+    "question_position",
+    "section",
+    "selected_position",
+    "is_correct",
+]
+SCORE_COLUMNS = [
+    "test_id",
+    "test_title",
+    "attempt_id",
+    "user_id",
+    "email",
+    "started_at",
+    "submitted_at",
+    "score",
+    "max_score",
+    "correct",
+    "incorrect",
+    "unattempted",
+]
+
+
+def _in_scope(scope: Scope, scope_id: uuid.UUID) -> Any:
+    return Test.id == scope_id if scope == "test" else Test.batch_id == scope_id
+
+
+def _answers_query(scope: Scope, scope_id: uuid.UUID) -> Select[Any]:
+    return (
+        select(
+            Test.id,
+            Test.title,
+            Attempt.id,
+            Attempt.user_id,
+            User.email,
+            Attempt.submitted_at,
+            Attempt.score,
+            Question.id,
+            Question.position,
+            Question.section,
+            QuestionOption.position,
+            QuestionOption.is_correct,
+        )
+        .select_from(AttemptAnswer)
+        .join(Attempt, Attempt.id == AttemptAnswer.attempt_id)
+        .join(Test, Test.id == Attempt.test_id)
+        .join(User, User.id == Attempt.user_id)
+        .join(Question, Question.id == AttemptAnswer.question_id)
+        .outerjoin(QuestionOption, QuestionOption.id == AttemptAnswer.selected_option_id)
+        .where(_in_scope(scope, scope_id))
+    )
+
+
+def _scores_query(scope: Scope, scope_id: uuid.UUID) -> Select[Any]:
+    breakdown = Attempt.score_breakdown
+    return (
+        select(
+            Test.id,
+            Test.title,
+            Attempt.id,
+            Attempt.user_id,
+            User.email,
+            Attempt.created_at,
+            Attempt.submitted_at,
+            Attempt.score,
+            breakdown["max_score"].astext,
+            breakdown["correct"].astext,
+            breakdown["incorrect"].astext,
+            breakdown["unattempted"].astext,
+        )
+        .join(Test, Test.id == Attempt.test_id)
+        .join(User, User.id == Attempt.user_id)
+        .where(_in_scope(scope, scope_id))
+        .order_by(Test.id, Attempt.score.desc().nulls_last(), Attempt.id)
+    )
+
+
+def _count_query(kind: Kind, scope: Scope, scope_id: uuid.UUID) -> Select[Any]:
+    stmt = select(func.count()).select_from(Attempt).join(Test, Test.id == Attempt.test_id)
+    if kind == "answers":
+        stmt = stmt.join(AttemptAnswer, AttemptAnswer.attempt_id == Attempt.id)
+    return stmt.where(_in_scope(scope, scope_id))
+
+
+def _cell(value: Any) -> Any:
+    # Text starting like a formula would run as one in a spreadsheet.
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+
+def _encoded_chunks(
+    db: Session, kind: Kind, scope: Scope, scope_id: uuid.UUID
+) -> Iterator[tuple[str, int]]:
+    # (CSV text, rows in it); the header goes out with the first chunk.
+    query = _answers_query if kind == "answers" else _scores_query
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write(_BOM)
+    writer.writerow(ANSWER_COLUMNS if kind == "answers" else SCORE_COLUMNS)
+    result = db.execute(
+        query(scope, scope_id).execution_options(yield_per=settings.export_chunk_rows)
+    )
+    for rows in result.partitions():
+        writer.writerows([_cell(v) for v in row] for row in rows)
+        yield buf.getvalue(), len(rows)
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue(), 0
+
+
+def stream_csv(
+    session_factory: Callable[[], Session], kind: Kind, scope: Scope, scope_id: uuid.UUID
+) -> Iterator[bytes]:
+    # Opens its own session: a streamed body is still being produced after the
+    # request's dependencies have been torn down.
+    with session_factory() as db:
+        for text, _ in _encoded_chunks(db, kind, scope, scope_id):
+            yield text.encode()
+
+
+def export_path(job_id: uuid.UUID) -> Path:
+    return Path(settings.export_dir) / f"{job_id}.csv"
+
+
+def run_export(
+    db: Session,
+    read_db: Session,
+    job_id: uuid.UUID,
+    kind: Kind,
+    scope: Scope,
+    scope_id: uuid.UUID,
+) -> dict[str, Any]:
+    # Streams from read_db into export_dir while db records progress; the file only
+    # appears under its final name once complete.
+    path = export_path(job_id)
+    partial = path.with_suffix(".partial")
+    try:
+        set_job_total(db, job_id, read_db.scalar(_count_query(kind, scope, scope_id)) or 0)
+        db.commit()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rows = 0
+        with partial.open("w", encoding="utf-8", newline="") as f:
+            for text, n in _encoded_chunks(read_db, kind, scope, scope_id):
+                f.write(text)
+                rows += n
+                set_job_progress(db, job_id, rows)
+                db.commit()
+        os.replace(partial, path)
+    except Exception as e:
+        partial.unlink(missing_ok=True)
+        fail_job(db, job_id, str(e))
+        raise
+
+    out = {"file": path.name, "rows": rows, "bytes": path.stat().st_size, "kind": kind}
+    finish_job(db, job_id, out)
+    return out
+
+
+def purge_exports(retention_seconds: float) -> int:
+    # Deletes exports, and .partial files left by crashed workers, not written to for
+    # retention_seconds; downloads of them then get 410. Returns how many went.
+    root = Path(settings.export_dir)
+    if not root.is_dir():
+        return 0
+    cutoff = time.time() - retention_seconds
+    removed = 0
+    for path in [*root.glob("*.csv"), *root.glob("*.partial")]:
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass  # another worker's purge got it first
+    return removed
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from zenith_api.config import settings
+from zenith_api.db.models import Attempt, Test
+from zenith_api.redis_client import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+# One Redis sorted set per test (member user_id, score the attempt score) and per
+# batch (score the user's total over the batch's tests). Ranks and neighbourhoods are
+# O(log N) reads; Postgres is only consulted to rebuild a board Redis lost.
+#
+# A board's key also holds two sentinels at -inf: "_" from the moment a rebuild
+# claims it and "_ready" once the rebuild is done. Submits update any board that
+# exists, so scores committed while a rebuild reads Postgres are not lost; readers
+# wait for "_ready".
+
+Kind = Literal["test", "batch"]
+
+_CLAIM = "_"
+_READY = "_ready"
+_SENTINELS = 2
+
+# Applied on submit. Boards that don't exist are left alone: the next read rebuilds
+# them from Postgres, which already has this score. Reads and submits both push a
+# board's expiry back, so only boards nobody uses age out.
+_UPDATE_LUA = """
+for i, key in ipairs(KEYS) do
+  if redis.call('EXISTS', key) == 1 then
+    redis.call('ZADD', key, ARGV[i + 2], ARGV[1])
+    redis.call('EXPIRE', key, ARGV[2])
+  end
+end
+"""
+
+_CLAIM_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  return 0
+end
+redis.call('ZADD', KEYS[1], '-inf', ARGV[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# One round trip for a neighbourhood: {board size, window start index, count strictly
+# above the window's first row, [member, score, ...]}, or nil when not on the board.
+_AROUND_LUA = """
+local index = redis.call('ZREVRANK', KEYS[1], ARGV[1])
+if not index then
+  return nil
+end
+local start = math.max(0, index - tonumber(ARGV[2]))
+local rows = redis.call('ZREVRANGE', KEYS[1], start, index + tonumber(ARGV[2]), 'WITHSCORES')
+local above = redis.call('ZCOUNT', KEYS[1], '(' .. rows[2], '+inf')
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {redis.call('ZCARD', KEYS[1]), start, above, rows}
+"""
+
+
+class LeaderboardBuildingError(Exception):
+    # Another request is rebuilding the board; retry shortly.
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class Entry:
+    user_id: uuid.UUID
+    score: int
+    rank: int
+
+
+def board_key(kind: Kind, board_id: uuid.UUID) -> str:
+    return f"lb:{kind}:{board_id}"
+
+
+def _with_ranks(rows: list[tuple[str, float]], first_rank: int, offset: int) -> list[Entry]:
+    # rows come best-first from ZREVRANGE starting at index `offset`. Competition
+    # ranking: ties share the rank of the first of them.
+    out: list[Entry] = []
+    rank = first_rank
+    prev: float | None = None
+    for i, (member, score) in enumerate(rows):
+        if member.startswith("_"):
+            continue
+        if prev is not None and score != prev:
+            rank = offset + i + 1
+        prev = score
+        out.append(Entry(user_id=uuid.UUID(member), score=int(score), rank=rank))
+    return out
+
+
+async def _board_rows(db: AsyncSession, kind: Kind, board_id: uuid.UUID) -> list[Any]:
+    if kind == "test":
+        stmt = select(Attempt.user_id, Attempt.score).where(
+            Attempt.test_id == board_id, Attempt.submitted_at.is_not(None)
+        )
+    else:
+        stmt = (
+            select(Attempt.user_id, func.sum(Attempt.score))
+            .join(Test, Test.id == Attempt.test_id)
+            .where(Test.batch_id == board_id, Attempt.submitted_at.is_not(None))
+            .group_by(Attempt.user_id)
+        )
+    return list((await db.execute(stmt)).tuples().all())
+
+
+async def _ensure_board(db: AsyncSession, kind: Kind, board_id: uuid.UUID) -> str:
+    key = board_key(kind, board_id)
+    r = get_async_redis()
+    if await r.zscore(key, _READY) is not None:
+        return key
+
+    # One reader rebuilds; the claim expires if it dies part-way.
+    claim = r.register_script(_CLAIM_LUA)
+    timeout_ms = settings.leaderboard_build_timeout_seconds * 1000
+    if not await claim(keys=[key], args=[_CLAIM, timeout_ms]):
+        raise LeaderboardBuildingError
+
+    try:
+        rows = await _board_rows(db, kind, board_id)
+        size = settings.leaderboard_build_chunk_size
+        for i in range(0, len(rows), size):
+            await r.zadd(key, {str(uid): score or 0 for uid, score in rows[i : i + size]})
+        async with r.pipeline(transaction=True) as pipe:
+            pipe.zadd(key, {_READY: float("-inf")})
+            pipe.expire(key, settings.leaderboard_ttl_seconds)
+            await pipe.execute()
+    except BaseException:
+        await r.delete(key)
+        raise
+    return key
+
+
+async def top(
+    db: AsyncSession, kind: Kind, board_id: uuid.UUID, n: int
+) -> tuple[int, list[Entry]]:
+    # (number of users on the board, the best n).
+    key = await _ensure_board(db, kind, board_id)
+    async with get_async_redis().pipeline(transaction=False) as pipe:
+        pipe.zcard(key)
+        pipe.zrevrange(key, 0, n - 1, withscores=True)
+        pipe.expire(key, settings.leaderboard_ttl_seconds)
+        size, rows, _ = await pipe.execute()
+    return size - _SENTINELS, _with_ranks(rows, 1, 0)
+
+
+async def around(
+    db: AsyncSession, kind: Kind, board_id: uuid.UUID, user_id: uuid.UUID, k: int
+) -> tuple[int, Entry, list[Entry]] | None:
+    # (board size, the user's entry, up to k users either side), or None if the user
+    # has no score on the board.
+    key = await _ensure_board(db, kind, board_id)
+    script = get_async_redis().register_script(_AROUND_LUA)
+    found = await script(keys=[key], args=[str(user_id), k, settings.leaderboard_ttl_seconds])
+    if found is None:
+        return None
+    size, start, above, flat = found
+    rows = [(flat[i], float(flat[i + 1])) for i in range(0, len(flat), 2)]
+    entries = _with_ranks(rows, above + 1, start)
+    me = next(e for e in entries if e.user_id == user_id)
+    return size - _SENTINELS, me, entries
+
+
+async def record_submission(
+    db: AsyncSession, test_id: uuid.UUID, batch_id: uuid.UUID, user_id: uuid.UUID, score: int
+) -> None:
+    # After the submit commits. Writes absolute scores, so a retried submit or one
+    # racing a rebuild converges on what Postgres holds. Boards nobody has read are
+    # skipped, and so is the batch total they would need: a board built after this
+    # check reads the committed score from Postgres.
+    test_key, batch_key = board_key("test", test_id), board_key("batch", batch_id)
+    try:
+        r = get_async_redis()
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.exists(test_key)
+            pipe.exists(batch_key)
+            has_test, has_batch = await pipe.execute()
+        keys: list[str] = []
+        args: list[str | int] = [str(user_id), settings.leaderboard_ttl_seconds]
+        if has_test:
+            keys.append(test_key)
+            args.append(score)
+        if has_batch:
+            total = await db.scalar(
+                select(func.sum(Attempt.score))
+                .join(Test, Test.id == Attempt.test_id)
+                .where(
+                    Attempt.user_id == user_id,
+                    Test.batch_id == batch_id,
+                    Attempt.submitted_at.is_not(None),
+                )
+            )
+            keys.append(batch_key)
+            args.append(total or 0)
+        if keys:
+            update = r.register_script(_UPDATE_LUA)
+            await update(keys=keys, args=args)
+    except RedisError:
+        # The board is behind until it expires or is invalidated; the score is safe.
+        logger.warning("leaderboard update failed", exc_info=True)
+
+
+def invalidate_boards(test_id: uuid.UUID, batch_id: uuid.UUID) -> None:
+    # After scores change in bulk (regrade); the next read rebuilds both boards.
+    try:
+        get_redis().delete(board_key("test", test_id), board_key("batch", batch_id))
+    except RedisError:
+        logger.warning("leaderboard invalidation failed", exc_info=True)
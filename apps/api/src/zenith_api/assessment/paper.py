@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from zenith_api.cache import LRUCache
+from zenith_api.config import settings
+from zenith_api.db.models import Question, QuestionOption, Test
+from zenith_api.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# How long other workers wait for the worker holding the build lock before
+# building the paper themselves.
+_PEER_WAIT_SECONDS = 2.0
+_PEER_POLL_SECONDS = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class PaperSnapshot:
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+    @classmethod
+    def from_json(cls, raw: str) -> PaperSnapshot:
+        body = raw.encode()
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        return cls(body=body, gzip_body=gzip.compress(body, mtime=0), etag=f'"{digest}"')
+
+
+_local: LRUCache[tuple[uuid.UUID, int], PaperSnapshot] = LRUCache(
+    settings.paper_cache_size, name="paper"
+)
+_build_locks: dict[tuple[uuid.UUID, int], asyncio.Lock] = {}
+
+
+def _redis_key(test_id: uuid.UUID, version: int) -> str:
+    return f"paper:v2:{test_id}:{version}"
+
+
+async def build_paper(db: AsyncSession, test: Test) -> str:
+    rows = (
+        await db.execute(
+            select(
+                Question.id,
+                Question.position,
+                Question.prompt,
+                Question.section,
+                Question.marks_correct,
+                Question.marks_incorrect,
+                QuestionOption.id,
+                QuestionOption.position,
+                QuestionOption.text,
+            )
+            .outerjoin(QuestionOption, QuestionOption.question_id == Question.id)
+            .where(Question.test_id == test.id)
+            .order_by(Question.position, Question.id, QuestionOption.position)
+        )
+    ).tuples()
+
+    # Never include is_correct: this is what students download. Marks are the ones
+    # scoring applies: the question's own, else the test's.
+    questions: dict[uuid.UUID, dict[str, Any]] = {}
+    for (
+        question_id,
+        position,
+        prompt,
+        section,
+        marks_correct,
+        marks_incorrect,
+        option_id,
+        option_position,
+        text,
+    ) in rows:
+        q = questions.get(question_id)
+        if q is None:
+            q = questions[question_id] = {
+                "id": str(question_id),
+                "position": position,
+                "prompt": prompt,
+                "section": section,
+                "marks_correct": test.marks_correct if marks_correct is None else marks_correct,
+                "marks_incorrect": (
+                    test.marks_incorrect if marks_incorrect is None else marks_incorrect
+                ),
+                "options": [],
+            }
+        if option_id is not None:
+            q["options"].append({"id": str(option_id), "position": option_position, "text": text})
+
+    return json.dumps(
+        {
+            "test_id": str(test.id),
+            "title": test.title,
+            "version": test.content_version,
+            "starts_at": test.starts_at.isoformat() if test.starts_at else None,
+            "ends_at": test.ends_at.isoformat() if test.ends_at else None,
+            "questions": list(questions.values()),
+        },
+        separators=(",", ":"),
+    )
+
+
+async def _load_or_build(db: AsyncSession, test: Test) -> str:
+    if not settings.redis_cache_enabled:
+        return await build_paper(db, test)
+
+    key = _redis_key(test.id, test.content_version)
+    r = get_async_redis()
+    try:
+        raw: str | None = await r.get(key)
+        if raw is not None:
+            return raw
+        # Only one worker renders a missing paper; the rest wait for its result.
+        if not await r.set(f"{key}:lock", 1, nx=True, px=int(_PEER_WAIT_SECONDS * 1000)):
+            for _ in range(int(_PEER_WAIT_SECONDS / _PEER_POLL_SECONDS)):
+                await asyncio.sleep(_PEER_POLL_SECONDS)
+                raw = await r.get(key)
+                if raw is not None:
+                    return raw
+    except RedisError:
+        logger.warning("paper cache read failed", exc_info=True)
+        return await build_paper(db, test)
+
+    raw = await build_paper(db, test)
+    try:
+        await r.set(key, raw, ex=settings.paper_redis_ttl_seconds)
+        await r.delete(f"{key}:lock")
+    except RedisError:
+        logger.warning("paper cache write failed", exc_info=True)
+    return raw
+
+
+async def get_paper(db: AsyncSession, test: Test) -> PaperSnapshot:
+    # Papers are immutable per (test, content_version), like answer keys.
+    key = (test.id, test.content_version)
+    snapshot = _local.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    # Coalesce concurrent misses in this worker into a single build.
+    lock = _build_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            snapshot = _local.get(key)
+            if snapshot is None:
+                snapshot = PaperSnapshot.from_json(await _load_or_build(db, test))
+                _local.set(key, snapshot)
+    finally:
+        _build_locks.pop(key, None)
+    return snapshot
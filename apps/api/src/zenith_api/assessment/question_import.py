@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import csv
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import IO, Any
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from zenith_api.routers.tests_schemas import QuestionCreateRequest
+
+# Per-row errors beyond this are counted but not returned.
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass(frozen=True, slots=True)
+class RowError:
+    row: int
+    msg: str
+
+
+def _validation_msg(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+    )
+
+
+def parse_jsonl(lines: Iterable[str]) -> Iterator[tuple[int, QuestionCreateRequest | str]]:
+    # One QuestionCreateRequest object per line; blank lines are skipped.
+    for row, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row, QuestionCreateRequest.model_validate_json(line)
+        except ValidationError as e:
+            yield row, _validation_msg(e)
+
+
+def parse_csv(stream: IO[str]) -> Iterator[tuple[int, QuestionCreateRequest | str]]:
+    # Header: prompt,position,correct_position,option_1,option_2,...; an option's
+    # position is its column number and empty option cells are ignored. Several correct
+    # positions are separated by ";". Optional: section, marks_correct, marks_incorrect.
+    reader = csv.DictReader(stream)
+    fields = reader.fieldnames or []
+    option_cols = sorted(
+        (int(f.removeprefix("option_")), f)
+        for f in fields
+        if f.startswith("option_") and f.removeprefix("option_").isdigit()
+    )
+    # Data rows are numbered after the header line.
+    for row, rec in enumerate(reader, start=2):
+        correct = (rec.get("correct_position") or "").split(";")
+        data: dict[str, Any] = {
+            "prompt": rec.get("prompt"),
+            "position": rec.get("position"),
+            "correct_positions": [c for c in correct if c.strip()] or None,
+            "options": [
+                {"text": rec[col], "position": pos} for pos, col in option_cols if rec.get(col)
+            ],
+            "section": rec.get("section") or None,
+            "marks_correct": rec.get("marks_correct") or None,
+            "marks_incorrect": rec.get("marks_incorrect") or None,
+        }
+        try:
+            yield row, QuestionCreateRequest.model_validate(data)
+        except ValidationError as e:
+            yield row, _validation_msg(e)
+
+
+def validate_questions(
+    parsed: Iterable[tuple[int, QuestionCreateRequest | str]],
+    existing_positions: set[int],
+    max_rows: int,
+) -> tuple[list[QuestionCreateRequest], list[RowError], int]:
+    # Checks the whole upload before anything is written; returns the questions, the
+    # first MAX_REPORTED_ERRORS errors, and the total error count.
+    questions: list[QuestionCreateRequest] = []
+    errors: list[RowError] = []
+    error_count = 0
+    seen = set(existing_positions)
+
+    def fail(row: int, msg: str) -> None:
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append(RowError(row=row, msg=msg))
+
+    for row, q in parsed:
+        if isinstance(q, str):
+            fail(row, q)
+            continue
+        if len(questions) >= max_rows:
+            fail(row, f"import is limited to {max_rows} questions")
+            break
+        option_positions = [o.position for o in q.options]
+        if not q.prompt.strip():
+            fail(row, "prompt is empty")
+        elif not q.options:
+            fail(row, "options required")
+        elif len(set(option_positions)) != len(option_positions):
+            fail(row, "duplicate option position")
+        elif not q.correct_set() <= set(option_positions):
+            fail(row, "correct_position does not match an option")
+        elif "\x00" in q.prompt + (q.section or "") or any("\x00" in o.text for o in q.options):
+            fail(row, "text contains a NUL character")
+        elif q.position in seen:
+            fail(row, f"position {q.position} is already used")
+        else:
+            seen.add(q.position)
+            questions.append(q)
+    return questions, errors, error_count
+
+
+def copy_questions(db: Session, test_id: uuid.UUID, questions: list[QuestionCreateRequest]) -> int:
+    # COPY into both tables on the session's own connection, so it shares the caller's
+    # transaction; the caller commits.
+    raw = db.connection().connection.driver_connection
+    assert raw is not None
+    question_rows: list[tuple[Any, ...]] = []
+    option_rows: list[tuple[uuid.UUID, uuid.UUID, str, int, bool]] = []
+    for q in questions:
+        question_id = uuid.uuid4()
+        question_rows.append(
+            (
+                question_id,
+                test_id,
+                q.prompt,
+                q.position,
+                q.section,
+                q.marks_correct,
+                q.marks_incorrect,
+            )
+        )
+        correct = q.correct_set()
+        option_rows.extend(
+            (uuid.uuid4(), question_id, o.text, o.position, o.position in correct)
+            for o in q.options
+        )
+
+    with raw.cursor() as cur:
+        with cur.copy(
+            "COPY questions (id, test_id, prompt, position, section, marks_correct,"
+            " marks_incorrect) FROM STDIN"
+        ) as copy:
+            for qr in question_rows:
+                copy.write_row(qr)
+        with cur.copy(
+            "COPY question_options (id, question_id, text, position, is_correct) FROM STDIN"
+        ) as copy:
+            for orow in option_rows:
+                copy.write_row(orow)
+    return len(question_rows)
+
+
+def error_detail(errors: list[RowError], error_count: int) -> dict[str, Any]:
+    return {
+        "error_count": error_count,
+        "errors": [{"row": e.row, "msg": e.msg} for e in errors],
+    }
+
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, cast
+
+from sqlalchemy import (
+    CursorResult,
+    Integer,
+    Select,
+    Update,
+    and_,
+    case,
+    func,
+    or_,
+    select,
+    true,
+    update,
+)
+from sqlalchemy import cast as sql_cast
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from zenith_api.db.models import Attempt, AttemptAnswer, Question, QuestionOption, Test
+
+# Scoring is one aggregate query over (attempt x question), so grading one attempt
+# at submit and re-grading every attempt of a test after an answer-key fix are the
+# same statement with a different filter.
+#
+# A question is correct when the selected option is marked correct (several options
+# may be, e.g. after a key correction accepts two answers), incorrect when another
+# option is selected, and unattempted otherwise. Marks come from the question, else
+# the test.
+
+
+EMPTY_BREAKDOWN: dict[str, Any] = {
+    "max_score": 0,
+    "correct": 0,
+    "incorrect": 0,
+    "unattempted": 0,
+    "sections": [],
+}
+
+
+def _scores(test_id: uuid.UUID, attempt_ids: Select[tuple[uuid.UUID]]) -> Select[Any]:
+    # One row per attempt: (attempt_id, score, breakdown JSON).
+    marks = (
+        select(
+            Question.id.label("question_id"),
+            Question.section.label("section"),
+            func.coalesce(Question.marks_correct, Test.marks_correct).label("correct_marks"),
+            func.coalesce(Question.marks_incorrect, Test.marks_incorrect).label(
+                "incorrect_marks"
+            ),
+        )
+        .join(Test, Test.id == Question.test_id)
+        .where(Question.test_id == test_id)
+        .subquery()
+    )
+    attempts = attempt_ids.subquery()
+    is_correct = QuestionOption.is_correct
+    sections = (
+        select(
+            attempts.c.id.label("attempt_id"),
+            marks.c.section,
+            func.sum(
+                case(
+                    (is_correct.is_(True), marks.c.correct_marks),
+                    (is_correct.is_(False), marks.c.incorrect_marks),
+                    else_=0,
+                )
+            ).label("score"),
+            func.sum(marks.c.correct_marks).label("max_score"),
+            func.count().filter(is_correct.is_(True)).label("correct"),
+            func.count().filter(is_correct.is_(False)).label("incorrect"),
+            func.count().filter(is_correct.is_(None)).label("unattempted"),
+        )
+        .select_from(attempts)
+        .join(marks, true())
+        .outerjoin(
+            AttemptAnswer,
+            and_(
+                AttemptAnswer.attempt_id == attempts.c.id,
+                AttemptAnswer.question_id == marks.c.question_id,
+            ),
+        )
+        .outerjoin(QuestionOption, QuestionOption.id == AttemptAnswer.selected_option_id)
+        .group_by(attempts.c.id, marks.c.section)
+        .subquery()
+    )
+    section_json = func.jsonb_build_object(
+        "section",
+        sections.c.section,
+        "score",
+        sections.c.score,
+        "max_score",
+        sections.c.max_score,
+        "correct",
+        sections.c.correct,
+        "incorrect",
+        sections.c.incorrect,
+        "unattempted",
+        sections.c.unattempted,
+    )
+    return select(
+        sections.c.attempt_id,
+        sql_cast(func.sum(sections.c.score), Integer).label("score"),
+        func.jsonb_build_object(
+            "max_score",
+            func.sum(sections.c.max_score),
+            "correct",
+            func.sum(sections.c.correct),
+            "incorrect",
+            func.sum(sections.c.incorrect),
+            "unattempted",
+            func.sum(sections.c.unattempted),
+            "sections",
+            func.jsonb_agg(aggregate_order_by(section_json, sections.c.section.nulls_first())),
+        ).label("breakdown"),
+    ).group_by(sections.c.attempt_id)
+
+
+def _apply(
+    test_id: uuid.UUID, attempt_ids: Select[tuple[uuid.UUID]], *, only_changed: bool = False
+) -> Update:
+    scores = _scores(test_id, attempt_ids).subquery()
+    stmt = (
+        update(Attempt)
+        .where(Attempt.id == scores.c.attempt_id)
+        .values(score=scores.c.score, score_breakdown=scores.c.breakdown)
+        .execution_options(synchronize_session=False)
+    )
+    if only_changed:
+        # Re-grades leave untouched rows alone: no row lock, no new tuple, no WAL.
+        stmt = stmt.where(
+            or_(
+                Attempt.score.is_distinct_from(scores.c.score),
+                Attempt.score_breakdown.is_distinct_from(scores.c.breakdown),
+            )
+        )
+    return stmt
+
+
+async def submit_and_score(
+    db: AsyncSession, test_id: uuid.UUID, attempt_id: uuid.UUID, submitted_at: datetime
+) -> tuple[int, dict[str, Any]] | None:
+    # Marks the attempt submitted and stores its score in one statement; the caller
+    # commits. A test without questions scores 0. None when the attempt was submitted
+    # meanwhile (e.g. by the deadline sweep), whose score then stands.
+    attempt_ids = select(Attempt.id).where(Attempt.id == attempt_id, Attempt.test_id == test_id)
+    row = (
+        await db.execute(
+            _apply(test_id, attempt_ids)
+            .where(Attempt.submitted_at.is_(None))
+            .values(submitted_at=submitted_at)
+            .returning(Attempt.score, Attempt.score_breakdown)
+        )
+    ).first()
+    if row is not None:
+        return int(row.score), dict(row.score_breakdown)
+
+    unscored = cast(
+        CursorResult[Any],
+        await db.execute(
+            update(Attempt)
+            .where(Attempt.id == attempt_id, Attempt.submitted_at.is_(None))
+            .values(submitted_at=submitted_at, score=0, score_breakdown=EMPTY_BREAKDOWN)
+            .execution_options(synchronize_session=False)
+        ),
+    )
+    if unscored.rowcount == 0:
+        return None
+    return 0, dict(EMPTY_BREAKDOWN)
+
+
+def finalize_attempts(db: Session, test_id: uuid.UUID, attempt_ids: Sequence[uuid.UUID]) -> int:
+    # Submits the given attempts as of their deadline and scores them in one UPDATE,
+    # skipping any submitted meanwhile; the caller commits. Returns how many it closed.
+    open_ids = select(Attempt.id).where(
+        Attempt.test_id == test_id,
+        Attempt.id.in_(attempt_ids),
+        Attempt.submitted_at.is_(None),
+    )
+    scored = cast(
+        CursorResult[Any],
+        db.execute(
+            _apply(test_id, open_ids)
+            .where(Attempt.submitted_at.is_(None))
+            .values(submitted_at=Attempt.deadline_at)
+        ),
+    )
+    # Without questions there is nothing to aggregate, so those are still open.
+    unscored = cast(
+        CursorResult[Any],
+        db.execute(
+            update(Attempt)
+            .where(Attempt.id.in_(open_ids))
+            .values(submitted_at=Attempt.deadline_at, score=0, score_breakdown=EMPTY_BREAKDOWN)
+            .execution_options(synchronize_session=False)
+        ),
+    )
+    return scored.rowcount + unscored.rowcount
+
+
+def rescore_attempts(db: Session, test_id: uuid.UUID, attempt_ids: Sequence[uuid.UUID]) -> int:
+    # Re-grades the given submitted attempts in one UPDATE ... FROM (aggregate), for
+    # chunked re-grades; idempotent. Returns the number of scores that changed; the
+    # caller commits.
+    ids = select(Attempt.id).where(
+        Attempt.test_id == test_id,
+        Attempt.id.in_(attempt_ids),
+        Attempt.submitted_at.is_not(None),
+    )
+    result = cast(CursorResult[Any], db.execute(_apply(test_id, ids, only_changed=True)))
+    return result.rowcount
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from zenith_api.cache import LRUCache
+from zenith_api.config import settings
+from zenith_api.db.models import Test
+
+
+@dataclass(frozen=True, slots=True)
+class TestWindow:
+    test_id: uuid.UUID
+    organization_id: uuid.UUID
+    batch_id: uuid.UUID
+    starts_at: datetime | None
+    ends_at: datetime | None
+    duration_minutes: int | None
+
+    def deadline_for(self, started_at: datetime) -> datetime | None:
+        # The earlier of the student's own time limit and the end of the window.
+        ends = [self.ends_at] if self.ends_at else []
+        if self.duration_minutes:
+            ends.append(started_at + timedelta(minutes=self.duration_minutes))
+        return min(ends) if ends else None
+
+
+# Everyone in a batch starts the same test at once, so its window is read from
+# memory; the short TTL bounds how long an edited schedule can go unnoticed.
+_windows: LRUCache[uuid.UUID, TestWindow] = LRUCache(
+    settings.test_window_cache_size, ttl=settings.test_window_cache_ttl_seconds, name="test_window"
+)
+
+
+async def get_test_window(db: AsyncSession, test_id: uuid.UUID) -> TestWindow | None:
+    window = _windows.get(test_id)
+    if window is not None:
+        return window
+
+    row = (
+        await db.execute(
+            select(
+                Test.organization_id,
+                Test.batch_id,
+                Test.starts_at,
+                Test.ends_at,
+                Test.duration_minutes,
+            ).where(Test.id == test_id)
+        )
+    ).tuples().first()
+    if row is None:
+        return None
+    organization_id, batch_id, starts_at, ends_at, duration_minutes = row
+    window = TestWindow(
+        test_id=test_id,
+        organization_id=organization_id,
+        batch_id=batch_id,
+        starts_at=starts_at,
+        ends_at=ends_at,
+        duration_minutes=duration_minutes,
+    )
+    _windows.set(test_id, window)
+    return window
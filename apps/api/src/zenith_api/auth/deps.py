@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -14,10 +17,35 @@ from zenith_api.db.session import get_db
 bearer = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
+@dataclass(frozen=True, slots=True)
+class Principal:
+    # Identity taken from a verified access token; no database row behind it.
+    user_id: uuid.UUID
+    org_roles: Mapping[uuid.UUID, str] = field(default_factory=dict)
+
+    def load_user(self, db: Session) -> User:
+        user = db.get(User, self.user_id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        return user
+
+
+def _org_roles_claim(payload: dict[str, Any]) -> dict[uuid.UUID, str]:
+    raw = payload.get("orgs")
+    if not isinstance(raw, dict):
+        return {}
+    try:
+        return {uuid.UUID(org_id): str(role) for org_id, role in raw.items()}
+    except ValueError:
+        return {}
+
+
+async def get_principal(
     creds: HTTPAuthorizationCredentials | None = Depends(bearer),
-    db: Session = Depends(get_db),
-) -> User:
+) -> Principal:
     if creds is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,10 +82,24 @@ def get_current_user(
             detail="Invalid token subject",
         ) from None
 
-    user = db.scalar(select(User).where(User.id == user_id))
-    if user is None:
+    return Principal(user_id=user_id, org_roles=_org_roles_claim(payload))
+
+
+def get_verified_principal(
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db),
+) -> Principal:
+    # Same as get_principal, plus a primary-key probe so deleted users are rejected.
+    if db.scalar(select(User.id).where(User.id == principal.user_id)) is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    return user
+    return principal
+
+
+def get_current_user(
+    principal: Principal = Depends(get_principal),
+    db: Session = Depends(get_db),
+) -> User:
+    return principal.load_user(db)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from fastapi import HTTPException, status
+
+from zenith_api.auth.security import hash_password, verify_and_rehash
+from zenith_api.config import settings
+from zenith_api.metrics import PASSWORD_HASH_PENDING, PASSWORD_HASH_SHED
+
+logger = logging.getLogger(__name__)
+
+# Argon2 is CPU- and memory-bound by design. Running it on a few dedicated processes
+# caps how much of the machine a login storm can take, and leaves the event loop and
+# request threads free for everything else.
+_lock = threading.Lock()
+_executor: ProcessPoolExecutor | None = None
+_pending = 0
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            # Spawned, not forked: the API process has threads and open connections.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def start_hash_pool() -> None:
+    if settings.password_hash_workers > 0:
+        _get_executor()
+
+
+def shutdown_hash_pool() -> None:
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins right now, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+@contextmanager
+def _slot() -> Iterator[Executor | None]:
+    # Once max_pending hashes are queued or running, new ones are shed at once rather
+    # than queueing behind work that would outlast the client's timeout. Yields the
+    # process pool, or None when hashing runs on threads (password_hash_workers = 0).
+    global _pending
+    with _lock:
+        if _pending >= settings.password_hash_max_pending:
+            PASSWORD_HASH_SHED.inc()
+            raise _busy()
+        _pending += 1
+        PASSWORD_HASH_PENDING.inc()
+    try:
+        yield _get_executor() if settings.password_hash_workers > 0 else None
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); start a fresh pool for the next request.
+        logger.warning("password hash pool broke, restarting it", exc_info=True)
+        shutdown_hash_pool()
+        raise _busy() from None
+    finally:
+        with _lock:
+            _pending -= 1
+            PASSWORD_HASH_PENDING.dec()
+
+
+async def _run_async[T](fn: Callable[..., T], *args: str) -> T:
+    with _slot() as executor:
+        # argon2-cffi releases the GIL, so the thread fallback still runs in parallel.
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_async(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    # Returns (ok, new_hash); new_hash is set when the stored hash should be replaced.
+    return await _run_async(verify_and_rehash, password, hashed_password)
+
+
+def hash_password_pooled(password: str) -> str:
+    # For sync endpoints, which already run on a worker thread.
+    with _slot() as executor:
+        if executor is None:
+            return hash_password(password)
+        return executor.submit(hash_password, password).result()
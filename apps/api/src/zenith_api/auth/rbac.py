@@ -1,82 +1,215 @@
 from __future__ import annotations
 
+import logging
 import uuid
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import cache
+from typing import cast
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy import select
+from redis.exceptions import RedisError
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from zenith_api.auth.deps import get_current_user
-from zenith_api.db.models import Batch, BatchMember, Membership, Role, User
-from zenith_api.db.session import get_db
+from zenith_api.auth.deps import Principal, get_principal, get_verified_principal
+from zenith_api.cache import LRUCache
+from zenith_api.config import settings
+from zenith_api.db.models import Batch, BatchMember, Membership, Role
+from zenith_api.db.session import get_async_db, get_db
+from zenith_api.redis_client import get_async_redis, get_redis
 
+logger = logging.getLogger(__name__)
 
-def require_org_role(*allowed_roles: str) -> Callable[..., Membership]:
+
+@dataclass(frozen=True, slots=True)
+class OrgMember:
+    organization_id: uuid.UUID
+    user_id: uuid.UUID
+    role: str
+
+
+# (org_id, user_id) -> role code. Only positive results are cached so a newly added
+# member is visible immediately. Role changes go through invalidate_org_role, which
+# clears this process's copy and the shared Redis one; other workers' copies are not
+# told and age out, so they may honour the old role for up to
+# membership_local_ttl_seconds. The Redis copy lives for membership_cache_ttl_seconds.
+_role_cache: LRUCache[tuple[uuid.UUID, uuid.UUID], str] = LRUCache(
+    settings.membership_cache_size, ttl=settings.membership_local_ttl_seconds, name="org_role"
+)
+
+
+def _redis_key(org_id: uuid.UUID, user_id: uuid.UUID) -> str:
+    return f"membership:{org_id}:{user_id}"
+
+
+def _role_query(org_id: uuid.UUID, user_id: uuid.UUID) -> Select[tuple[str]]:
+    return (
+        select(Role.code)
+        .join(Membership, Membership.role_id == Role.id)
+        .where(
+            Membership.organization_id == org_id,
+            Membership.user_id == user_id,
+        )
+    )
+
+
+def get_org_role(db: Session, org_id: uuid.UUID, user_id: uuid.UUID) -> str | None:
+    role = _role_cache.get((org_id, user_id))
+    if role is not None:
+        return role
+
+    if settings.redis_cache_enabled:
+        try:
+            role = cast(str | None, get_redis().get(_redis_key(org_id, user_id)))
+        except RedisError:
+            logger.warning("membership cache read failed", exc_info=True)
+        if role is not None:
+            _role_cache.set((org_id, user_id), role)
+            return role
+
+    role = db.scalar(_role_query(org_id, user_id))
+    if role is None:
+        return None
+
+    _role_cache.set((org_id, user_id), role)
+    if settings.redis_cache_enabled:
+        try:
+            get_redis().set(
+                _redis_key(org_id, user_id), role, ex=settings.membership_cache_ttl_seconds
+            )
+        except RedisError:
+            logger.warning("membership cache write failed", exc_info=True)
+    return role
+
+
+async def get_org_role_async(
+    db: AsyncSession, org_id: uuid.UUID, user_id: uuid.UUID
+) -> str | None:
+    role = _role_cache.get((org_id, user_id))
+    if role is not None:
+        return role
+
+    if settings.redis_cache_enabled:
+        try:
+            role = cast(str | None, await get_async_redis().get(_redis_key(org_id, user_id)))
+        except RedisError:
+            logger.warning("membership cache read failed", exc_info=True)
+        if role is not None:
+            _role_cache.set((org_id, user_id), role)
+            return role
+
+    role = cast(str | None, await db.scalar(_role_query(org_id, user_id)))
+    if role is None:
+        return None
+
+    _role_cache.set((org_id, user_id), role)
+    if settings.redis_cache_enabled:
+        try:
+            await get_async_redis().set(
+                _redis_key(org_id, user_id), role, ex=settings.membership_cache_ttl_seconds
+            )
+        except RedisError:
+            logger.warning("membership cache write failed", exc_info=True)
+    return role
+
+
+def invalidate_org_role(org_id: uuid.UUID, user_id: uuid.UUID) -> None:
+    _role_cache.pop((org_id, user_id))
+    if settings.redis_cache_enabled:
+        try:
+            get_redis().delete(_redis_key(org_id, user_id))
+        except RedisError:
+            logger.warning("membership cache invalidation failed", exc_info=True)
+
+
+# Cached so equal role sets share one dependency callable, which FastAPI then
+# resolves at most once per request.
+@cache
+def require_org_role(*allowed_roles: str) -> Callable[..., OrgMember]:
     allowed = set(allowed_roles)
 
     def _dep(
         org_id: uuid.UUID,
         db: Session = Depends(get_db),
-        user: User = Depends(get_current_user),
-    ) -> Membership:
-        membership = db.scalar(
-            select(Membership).where(
-                Membership.organization_id == org_id,
-                Membership.user_id == user.id,
-            )
-        )
-        if membership is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Membership not found",
-            )
+        principal: Principal = Depends(get_verified_principal),
+    ) -> OrgMember:
+        role = None
+        if settings.jwt_embed_org_roles:
+            role = principal.org_roles.get(org_id)
+        if role is None:
+            role = get_org_role(db, org_id, principal.user_id)
+        return _org_member(org_id, principal, role, allowed)
 
+    return _dep
 
-        role = db.scalar(select(Role).where(Role.id == membership.role_id))
-        if role is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Role not found. Run seed.",
-            )
 
-        if role.code not in allowed:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN, 
-                detail="Forbidden"
-            )
+# Same check for async routes, without a threadpool hop or a sync session. It takes the
+# unverified principal: a deleted user's memberships are deleted with them, so the role
+# lookup stops admitting them once cached roles expire.
+@cache
+def require_org_role_async(*allowed_roles: str) -> Callable[..., Awaitable[OrgMember]]:
+    allowed = set(allowed_roles)
 
-        return membership
+    async def _dep(
+        org_id: uuid.UUID,
+        db: AsyncSession = Depends(get_async_db),
+        principal: Principal = Depends(get_principal),
+    ) -> OrgMember:
+        role = None
+        if settings.jwt_embed_org_roles:
+            role = principal.org_roles.get(org_id)
+        if role is None:
+            role = await get_org_role_async(db, org_id, principal.user_id)
+        return _org_member(org_id, principal, role, allowed)
 
     return _dep
 
 
-def require_batch_member() -> Callable[..., BatchMember]:
-    def _dep(
-        org_id: uuid.UUID,
-        batch_id: uuid.UUID,
-        db: Session = Depends(get_db),
-        user: User = Depends(get_current_user),
-    ) -> BatchMember:
-        batch = db.scalar(select(Batch).where(Batch.id == batch_id))
-        if batch is None or batch.organization_id != org_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, 
-                detail="Batch not found"
-            )
+def _org_member(
+    org_id: uuid.UUID, principal: Principal, role: str | None, allowed: set[str]
+) -> OrgMember:
+    if role is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Membership not found",
+        )
 
-        bm = db.scalar(
-            select(BatchMember).where(
-                BatchMember.batch_id == batch_id,
-                BatchMember.user_id == user.id,
-            )
+    if role not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, 
+            detail="Forbidden"
         )
-        if bm is None:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN, 
-                detail="Not in batch"
-            )
 
-        return bm
+    return OrgMember(organization_id=org_id, user_id=principal.user_id, role=role)
 
-    return _dep
+
+# (org_id, batch_id, user_id) of known batch members; positive-only like _role_cache.
+_batch_member_cache: LRUCache[tuple[uuid.UUID, uuid.UUID, uuid.UUID], bool] = LRUCache(
+    settings.membership_cache_size, ttl=settings.membership_cache_ttl_seconds, name="batch_member"
+)
+
+
+async def is_batch_member(
+    db: AsyncSession,
+    org_id: uuid.UUID,
+    batch_id: uuid.UUID,
+    user_id: uuid.UUID,
+) -> bool:
+    if _batch_member_cache.get((org_id, batch_id, user_id)):
+        return True
+
+    bm_id = await db.scalar(
+        select(BatchMember.id)
+        .join(Batch, BatchMember.batch_id == Batch.id)
+        .where(
+            Batch.id == batch_id,
+            Batch.organization_id == org_id,
+            BatchMember.user_id == user_id,
+        )
+    )
+    if bm_id is None:
+        return False
+    _batch_member_cache.set((org_id, batch_id, user_id), True)
+    return True
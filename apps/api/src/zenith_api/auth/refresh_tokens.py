@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+from sqlalchemy import CursorResult, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from zenith_api.auth.security import create_refresh_token, hash_token
+from zenith_api.cache import LRUCache
+from zenith_api.config import settings
+from zenith_api.db.models import RefreshToken
+from zenith_api.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# Hashes of tokens already caught being reused. A client (or thief) retrying one
+# keeps getting 401 without another trip to Postgres.
+_revoked: LRUCache[str, bool] = LRUCache(
+    settings.revoked_token_cache_size, ttl=3600, name="revoked_refresh_token"
+)
+
+
+def _revoked_key(token_hash: str) -> str:
+    return f"rt:revoked:{token_hash}"
+
+
+async def _is_known_revoked(token_hash: str) -> bool:
+    if _revoked.get(token_hash):
+        return True
+    if settings.redis_cache_enabled:
+        try:
+            if await get_async_redis().exists(_revoked_key(token_hash)):
+                _revoked.set(token_hash, True)
+                return True
+        except RedisError:
+            logger.warning("revoked refresh token cache read failed", exc_info=True)
+    return False
+
+
+async def _remember_revoked(token_hash: str, expires_at: datetime) -> None:
+    _revoked.set(token_hash, True)
+    if settings.redis_cache_enabled:
+        # Past its expiry the JWT itself is rejected, so the marker can go too.
+        ttl = max(1, int((expires_at - datetime.now(UTC)).total_seconds()))
+        try:
+            await get_async_redis().set(_revoked_key(token_hash), 1, ex=ttl)
+        except RedisError:
+            logger.warning("revoked refresh token cache write failed", exc_info=True)
+
+
+def issue_refresh_token(
+    db: Session | AsyncSession, user_id: uuid.UUID, family_id: uuid.UUID | None = None
+) -> str:
+    # Added to the session; the caller commits. A new family starts at each login.
+    token, expires_at = create_refresh_token(
+        user_id=str(user_id), expires_days=settings.jwt_refresh_days
+    )
+    db.add(
+        RefreshToken(
+            user_id=user_id,
+            token_hash=hash_token(token),
+            family_id=family_id or uuid.uuid4(),
+            expires_at=expires_at,
+        )
+    )
+    return token
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> tuple[uuid.UUID, str]:
+    # Exchanges a live refresh token for a new one in the same family and commits.
+    # Returns (user_id, new_token).
+    token_hash = hash_token(token)
+    if await _is_known_revoked(token_hash):
+        raise _unauthorized("Refresh token revoked")
+
+    now = datetime.now(UTC)
+    # Conditional update, so of two concurrent refreshes with one token only one wins.
+    row = (
+        await db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(revoked_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.family_id)
+        )
+    ).tuples().first()
+    if row is not None:
+        user_id, family_id = row
+        new_token = issue_refresh_token(db, user_id, family_id)
+        await db.commit()
+        return user_id, new_token
+
+    rt = await db.scalar(select(RefreshToken).where(RefreshToken.token_hash == token_hash))
+    if rt is None:
+        raise _unauthorized("Refresh token not found")
+    if rt.expires_at <= now:
+        raise _unauthorized("Refresh token expired")
+
+    assert rt.revoked_at is not None
+    if now - rt.revoked_at <= timedelta(seconds=settings.refresh_reuse_grace_seconds):
+        # Most likely the client retried a refresh whose response it lost.
+        raise _unauthorized("Refresh token already used")
+
+    # A rotated token came back: someone holds a copy. End every session in the family.
+    family_id, user_id, expires_at = rt.family_id, rt.user_id, rt.expires_at
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    await db.commit()
+    logger.warning("refresh token reuse for user %s, revoked family %s", user_id, family_id)
+    await _remember_revoked(token_hash, expires_at)
+    raise _unauthorized("Refresh token reuse detected")
+
+
+def purge_refresh_tokens(db: Session, *, batch_size: int, revoked_retention: timedelta) -> int:
+    # Deletes expired tokens, and revoked ones once reuse detection no longer needs
+    # them, batch_size rows per transaction so locks and WAL stay small.
+    total = 0
+    while True:
+        now = datetime.now(UTC)
+        batch = (
+            select(RefreshToken.id)
+            .where(
+                or_(
+                    RefreshToken.expires_at <= now,
+                    RefreshToken.revoked_at < now - revoked_retention,
+                )
+            )
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = cast(
+            CursorResult[Any], db.execute(delete(RefreshToken).where(RefreshToken.id.in_(batch)))
+        )
+        db.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
@@ -1,89 +1,109 @@
 from __future__ import annotations
 
 import uuid
-from datetime import UTC, datetime
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from zenith_api.auth.hashing import hash_password_async, verify_password_async
+from zenith_api.auth.refresh_tokens import issue_refresh_token, rotate_refresh_token
 from zenith_api.auth.schemas import LoginRequest, RefreshRequest, RegisterRequest, TokenResponse
-from zenith_api.auth.security import (
-    create_access_token,
-    create_refresh_token,
-    decode_token,
-    hash_password,
-    hash_token,
-    verify_password,
-)
+from zenith_api.auth.security import create_access_token, decode_token
 from zenith_api.config import settings
-from zenith_api.db.models import RefreshToken, User
-from zenith_api.db.session import get_db
+from zenith_api.db.models import Membership, Role, User
+from zenith_api.db.session import get_async_db
+from zenith_api.ratelimit import rate_limit
 
 router = APIRouter()
 
 
-@router.post("/register", response_model=TokenResponse)
-def register(payload: RegisterRequest, db: Session = Depends(get_db)) -> TokenResponse:
-    existing = db.scalar(select(User).where(User.email == payload.email))
+async def _access_token(db: AsyncSession, user_id: uuid.UUID) -> str:
+    org_roles = None
+    if settings.jwt_embed_org_roles:
+        rows = (
+            await db.execute(
+                select(Membership.organization_id, Role.code)
+                .join(Role, Membership.role_id == Role.id)
+                .where(Membership.user_id == user_id)
+            )
+        ).tuples()
+        org_roles = {str(org_id): code for org_id, code in rows}
+    return create_access_token(
+        user_id=str(user_id),
+        expires_minutes=settings.jwt_access_minutes,
+        org_roles=org_roles,
+    )
+
+
+@router.post(
+    "/register",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("auth.register"))],
+)
+async def register(
+    payload: RegisterRequest, db: AsyncSession = Depends(get_async_db)
+) -> TokenResponse:
+    existing = await db.scalar(select(User.id).where(User.email == payload.email))
     if existing is not None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, 
             detail="Email already registered"
         )
+    # Don't hold a pooled connection while waiting on argon2.
+    await db.rollback()
 
-    user = User(email=payload.email, hashed_password=hash_password(payload.password))
+    user = User(email=payload.email, hashed_password=await hash_password_async(payload.password))
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
 
-    access = create_access_token(user_id=str(user.id), expires_minutes=settings.jwt_access_minutes)
-    refresh, refresh_exp = create_refresh_token(
-        user_id=str(user.id),
-        expires_days=settings.jwt_refresh_days,
-    )
-
-    db.add(
-        RefreshToken(
-            user_id=user.id,
-            token_hash=hash_token(refresh),
-            expires_at=refresh_exp,
-        )
-    )
-    db.commit()
+    access = await _access_token(db, user.id)
+    refresh = issue_refresh_token(db, user.id)
+    await db.commit()
 
     return TokenResponse(access_token=access, refresh_token=refresh)
 
 
-@router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
-    user = db.scalar(select(User).where(User.email == payload.email))
-    if user is None or not verify_password(payload.password, user.hashed_password):
+@router.post(
+    "/login", response_model=TokenResponse, dependencies=[Depends(rate_limit("auth.login"))]
+)
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_async_db)) -> TokenResponse:
+    row = (
+        await db.execute(select(User.id, User.hashed_password).where(User.email == payload.email))
+    ).first()
+    # Don't hold a pooled connection while waiting on argon2.
+    await db.rollback()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
             detail="Invalid credentials"
         )
-
-    access = create_access_token(user_id=str(user.id), expires_minutes=settings.jwt_access_minutes)
-    refresh, refresh_exp = create_refresh_token(
-        user_id=str(user.id),
-        expires_days=settings.jwt_refresh_days,
-    )
-
-    db.add(
-        RefreshToken(
-            user_id=user.id,
-            token_hash=hash_token(refresh),
-            expires_at=refresh_exp,
+    user_id, hashed_password = row
+    ok, new_hash = await verify_password_async(payload.password, hashed_password)
+    if not ok:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, 
+            detail="Invalid credentials"
+        )
+    if new_hash is not None:
+        # Argon2 parameters changed since this hash was made; upgrade it in place.
+        await db.execute(
+            update(User).where(User.id == user_id).values(hashed_password=new_hash)
         )
-    )
-    db.commit()
+
+    access = await _access_token(db, user_id)
+    refresh = issue_refresh_token(db, user_id)
+    await db.commit()
 
     return TokenResponse(access_token=access, refresh_token=refresh)
 
 
-@router.post("/refresh", response_model=TokenResponse)
-def refresh(payload: RefreshRequest, db: Session = Depends(get_db)) -> TokenResponse:
+@router.post(
+    "/refresh", response_model=TokenResponse, dependencies=[Depends(rate_limit("auth.refresh"))]
+)
+async def refresh(
+    payload: RefreshRequest, db: AsyncSession = Depends(get_async_db)
+) -> TokenResponse:
     # Validate JWT shape
     try:
         decoded = decode_token(payload.refresh_token)
@@ -107,7 +127,7 @@ def refresh(payload: RefreshRequest, db: Session = Depends(get_db)) -> TokenResp
         )
 
     try:
-        user_id = uuid.UUID(sub)
+        uuid.UUID(sub)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -115,31 +135,8 @@ def refresh(payload: RefreshRequest, db: Session = Depends(get_db)) -> TokenResp
         ) from None
 
 
-    # Check stored token hash (revokable refresh)
-    token_hash = hash_token(payload.refresh_token)
-    rt = db.scalar(
-        select(RefreshToken).where(RefreshToken.token_hash == token_hash)
-    )
-    if rt is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, 
-            detail="Refresh token not found"
-        )
-
-    if rt.revoked_at is not None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, 
-            detail="Refresh token revoked"
-        )
-
-    now = datetime.now(UTC)
-    if rt.expires_at <= now:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, 
-            detail="Refresh token expired"
-        )
-
-    access = create_access_token(user_id=str(user_id), expires_minutes=settings.jwt_access_minutes)
-
-    # Return same refresh token (simple). Later: rotate refresh token.
-    return TokenResponse(access_token=access, refresh_token=payload.refresh_token)
+    # Each refresh token works once: it is revoked and replaced by a new one, and
+    # presenting a replaced token again revokes the whole chain.
+    user_id, refresh = await rotate_refresh_token(db, payload.refresh_token)
+    access = await _access_token(db, user_id)
+    return TokenResponse(access_token=access, refresh_token=refresh)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import hashlib
 import uuid
+from collections.abc import Mapping
 from datetime import UTC, datetime, timedelta
 from typing import Any, cast
 
@@ -10,7 +11,14 @@ from passlib.context import CryptContext
 
 from zenith_api.config import settings
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__rounds=settings.argon2_time_cost,
+    argon2__memory_cost=settings.argon2_memory_cost_kib,
+    argon2__parallelism=settings.argon2_parallelism,
+)
 
 
 def hash_password(password: str) -> str:
@@ -20,19 +28,33 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed_password: str) -> bool:
     return cast(bool, pwd_context.verify(password, hashed_password))
 
+
+def verify_and_rehash(password: str, hashed_password: str) -> tuple[bool, str | None]:
+    # The new hash is set when the stored one was made with different parameters.
+    ok, new_hash = pwd_context.verify_and_update(password, hashed_password)
+    return cast(bool, ok), cast("str | None", new_hash)
+
 def hash_token(token: str) -> str:
     # Store only a hash in DB for security.
     return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
-def create_access_token(*, user_id: str, expires_minutes: int) -> str:
+def create_access_token(
+    *,
+    user_id: str,
+    expires_minutes: int,
+    org_roles: Mapping[str, str] | None = None,
+) -> str:
     now = datetime.now(UTC)
-    payload = {
+    payload: dict[str, Any] = {
         "sub": user_id,
         "type": "access",
         "jti": uuid.uuid4().hex,
         "iat": int(now.timestamp()),
         "exp": int((now + timedelta(minutes=expires_minutes)).timestamp()),
     }
+    if org_roles is not None:
+        # org_id -> role code, trusted by RBAC until the token expires.
+        payload["orgs"] = dict(org_roles)
     return jwt.encode(payload, settings.jwt_secret, algorithm="HS256")
 
 
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+from zenith_api.metrics import CACHE_LOOKUPS
+
+
+class LRUCache[K: Hashable, V]:
+    # Bounded, thread-safe in-process cache; entries optionally expire after `ttl` seconds.
+    # Named caches report hits and misses to /metrics.
+
+    def __init__(self, maxsize: int, ttl: float | None = None, name: str | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._hit = CACHE_LOOKUPS.labels(name, "hit") if name else None
+        self._miss = CACHE_LOOKUPS.labels(name, "miss") if name else None
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        value = self._get(key)
+        counter = self._miss if value is None else self._hit
+        if counter is not None:
+            counter.inc()
+        return value
+
+    def _get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if self.ttl is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -2,9 +2,21 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
-
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, UniqueConstraint, func
-from sqlalchemy.dialects.postgresql import UUID
+from typing import Any
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from zenith_api.db.base import Base
@@ -41,6 +53,13 @@ class Role(Base):
 
 class Membership(Base):
     __tablename__ = "memberships"
+    __table_args__ = (
+        UniqueConstraint(
+            "organization_id",
+            "user_id",
+            name="uq_memberships_org_user"
+        ),
+    )
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     organization_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -63,6 +82,14 @@ class Membership(Base):
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # For the purge job; live tokens are not revoked and stay out of the index.
+        Index(
+            "ix_refresh_tokens_revoked_at",
+            "revoked_at",
+            postgresql_where="revoked_at IS NOT NULL",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -76,7 +103,12 @@ class RefreshToken(Base):
         index=True,
     )
     token_hash: Mapped[str] = mapped_column(String(128), nullable=False, unique=True, index=True)
-    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Every token rotated from the same login shares a family; reuse of a rotated
+    # token revokes the whole family.
+    family_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, index=True)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
     revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -148,11 +180,11 @@ class Test(Base):
     __tablename__ = "tests"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Indexed by ix_tests_organization_id_created_at below.
     organization_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("organizations.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     batch_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -163,6 +195,20 @@ class Test(Base):
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     starts_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     ends_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Time each student gets from starting their attempt, capped by ends_at.
+    duration_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Bumped whenever questions/options change; versions cached answer keys.
+    content_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
+    # Marks for a correct / incorrect answer (e.g. 4 / -1 for JEE Main); unattempted
+    # questions score 0. Questions may override both.
+    marks_correct: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default="1"
+    )
+    marks_incorrect: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     organization: Mapped[Organization] = relationship()
@@ -177,6 +223,15 @@ class Test(Base):
     )
 
 
+# Serves list_tests' newest-first keyset pages.
+Index(
+    "ix_tests_organization_id_created_at",
+    Test.organization_id,
+    Test.created_at.desc(),
+    Test.id.desc(),
+)
+
+
 class Question(Base):
     __tablename__ = "questions"
     __table_args__ = (
@@ -196,6 +251,10 @@ class Question(Base):
     )
     prompt: Mapped[str] = mapped_column(String, nullable=False)
     position: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    # Scores are also totalled per section (e.g. "Physics").
+    section: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    marks_correct: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    marks_incorrect: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     test: Mapped[Test] = relationship(back_populates="questions")
@@ -238,6 +297,12 @@ class Attempt(Base):
             "user_id", 
             name="uq_attempts_test_user"
         ),
+        # Open attempts by deadline, for the auto-submit sweep.
+        Index(
+            "ix_attempts_open_deadline",
+            "deadline_at",
+            postgresql_where="submitted_at IS NULL AND deadline_at IS NOT NULL",
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -253,8 +318,13 @@ class Attempt(Base):
         nullable=False,
         index=True,
     )
+    # Fixed at start: min(start + test duration, test ends_at). Answers are refused
+    # after it and the attempt is submitted for the student.
+    deadline_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     submitted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Written with score by assessment.scoring: counts, max score and per-section totals.
+    score_breakdown: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     test: Mapped[Test] = relationship(back_populates="attempts")
@@ -294,8 +364,102 @@ class AttemptAnswer(Base):
         nullable=True,
         index=True,
     )
+    # Monotonic per-client write counter; older writes never overwrite newer ones.
+    client_seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     attempt: Mapped[Attempt] = relationship(back_populates="answers")
     question: Mapped[Question] = relationship()
     selected_option: Mapped[QuestionOption | None] = relationship()
+
+
+class Job(Base):
+    # Background work an admin can poll (bulk enrollment, regrades, exports, ...).
+    __tablename__ = "jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    organization_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    created_by: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str | None] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+# Post-test analytics, rebuilt as a whole by assessment.analytics.
+
+
+class TestAnalytics(Base):
+    __tablename__ = "test_analytics"
+
+    test_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tests.id", ondelete="CASCADE"), primary_key=True
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    mean_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    median_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    std_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    min_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_score: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class AttemptRank(Base):
+    __tablename__ = "attempt_ranks"
+    __table_args__ = (
+        UniqueConstraint("test_id", "user_id", name="uq_attempt_ranks_test_user"),
+        Index("ix_attempt_ranks_test_id_rank", "test_id", "rank"),
+    )
+
+    attempt_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("attempts.id", ondelete="CASCADE"), primary_key=True
+    )
+    test_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tests.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    score: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Competition ranking (1, 2, 2, 4); percentile is the share scoring at most this.
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    percentile: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class QuestionAnalytics(Base):
+    __tablename__ = "question_analytics"
+
+    question_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), primary_key=True
+    )
+    test_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("tests.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    attempted: Mapped[int] = mapped_column(Integer, nullable=False)
+    correct: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Share of all candidates answering correctly (item difficulty).
+    p_value: Mapped[float] = mapped_column(Float, nullable=False)
+    # Upper minus lower 27% p-value, and the item/score point-biserial correlation.
+    discrimination: Mapped[float | None] = mapped_column(Float, nullable=True)
+    point_biserial: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Per option: option_id, position, is_correct, count, fraction, upper_fraction,
+    # lower_fraction, mean_score.
+    options: Mapped[list[dict[str, Any]]] = mapped_column(JSONB, nullable=False)
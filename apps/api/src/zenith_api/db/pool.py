@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from zenith_api.config import settings
+from zenith_api.db.query_stats import record_pool_wait
+from zenith_api.metrics import DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUTS, DB_POOL_WAIT
+
+
+class PoolStats:
+    # Checkout counters for one pool; wait time is how long callers queued for a connection.
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, waited: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+
+class TimedQueuePool(QueuePool):
+    stats: PoolStats
+
+    def __init__(self, *args: Any, **kw: Any) -> None:
+        super().__init__(*args, **kw)
+        self.stats = PoolStats()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            waited = time.perf_counter() - started
+            self.stats.record(waited, timed_out=True)
+            record_pool_wait(waited)
+            DB_POOL_CHECKOUTS.labels(self._name, "timeout").inc()
+            raise
+        waited = time.perf_counter() - started
+        self.stats.record(waited, timed_out=False)
+        record_pool_wait(waited)
+        DB_POOL_CHECKOUTS.labels(self._name, "ok").inc()
+        DB_POOL_WAIT.labels(self._name).observe(waited)
+        DB_POOL_CHECKED_OUT.labels(self._name).inc()
+        return conn
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        DB_POOL_CHECKED_OUT.labels(self._name).dec()
+        super()._do_return_conn(record)
+
+    @property
+    def _name(self) -> str:
+        # engine_kwargs passes the engine's name as the pool's logging name, which
+        # survives the pool being recreated on dispose().
+        return str(self.logging_name or "default")
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_kwargs(poolclass: type[TimedQueuePool], name: str) -> dict[str, Any]:
+    kw: dict[str, Any] = {
+        "poolclass": poolclass,
+        "pool_logging_name": name,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if settings.db_pgbouncer:
+        # psycopg 3 prepares repeated statements server-side by default.
+        kw["connect_args"] = {"prepare_threshold": None}
+    return kw
+
+
+def pool_stats(pool: TimedQueuePool) -> dict[str, Any]:
+    s = pool.stats
+    attempts = s.checkouts + s.timeouts
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "checkouts": s.checkouts,
+        "timeouts": s.timeouts,
+        "wait_avg_ms": round(s.wait_total / attempts * 1000, 3) if attempts else 0.0,
+        "wait_max_ms": round(s.wait_max * 1000, 3),
+    }
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from zenith_api.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-request database accounting. Engine cursor events and the pool's checkout timer
+# add to the QueryStats of the request in progress, found through a context variable;
+# outside a request (workers, startup) they do nothing. The object is shared, not
+# copied, so sync endpoints running in the threadpool still add to their request.
+
+
+@dataclass(slots=True)
+class QueryStats:
+    count: int = 0
+    db_time: float = 0.0
+    pool_wait: float = 0.0
+    slowest_time: float = 0.0
+    slowest: str | None = None
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.count} queries", '
+            f"db-pool;dur={self.pool_wait * 1000:.2f}, "
+            f"db-slowest;dur={self.slowest_time * 1000:.2f}"
+        )
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+    return _current.get()
+
+
+def record_pool_wait(waited: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait += waited
+
+
+def _before(conn: Connection, *_args: Any) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after(conn: Connection, _cursor: Any, statement: str, *_args: Any) -> None:
+    stats = _current.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+    took = time.perf_counter() - started.pop()
+    stats.count += 1
+    stats.db_time += took
+    if took > stats.slowest_time:
+        stats.slowest_time = took
+        stats.slowest = statement
+
+
+def instrument(engine: Engine) -> None:
+    # For an AsyncEngine pass its .sync_engine.
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _after)
+
+
+class QueryStatsMiddleware:
+    # Adds a Server-Timing header (db, db-pool, db-slowest) and logs one line per request,
+    # at WARNING when its slowest statement took db_slow_query_ms or more. A streamed
+    # body's queries land in the log line but not the header, which has gone by then.
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.db_server_timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing().encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            slow = stats.slowest_time * 1000 >= settings.db_slow_query_ms
+            logger.log(
+                logging.WARNING if slow else logging.DEBUG,
+                "%s %s %s: %d queries, db %.1f ms, pool wait %.1f ms",
+                scope["method"],
+                scope["path"],
+                status_code,
+                stats.count,
+                stats.db_time * 1000,
+                stats.pool_wait * 1000,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    "db_queries": stats.count,
+                    "db_time_ms": round(stats.db_time * 1000, 3),
+                    "db_pool_wait_ms": round(stats.pool_wait * 1000, 3),
+                    "db_slowest_ms": round(stats.slowest_time * 1000, 3),
+                    "db_slowest_statement": stats.slowest if slow else None,
+                },
+            )
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Generator
+
+from fastapi import Depends
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from zenith_api.auth.deps import Principal, get_principal
+from zenith_api.cache import LRUCache
+from zenith_api.config import settings
+from zenith_api.db.session import ReadSessionLocal, SessionLocal, read_engine
+from zenith_api.redis_client import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+# Zero when the replica has replayed everything it received, otherwise the age of
+# the last replayed transaction (an idle primary would otherwise look like lag).
+_LAG_SQL = text(
+    """
+    SELECT CASE
+      WHEN NOT pg_is_in_recovery() THEN 0
+      WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+      ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+_recent_writers: LRUCache[uuid.UUID, bool] = LRUCache(
+    settings.membership_cache_size, ttl=settings.read_your_writes_seconds
+)
+
+_lag_lock = threading.Lock()
+_lag: float | None = None
+_lag_checked_at = 0.0
+
+
+def _writer_key(user_id: uuid.UUID) -> str:
+    return f"ryw:{user_id}"
+
+
+def note_write(user_id: uuid.UUID) -> None:
+    # Pins the user's reads to the primary until the replica has surely caught up.
+    if read_engine is None:
+        return
+    _recent_writers.set(user_id, True)
+    if settings.redis_cache_enabled:
+        try:
+            get_redis().set(
+                _writer_key(user_id), 1, px=int(settings.read_your_writes_seconds * 1000)
+            )
+        except RedisError:
+            logger.warning("read-your-writes marker write failed", exc_info=True)
+
+
+async def note_write_async(user_id: uuid.UUID) -> None:
+    if read_engine is None:
+        return
+    _recent_writers.set(user_id, True)
+    if settings.redis_cache_enabled:
+        try:
+            await get_async_redis().set(
+                _writer_key(user_id), 1, px=int(settings.read_your_writes_seconds * 1000)
+            )
+        except RedisError:
+            logger.warning("read-your-writes marker write failed", exc_info=True)
+
+
+def _wrote_recently(user_id: uuid.UUID) -> bool:
+    if _recent_writers.get(user_id):
+        return True
+    if settings.redis_cache_enabled:
+        try:
+            return bool(get_redis().exists(_writer_key(user_id)))
+        except RedisError:
+            logger.warning("read-your-writes marker read failed", exc_info=True)
+            return True
+    return False
+
+
+def replica_lag() -> float | None:
+    # Seconds behind the primary, or None if the replica is unreachable.
+    global _lag, _lag_checked_at
+    assert read_engine is not None
+    now = time.monotonic()
+    with _lag_lock:
+        if now - _lag_checked_at < settings.read_lag_check_seconds:
+            return _lag
+        _lag_checked_at = now
+    try:
+        with read_engine.connect() as conn:
+            lag: float | None = float(conn.execute(_LAG_SQL).scalar_one())
+    except SQLAlchemyError:
+        logger.warning("replica lag check failed", exc_info=True)
+        lag = None
+    with _lag_lock:
+        _lag = lag
+    return lag
+
+
+def _use_replica(user_id: uuid.UUID) -> bool:
+    if ReadSessionLocal is None or _wrote_recently(user_id):
+        return False
+    lag = replica_lag()
+    return lag is not None and lag <= settings.read_max_lag_seconds
+
+
+def read_sessionmaker(user_id: uuid.UUID) -> sessionmaker[Session]:
+    # For reads that outlive the request (streamed responses) and open their own session.
+    factory = ReadSessionLocal if _use_replica(user_id) else SessionLocal
+    assert factory is not None
+    return factory
+
+
+def get_read_db(
+    principal: Principal = Depends(get_principal),
+) -> Generator[Session, None, None]:
+    # Read-only endpoints only: the session may be bound to a replica.
+    db = read_sessionmaker(principal.user_id)()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,16 +1,17 @@
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from typing import Any, cast
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from zenith_api.config import settings
+from zenith_api.db.pool import TimedAsyncQueuePool, TimedQueuePool, engine_kwargs, pool_stats
+from zenith_api.db.query_stats import instrument
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-)
+engine = create_engine(settings.database_url, **engine_kwargs(TimedQueuePool, "sync"))
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -19,6 +20,20 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
+# Read-only replica; callers go through zenith_api.db.replica.get_read_db, which
+# decides per request whether the replica is fresh enough.
+read_engine = (
+    create_engine(settings.database_read_url, **engine_kwargs(TimedQueuePool, "read"))
+    if settings.database_read_url
+    else None
+)
+
+ReadSessionLocal = (
+    sessionmaker(bind=read_engine, autoflush=False, autocommit=False, expire_on_commit=False)
+    if read_engine is not None
+    else None
+)
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -26,3 +41,37 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+# psycopg 3 serves both engines; the async one is used by the exam hot path so
+# in-flight requests wait on Postgres without holding a threadpool thread.
+async_engine = create_async_engine(
+    settings.database_url, **engine_kwargs(TimedAsyncQueuePool, "async")
+)
+
+if settings.db_query_stats:
+    instrument(engine)
+    instrument(async_engine.sync_engine)
+    if read_engine is not None:
+        instrument(read_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def db_pool_stats() -> dict[str, Any]:
+    stats = {
+        "sync": pool_stats(cast(TimedQueuePool, engine.pool)),
+        "async": pool_stats(cast(TimedQueuePool, async_engine.pool)),
+    }
+    if read_engine is not None:
+        stats["read"] = pool_stats(cast(TimedQueuePool, read_engine.pool))
+    return stats
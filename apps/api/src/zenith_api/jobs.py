@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from zenith_api.db.models import Job
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+def create_job(
+    db: Session,
+    *,
+    organization_id: uuid.UUID,
+    kind: str,
+    total: int,
+    created_by: uuid.UUID | None,
+) -> Job:
+    job = Job(
+        organization_id=organization_id,
+        kind=kind,
+        status=JOB_QUEUED,
+        total=total,
+        created_by=created_by,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def set_job_progress(db: Session, job_id: uuid.UUID, processed: int) -> None:
+    # Not committed here: progress lands with the work it describes.
+    db.execute(
+        update(Job).where(Job.id == job_id).values(status=JOB_RUNNING, processed=processed)
+    )
+
+
+def set_job_total(db: Session, job_id: uuid.UUID, total: int) -> None:
+    # For jobs that only learn their size once running; not committed here either.
+    db.execute(update(Job).where(Job.id == job_id).values(total=total))
+
+
+def finish_job(db: Session, job_id: uuid.UUID, result: dict[str, Any]) -> None:
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status=JOB_SUCCEEDED, processed=Job.total, result=result)
+    )
+    db.commit()
+
+
+def fail_job(db: Session, job_id: uuid.UUID, error: str) -> None:
+    db.rollback()
+    db.execute(update(Job).where(Job.id == job_id).values(status=JOB_FAILED, error=error))
+    db.commit()
@@ -1,17 +1,56 @@
 from __future__ import annotations
 
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
 
+from zenith_api.auth.hashing import shutdown_hash_pool, start_hash_pool
 from zenith_api.auth.router import router as auth_router
+from zenith_api.config import settings
+from zenith_api.db.query_stats import QueryStatsMiddleware
+from zenith_api.db.session import SessionLocal
+from zenith_api.metrics import MetricsMiddleware, mark_process_dead
+from zenith_api.rbac.roles import load_roles
+from zenith_api.routers.analytics import router as analytics_router
 from zenith_api.routers.batches import router as batches_router
+from zenith_api.routers.exports import router as exports_router
 from zenith_api.routers.health import router as health_router
+from zenith_api.routers.jobs import router as jobs_router
+from zenith_api.routers.leaderboards import router as leaderboards_router
 from zenith_api.routers.orgs import router as orgs_router
 from zenith_api.routers.tests import router as tests_router
 
-app = FastAPI(title="Zenith API")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    try:
+        with SessionLocal() as db:
+            load_roles(db)
+    except SQLAlchemyError:
+        # Roles are loaded lazily on first use if the database is not reachable yet.
+        logger.warning("could not preload roles", exc_info=True)
+    start_hash_pool()
+    yield
+    shutdown_hash_pool()
+    mark_process_dead()
+
+
+app = FastAPI(title="Zenith API", lifespan=lifespan)
+if settings.db_query_stats:
+    app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(health_router)
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(orgs_router, prefix="/orgs", tags=["orgs"])
 app.include_router(batches_router, prefix="/orgs", tags=["batches"])
-app.include_router(tests_router, prefix="/orgs", tags=["tests"])
\ No newline at end of file
+app.include_router(tests_router, prefix="/orgs", tags=["tests"])
+app.include_router(jobs_router, prefix="/orgs", tags=["jobs"])
+app.include_router(analytics_router, prefix="/orgs", tags=["analytics"])
+app.include_router(leaderboards_router, prefix="/orgs", tags=["leaderboards"])
+app.include_router(exports_router, prefix="/orgs", tags=["exports"])
\ No newline at end of file
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Iterator
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from redis.exceptions import RedisError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from zenith_api.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics for GET /metrics. Under several uvicorn workers, point
+# PROMETHEUS_MULTIPROC_DIR at an empty directory (wiped on each deploy) shared by
+# the workers: every process then writes its samples to mmap'd files there and a
+# scrape sums them, whichever worker answers it. Without it, each process reports
+# only its own.
+
+_MULTIPROC = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_LATENCY = Histogram(
+    "zenith_http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    "zenith_http_requests", "Requests by route template and status", ["method", "route", "status"]
+)
+IN_FLIGHT = Gauge(
+    "zenith_http_requests_in_flight", "Requests being served", multiprocess_mode="livesum"
+)
+
+DB_POOL_CHECKOUTS = Counter(
+    "zenith_db_pool_checkouts", "Connection checkouts by pool and outcome", ["pool", "outcome"]
+)
+DB_POOL_WAIT = Histogram(
+    "zenith_db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "zenith_db_pool_checked_out",
+    "Connections currently checked out",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+CACHE_LOOKUPS = Counter(
+    "zenith_cache_lookups", "In-process cache lookups by cache and result", ["cache", "result"]
+)
+
+PASSWORD_HASH_PENDING = Gauge(
+    "zenith_password_hash_pending",
+    "Password hashes queued or running",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_SHED = Counter(
+    "zenith_password_hash_shed", "Sign-ins refused because the hash queue was full"
+)
+
+
+class _CeleryQueues(Collector):
+    # Read from the broker at scrape time, so the figure is the same from any process.
+    # Kombu's Redis transport keeps one list per priority step; they add up to the queue.
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        from zenith_api.worker import celery_app  # here, so importing metrics stays cheap
+
+        queues = {celery_app.conf.task_default_queue}
+        queues.update(q.name for q in celery_app.conf.task_queues or ())
+        family = GaugeMetricFamily(
+            "zenith_celery_queue_length", "Tasks waiting in the broker", labels=["queue"]
+        )
+        try:
+            with get_redis().pipeline(transaction=False) as pipe:
+                for q in sorted(queues):
+                    for key in (q, *(f"{q}\x06\x16{p}" for p in (3, 6, 9))):
+                        pipe.llen(key)
+                lengths = pipe.execute()
+        except RedisError:
+            logger.warning("celery queue length read failed", exc_info=True)
+            return
+        for i, q in enumerate(sorted(queues)):
+            family.add_metric([q], sum(lengths[i * 4 : i * 4 + 4]))
+        yield family
+
+
+_scrape_time = CollectorRegistry(auto_describe=False)
+_scrape_time.register(_CeleryQueues())
+
+
+def render() -> bytes:
+    if _MULTIPROC:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        out = generate_latest(registry)
+    else:
+        out = generate_latest(REGISTRY)
+    return out + generate_latest(_scrape_time)
+
+
+def mark_process_dead() -> None:
+    # Drops this worker's live gauges (in-flight, checked out) from the shared files.
+    if _MULTIPROC:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    # Latency and status per route template (not raw path, which would explode the
+    # label set); requests matching no route are counted under "unmatched".
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.labels(scope["method"], route).observe(time.perf_counter() - started)
+            REQUESTS.labels(scope["method"], route, str(status_code)).inc()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Literal
+
+from fastapi import Depends, HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from zenith_api.auth.deps import Principal, get_principal
+from zenith_api.auth.rbac import OrgMember, require_org_role
+from zenith_api.cache import LRUCache
+from zenith_api.config import settings
+from zenith_api.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# GCRA, the token bucket expressed as one timestamp per key: KEYS[1] holds the
+# theoretical arrival time (TAT) of the next request, each request pushes it out by
+# one interval, and a request is refused while that would put it more than the burst
+# ahead of now. Refused requests leave the bucket untouched, so retrying early costs
+# nothing extra. Returns 0 when allowed, otherwise milliseconds until the next token.
+_BUCKET_LUA = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+  tat = now
+end
+local wait = tat + interval - burst - now
+if wait > 0 then
+  return wait
+end
+redis.call('SET', KEYS[1], tat + interval, 'PX', math.ceil(tat + interval - now))
+return 0
+"""
+
+# Per-process fallback when Redis is unreachable; limits then apply per worker.
+_local: LRUCache[str, float] = LRUCache(settings.rate_limit_local_keys)
+_local_lock = threading.Lock()
+# After a Redis error, use the local buckets for a while instead of paying a
+# connect timeout on every request.
+_redis_retry_at = 0.0
+
+
+def _take_local(key: str, now_ms: float, interval_ms: float, burst_ms: float) -> float:
+    with _local_lock:
+        tat = max(_local.get(key) or now_ms, now_ms)
+        wait = tat + interval_ms - burst_ms - now_ms
+        if wait > 0:
+            return wait
+        _local.set(key, tat + interval_ms)
+        return 0.0
+
+
+async def take(name: str, subject: str) -> float:
+    # Seconds until `subject` may call `name` again; 0 when allowed now.
+    global _redis_retry_at
+    rule = settings.rate_limits.get(name)
+    if rule is None or rule.limit <= 0:
+        return 0.0
+    interval_ms = rule.period_seconds * 1000 / rule.limit
+    burst_ms = rule.limit * interval_ms
+    key = f"ratelimit:{name}:{subject}"
+    now_ms = time.time() * 1000
+
+    if settings.rate_limit_redis and time.monotonic() >= _redis_retry_at:
+        try:
+            # One round trip: EVALSHA, with EVAL only the first time a server sees it.
+            script = get_async_redis().register_script(_BUCKET_LUA)
+            wait_ms = await script(keys=[key], args=[now_ms, interval_ms, burst_ms])
+            return float(wait_ms) / 1000
+        except RedisError:
+            logger.warning("rate limiter falling back to in-process buckets", exc_info=True)
+            _redis_retry_at = time.monotonic() + 5
+    return _take_local(key, now_ms, interval_ms, burst_ms) / 1000
+
+
+def _too_many(wait: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests",
+        headers={"Retry-After": str(max(1, math.ceil(wait)))},
+    )
+
+
+def rate_limit(
+    name: str, *, per: Literal["ip", "user", "org"] = "ip", roles: tuple[str, ...] = ()
+) -> Callable[..., Awaitable[None]]:
+    # Route dependency; the limit for `name` comes from settings.rate_limits. "user"
+    # authenticates first, so anonymous traffic can't drain someone's bucket; "org"
+    # also requires one of `roles` in the org (the route's own role dependency, which
+    # FastAPI then resolves once), so outsiders can't drain the org's bucket either.
+    if per == "ip":
+
+        async def by_ip(request: Request) -> None:
+            host = request.client.host if request.client else "unknown"
+            wait = await take(name, f"ip:{host}")
+            if wait > 0:
+                raise _too_many(wait)
+
+        return by_ip
+
+    if per == "user":
+
+        async def by_user(principal: Principal = Depends(get_principal)) -> None:
+            wait = await take(name, f"user:{principal.user_id}")
+            if wait > 0:
+                raise _too_many(wait)
+
+        return by_user
+
+    assert roles, "per='org' limits need the roles allowed to spend the bucket"
+
+    async def by_org(member: OrgMember = Depends(require_org_role(*roles))) -> None:
+        wait = await take(name, f"org:{member.organization_id}")
+        if wait > 0:
+            raise _too_many(wait)
+
+    return by_org
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import uuid
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, cast
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from zenith_api.auth.security import hash_password
+from zenith_api.config import settings
+from zenith_api.db.models import BatchMember, Membership, User
+from zenith_api.jobs import fail_job, finish_job, set_job_progress
+from zenith_api.rbac.roles import get_role_id
+from zenith_api.redis_client import get_redis
+
+# Per-row errors beyond this are counted but not returned.
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass(frozen=True, slots=True)
+class Enrollee:
+    row: int
+    email: str
+    password: str | None = None
+
+
+class _Result:
+    def __init__(self) -> None:
+        self.created_users = 0
+        self.added_members = 0
+        self.already_members = 0
+        self.added_to_batch = 0
+        self.error_count = 0
+        self.errors: list[dict[str, Any]] = []
+
+    def fail(self, row: int, msg: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "msg": msg})
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "created_users": self.created_users,
+            "added_members": self.added_members,
+            "already_members": self.already_members,
+            "added_to_batch": self.added_to_batch,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+
+def _enroll_chunk(
+    db: Session,
+    org_id: uuid.UUID,
+    batch_id: uuid.UUID | None,
+    role_id: uuid.UUID,
+    chunk: Sequence[Enrollee],
+    result: _Result,
+    hash_fn: Callable[[str], str],
+) -> None:
+    emails = [e.email for e in chunk]
+    user_ids: dict[str, uuid.UUID] = dict(
+        db.execute(select(User.email, User.id).where(User.email.in_(emails))).tuples().all()
+    )
+
+    new_users: list[dict[str, Any]] = []
+    for e in chunk:
+        if e.email in user_ids:
+            continue
+        if not e.password:
+            result.fail(e.row, "Password required when creating a new user")
+            continue
+        new_users.append(
+            {"id": uuid.uuid4(), "email": e.email, "hashed_password": hash_fn(e.password)}
+        )
+    if new_users:
+        created = db.execute(
+            pg_insert(User)
+            .values(new_users)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.email, User.id)
+        ).tuples().all()
+        result.created_users += len(created)
+        user_ids.update(created)
+        if len(created) < len(new_users):
+            # Registered concurrently; enroll the existing account.
+            raced = [u["email"] for u in new_users if u["email"] not in user_ids]
+            user_ids.update(
+                db.execute(select(User.email, User.id).where(User.email.in_(raced))).tuples().all()
+            )
+
+    ids = [user_ids[e.email] for e in chunk if e.email in user_ids]
+    if not ids:
+        return
+
+    # Existing members keep their role; use add_member to change one.
+    added = db.execute(
+        pg_insert(Membership)
+        .values(
+            [
+                {"id": uuid.uuid4(), "organization_id": org_id, "user_id": uid, "role_id": role_id}
+                for uid in ids
+            ]
+        )
+        .on_conflict_do_nothing(constraint="uq_memberships_org_user")
+        .returning(Membership.user_id)
+    ).scalars().all()
+    result.added_members += len(added)
+    result.already_members += len(ids) - len(added)
+
+    if batch_id is not None:
+        result.added_to_batch += len(
+            db.execute(
+                pg_insert(BatchMember)
+                .values([{"id": uuid.uuid4(), "batch_id": batch_id, "user_id": uid} for uid in ids])
+                .on_conflict_do_nothing(constraint="uq_batch_members_batch_user")
+                .returning(BatchMember.id)
+            ).all()
+        )
+
+
+def run_enrollment(
+    db: Session,
+    job_id: uuid.UUID,
+    org_id: uuid.UUID,
+    batch_id: uuid.UUID | None,
+    role: str,
+    enrollees: Sequence[Enrollee],
+    hash_fn: Callable[[str], str] = hash_password,
+) -> dict[str, Any]:
+    # Commits chunk by chunk, so a failure part-way keeps the rows already enrolled;
+    # re-running the same list is safe. Request threads pass the bounded hash pool.
+    try:
+        role_id = get_role_id(db, role)
+        if role_id is None:
+            raise ValueError(f"Role '{role}' not found. Run seed.")
+
+        result = _Result()
+        seen: set[str] = set()
+        unique: list[Enrollee] = []
+        for e in enrollees:
+            if e.email in seen:
+                result.fail(e.row, "Duplicate email")
+            else:
+                seen.add(e.email)
+                unique.append(e)
+
+        size = settings.enrollment_chunk_size
+        for i in range(0, len(unique), size):
+            _enroll_chunk(db, org_id, batch_id, role_id, unique[i : i + size], result, hash_fn)
+            set_job_progress(db, job_id, min(i + size, len(unique)))
+            db.commit()
+    except Exception as e:
+        fail_job(db, job_id, str(e))
+        raise
+
+    out = result.as_dict()
+    finish_job(db, job_id, out)
+    return out
+
+
+def _staging_key(job_id: uuid.UUID) -> str:
+    return f"enrollment:rows:{job_id}"
+
+
+def stage_enrollees(job_id: uuid.UUID, enrollees: Sequence[Enrollee]) -> None:
+    # Large uploads wait in Redis for the worker: the task carries only the job id, so
+    # passwords never reach the broker, task logs or Postgres (WAL, replicas, backups).
+    # The key expires on its own if the job is never picked up.
+    rows = [[e.row, e.email, e.password] for e in enrollees]
+    get_redis().set(
+        _staging_key(job_id), json.dumps(rows), ex=settings.enrollment_staging_ttl_seconds
+    )
+
+
+def discard_staged(job_id: uuid.UUID) -> None:
+    get_redis().delete(_staging_key(job_id))
+
+
+def run_staged_enrollment(
+    db: Session, job_id: uuid.UUID, org_id: uuid.UUID, batch_id: uuid.UUID | None, role: str
+) -> dict[str, Any]:
+    # The staged rows are deleted however the run ends.
+    try:
+        raw = cast(str | None, get_redis().get(_staging_key(job_id)))
+        if raw is None:
+            fail_job(db, job_id, "Upload expired before a worker picked it up")
+            raise LookupError(f"no staged rows for enrollment job {job_id}")
+        enrollees = [
+            Enrollee(row=row, email=email, password=pw) for row, email, pw in json.loads(raw)
+        ]
+        return run_enrollment(db, job_id, org_id, batch_id, role, enrollees)
+    finally:
+        discard_staged(job_id)
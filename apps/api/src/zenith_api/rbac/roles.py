@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import threading
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from zenith_api.db.models import Role
+
+# The roles table only holds the seeded codes in rbac.constants, so it is read once
+# per process (at startup, or lazily on first use) and never queried again.
+_ids_by_code: dict[str, uuid.UUID] = {}
+_lock = threading.Lock()
+
+
+def load_roles(db: Session) -> None:
+    rows = db.execute(select(Role.code, Role.id)).tuples().all()
+    with _lock:
+        _ids_by_code.clear()
+        _ids_by_code.update(rows)
+
+
+def get_role_id(db: Session, code: str) -> uuid.UUID | None:
+    if code not in _ids_by_code:
+        # Also covers roles seeded after this process started.
+        load_roles(db)
+    return _ids_by_code.get(code)
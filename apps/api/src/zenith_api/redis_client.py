@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import asyncio
+from functools import lru_cache
+from weakref import WeakKeyDictionary
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from zenith_api.config import settings
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> Redis:
+    # Connection pool is shared per process; decode so callers deal in str.
+    return Redis.from_url(settings.redis_url, decode_responses=True)
+
+
+# redis.asyncio connections are bound to the loop that opened them, so keep one
+# client per running loop (one per worker in production).
+_async_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncRedis] = WeakKeyDictionary()
+
+
+def get_async_redis() -> AsyncRedis:
+    loop = asyncio.get_running_loop()
+    r = _async_clients.get(loop)
+    if r is None:
+        r = AsyncRedis.from_url(settings.redis_url, decode_responses=True)
+        _async_clients[loop] = r
+    return r
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from zenith_api.auth.rbac import OrgMember, require_org_role
+from zenith_api.db.models import AttemptRank, Question, QuestionAnalytics, Test, TestAnalytics
+from zenith_api.db.replica import get_read_db
+from zenith_api.db.session import get_db
+from zenith_api.jobs import create_job
+from zenith_api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from zenith_api.routers.analytics_schemas import (
+    OptionStats,
+    QuestionStats,
+    RankItem,
+    RankListResponse,
+    TestAnalyticsResponse,
+)
+from zenith_api.routers.jobs import job_response
+from zenith_api.routers.jobs_schemas import JobResponse
+from zenith_api.tasks import analytics as analytics_tasks
+
+router = APIRouter()
+
+# Reads only touch the tables written by assessment.analytics, never attempts.
+
+
+def _get_summary(db: Session, org_id: uuid.UUID, test_id: uuid.UUID) -> TestAnalytics:
+    summary = db.scalar(
+        select(TestAnalytics)
+        .join(Test, Test.id == TestAnalytics.test_id)
+        .where(TestAnalytics.test_id == test_id, Test.organization_id == org_id)
+    )
+    if summary is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analytics not found")
+    return summary
+
+
+@router.post("/{org_id}/tests/{test_id}/analytics", response_model=JobResponse)
+def compute_analytics(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    response: Response,
+    db: Session = Depends(get_db),
+    member: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> JobResponse:
+    # Closed tests are picked up automatically; this recomputes on demand.
+    test = db.scalar(select(Test).where(Test.id == test_id))
+    if test is None or test.organization_id != org_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
+    job = create_job(
+        db, organization_id=org_id, kind="analytics", total=1, created_by=member.user_id
+    )
+    analytics_tasks.compute_test_analytics.delay(str(test_id), str(job.id))
+    response.status_code = status.HTTP_202_ACCEPTED
+    return job_response(job)
+
+
+@router.get("/{org_id}/tests/{test_id}/analytics", response_model=TestAnalyticsResponse)
+def get_test_analytics(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> TestAnalyticsResponse:
+    summary = _get_summary(db, org_id, test_id)
+    questions = db.scalars(
+        select(QuestionAnalytics)
+        .join(Question, Question.id == QuestionAnalytics.question_id)
+        .where(QuestionAnalytics.test_id == test_id)
+        .order_by(Question.position)
+    ).all()
+    return TestAnalyticsResponse(
+        attempts=summary.attempts,
+        mean_score=summary.mean_score,
+        median_score=summary.median_score,
+        std_score=summary.std_score,
+        min_score=summary.min_score,
+        max_score=summary.max_score,
+        computed_at=summary.computed_at,
+        questions=[
+            QuestionStats(
+                question_id=q.question_id,
+                attempted=q.attempted,
+                correct=q.correct,
+                p_value=q.p_value,
+                discrimination=q.discrimination,
+                point_biserial=q.point_biserial,
+                options=[OptionStats(**o) for o in q.options],
+            )
+            for q in questions
+        ],
+    )
+
+
+@router.get("/{org_id}/tests/{test_id}/analytics/ranks", response_model=RankListResponse)
+def list_ranks(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> RankListResponse:
+    # Best first, keyset on (rank, attempt_id) via ix_attempt_ranks_test_id_rank.
+    _get_summary(db, org_id, test_id)
+    stmt = (
+        select(AttemptRank)
+        .where(AttemptRank.test_id == test_id)
+        .order_by(AttemptRank.rank, AttemptRank.attempt_id)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        rank, attempt_id = decode_cursor(cursor, 2)
+        try:
+            after = (int(rank), uuid.UUID(attempt_id))
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from None
+        stmt = stmt.where(tuple_(AttemptRank.rank, AttemptRank.attempt_id) > after)
+
+    rows = db.scalars(stmt).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].rank, rows[-1].attempt_id)
+    return RankListResponse(items=[_rank_item(r) for r in rows], next_cursor=next_cursor)
+
+
+@router.get("/{org_id}/tests/{test_id}/analytics/me", response_model=RankItem)
+def get_my_rank(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    member: OrgMember = Depends(require_org_role("admin", "teacher", "student")),
+) -> RankItem:
+    _get_summary(db, org_id, test_id)
+    row = db.scalar(
+        select(AttemptRank).where(
+            AttemptRank.test_id == test_id, AttemptRank.user_id == member.user_id
+        )
+    )
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No ranked attempt")
+    return _rank_item(row)
+
+
+def _rank_item(r: AttemptRank) -> RankItem:
+    return RankItem(
+        attempt_id=r.attempt_id,
+        user_id=r.user_id,
+        score=r.score,
+        rank=r.rank,
+        percentile=r.percentile,
+    )
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class OptionStats(BaseModel):
+    option_id: uuid.UUID
+    position: int
+    is_correct: bool
+    count: int
+    fraction: float
+    upper_fraction: float
+    lower_fraction: float
+    mean_score: float | None
+
+
+class QuestionStats(BaseModel):
+    question_id: uuid.UUID
+    attempted: int
+    correct: int
+    p_value: float
+    discrimination: float | None
+    point_biserial: float | None
+    options: list[OptionStats]
+
+
+class TestAnalyticsResponse(BaseModel):
+    attempts: int
+    mean_score: float | None
+    median_score: float | None
+    std_score: float | None
+    min_score: int | None
+    max_score: int | None
+    computed_at: datetime
+    questions: list[QuestionStats]
+
+
+class RankItem(BaseModel):
+    attempt_id: uuid.UUID
+    user_id: uuid.UUID
+    score: int
+    rank: int
+    percentile: float
+
+
+class RankListResponse(BaseModel):
+    items: list[RankItem]
+    # Pass back as `cursor` for the next page; null on the last page.
+    next_cursor: str | None = None
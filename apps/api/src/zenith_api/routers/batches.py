@@ -2,14 +2,16 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from zenith_api.auth.rbac import require_org_role
+from zenith_api.auth.rbac import OrgMember, require_org_role
 from zenith_api.db.models import Batch, BatchMember, Membership, User
+from zenith_api.db.replica import get_read_db, note_write
 from zenith_api.db.session import get_db
+from zenith_api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
 from zenith_api.routers.batches_schemas import (
     BatchAddMemberRequest,
     BatchAddMemberResponse,
@@ -27,7 +29,7 @@ def create_batch(
     org_id: uuid.UUID,
     payload: BatchCreateRequest,
     db: Session = Depends(get_db),
-    _m: Membership = Depends(require_org_role("admin", "teacher")),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher")),
 ) -> BatchCreateResponse:
     batch = Batch(organization_id=org_id, name=payload.name)
     db.add(batch)
@@ -40,21 +42,43 @@ def create_batch(
             detail="Batch name already exists"
         ) from None
     db.refresh(batch)
+    note_write(_m.user_id)
     return BatchCreateResponse(batch_id=batch.id)
 
 
 @router.get("/{org_id}/batches", response_model=BatchListResponse)
 def list_batches(
     org_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    _m: Membership = Depends(require_org_role("admin", "teacher", "student")),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher", "student")),
 ) -> BatchListResponse:
-    rows = db.scalars(
-        select(Batch).
-        where(Batch.organization_id == org_id)
-        .order_by(Batch.name)
-    ).all()
-    return BatchListResponse(items=[BatchListItem(id=b.id, name=b.name) for b in rows])
+    # Keyset on (name, id); uq_batches_org_name already orders batches by name.
+    stmt = (
+        select(Batch.id, Batch.name)
+        .where(Batch.organization_id == org_id)
+        .order_by(Batch.name, Batch.id)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        name, batch_id = decode_cursor(cursor, 2)
+        try:
+            after = (str(name), uuid.UUID(batch_id))
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from None
+        stmt = stmt.where(tuple_(Batch.name, Batch.id) > after)
+
+    rows = db.execute(stmt).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].name, rows[-1].id)
+    return BatchListResponse(
+        items=[BatchListItem(id=r.id, name=r.name) for r in rows], next_cursor=next_cursor
+    )
 
 
 @router.post("/{org_id}/batches/{batch_id}/members", response_model=BatchAddMemberResponse)
@@ -63,7 +87,7 @@ def add_batch_member(
     batch_id: uuid.UUID,
     payload: BatchAddMemberRequest,
     db: Session = Depends(get_db),
-    _m: Membership = Depends(require_org_role("admin", "teacher")),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher")),
 ) -> BatchAddMemberResponse:
     batch = db.scalar(select(Batch).where(Batch.id == batch_id))
     if batch is None or batch.organization_id != org_id:
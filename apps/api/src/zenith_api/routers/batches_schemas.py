@@ -20,6 +20,8 @@ class BatchListItem(BaseModel):
 
 class BatchListResponse(BaseModel):
     items: list[BatchListItem]
+    # Pass back as `cursor` for the next page; null on the last page.
+    next_cursor: str | None = None
 
 
 class BatchAddMemberRequest(BaseModel):
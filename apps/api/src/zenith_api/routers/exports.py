@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from zenith_api.assessment.exports import Kind, Scope, export_path, stream_csv
+from zenith_api.auth.rbac import OrgMember, require_org_role
+from zenith_api.db.models import Batch, Job, Test
+from zenith_api.db.replica import read_sessionmaker
+from zenith_api.db.session import get_db
+from zenith_api.jobs import create_job
+from zenith_api.routers.jobs import job_response
+from zenith_api.routers.jobs_schemas import JobResponse
+from zenith_api.tasks import exports as export_tasks
+
+router = APIRouter()
+
+# Direct downloads stream straight off a cursor; POST .../exports writes the file in
+# the worker instead, for exports too large to hold a request open for.
+
+
+def _check_scope(db: Session, org_id: uuid.UUID, scope: Scope, scope_id: uuid.UUID) -> None:
+    model: Any = Test if scope == "test" else Batch
+    owner = db.scalar(select(model.organization_id).where(model.id == scope_id))
+    if owner != org_id:
+        detail = "Test not found" if scope == "test" else "Batch not found"
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+
+def _stream(member: OrgMember, kind: Kind, scope: Scope, scope_id: uuid.UUID) -> Response:
+    return StreamingResponse(
+        stream_csv(read_sessionmaker(member.user_id), kind, scope, scope_id),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{scope}-{scope_id}-{kind}.csv"'},
+    )
+
+
+def _start_export(
+    db: Session,
+    response: Response,
+    org_id: uuid.UUID,
+    member: OrgMember,
+    kind: Kind,
+    scope: Scope,
+    scope_id: uuid.UUID,
+) -> JobResponse:
+    job = create_job(db, organization_id=org_id, kind="export", total=0, created_by=member.user_id)
+    export_tasks.export_results.delay(str(job.id), kind, scope, str(scope_id))
+    response.status_code = status.HTTP_202_ACCEPTED
+    return job_response(job)
+
+
+@router.get("/{org_id}/tests/{test_id}/export")
+def export_test(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    kind: Kind = Query(default="scores"),
+    db: Session = Depends(get_db),
+    member: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> Response:
+    _check_scope(db, org_id, "test", test_id)
+    return _stream(member, kind, "test", test_id)
+
+
+@router.get("/{org_id}/batches/{batch_id}/export")
+def export_batch(
+    org_id: uuid.UUID,
+    batch_id: uuid.UUID,
+    kind: Kind = Query(default="scores"),
+    db: Session = Depends(get_db),
+    member: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> Response:
+    _check_scope(db, org_id, "batch", batch_id)
+    return _stream(member, kind, "batch", batch_id)
+
+
+@router.post("/{org_id}/tests/{test_id}/exports", response_model=JobResponse)
+def start_test_export(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    response: Response,
+    kind: Kind = Query(default="scores"),
+    db: Session = Depends(get_db),
+    member: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> JobResponse:
+    _check_scope(db, org_id, "test", test_id)
+    return _start_export(db, response, org_id, member, kind, "test", test_id)
+
+
+@router.post("/{org_id}/batches/{batch_id}/exports", response_model=JobResponse)
+def start_batch_export(
+    org_id: uuid.UUID,
+    batch_id: uuid.UUID,
+    response: Response,
+    kind: Kind = Query(default="scores"),
+    db: Session = Depends(get_db),
+    member: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> JobResponse:
+    _check_scope(db, org_id, "batch", batch_id)
+    return _start_export(db, response, org_id, member, kind, "batch", batch_id)
+
+
+@router.get("/{org_id}/jobs/{job_id}/download")
+def download_export(
+    org_id: uuid.UUID,
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> Response:
+    job = db.scalar(select(Job).where(Job.id == job_id))
+    if job is None or job.organization_id != org_id or job.kind != "export":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Export not ready")
+    path = export_path(job.id)
+    if not path.exists():
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export expired")
+    return FileResponse(path, media_type="text/csv; charset=utf-8", filename=path.name)
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from typing import Any
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from zenith_api.db.session import get_db
+from zenith_api.assessment.answer_store import buffer_stats
+from zenith_api.db.session import db_pool_stats, get_db
+from zenith_api.metrics import render
 
 router = APIRouter(tags=["health"])
 
@@ -15,6 +20,21 @@ def health() -> dict[str, str]:
 
 
 @router.get("/health/db")
-def health_db(db: Session = Depends(get_db)) -> dict[str, str]:
+def health_db(db: Session = Depends(get_db)) -> dict[str, Any]:
     db.execute(text("SELECT 1"))
-    return {"status": "ok"}
+    return {"status": "ok", "pools": db_pool_stats()}
+
+
+@router.get("/metrics")
+def metrics() -> Response:
+    return Response(render(), media_type=CONTENT_TYPE_LATEST)
+
+
+@router.get("/metrics/db")
+def metrics_db() -> dict[str, Any]:
+    return db_pool_stats()
+
+
+@router.get("/health/answer-store")
+def health_answer_store() -> dict[str, Any]:
+    return buffer_stats()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from zenith_api.auth.rbac import OrgMember, require_org_role
+from zenith_api.db.models import Job
+from zenith_api.db.session import get_db
+from zenith_api.routers.jobs_schemas import JobResponse
+
+router = APIRouter()
+
+
+def job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        total=job.total,
+        processed=job.processed,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+@router.get("/{org_id}/jobs/{job_id}", response_model=JobResponse)
+def get_job(
+    org_id: uuid.UUID,
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> JobResponse:
+    job = db.scalar(select(Job).where(Job.id == job_id))
+    if job is None or job.organization_id != org_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job_response(job)
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class JobResponse(BaseModel):
+    job_id: uuid.UUID
+    kind: str
+    status: str
+    total: int
+    processed: int
+    result: dict[str, Any] | None
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from zenith_api.assessment import leaderboard
+from zenith_api.assessment.test_window import get_test_window
+from zenith_api.auth.rbac import OrgMember, is_batch_member, require_org_role_async
+from zenith_api.db.models import Batch
+from zenith_api.db.session import get_async_db
+from zenith_api.routers.leaderboards_schemas import (
+    LeaderboardEntry,
+    LeaderboardResponse,
+    MyRankResponse,
+)
+
+router = APIRouter()
+
+MAX_TOP = 100
+MAX_AROUND = 25
+
+
+async def _check_batch(
+    db: AsyncSession, org_id: uuid.UUID, batch_id: uuid.UUID, member: OrgMember
+) -> None:
+    # Students see the boards of their own batches only.
+    if member.role == "student":
+        if not await is_batch_member(db, org_id, batch_id, member.user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not in batch")
+        return
+    batch_org = await db.scalar(select(Batch.organization_id).where(Batch.id == batch_id))
+    if batch_org != org_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+
+
+async def _test_batch(
+    db: AsyncSession, org_id: uuid.UUID, test_id: uuid.UUID, member: OrgMember
+) -> uuid.UUID:
+    window = await get_test_window(db, test_id)
+    if window is None or window.organization_id != org_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
+    await _check_batch(db, org_id, window.batch_id, member)
+    return window.batch_id
+
+
+def _unavailable(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": "1"},
+    )
+
+
+def _entry(e: leaderboard.Entry) -> LeaderboardEntry:
+    return LeaderboardEntry(user_id=e.user_id, score=e.score, rank=e.rank)
+
+
+async def _top(
+    db: AsyncSession, kind: leaderboard.Kind, board_id: uuid.UUID, limit: int
+) -> LeaderboardResponse:
+    try:
+        size, entries = await leaderboard.top(db, kind, board_id, limit)
+    except leaderboard.LeaderboardBuildingError:
+        raise _unavailable("Leaderboard is being rebuilt") from None
+    except RedisError:
+        raise _unavailable("Leaderboard unavailable") from None
+    return LeaderboardResponse(size=size, entries=[_entry(e) for e in entries])
+
+
+async def _mine(
+    db: AsyncSession, kind: leaderboard.Kind, board_id: uuid.UUID, user_id: uuid.UUID, k: int
+) -> MyRankResponse:
+    try:
+        found = await leaderboard.around(db, kind, board_id, user_id, k)
+    except leaderboard.LeaderboardBuildingError:
+        raise _unavailable("Leaderboard is being rebuilt") from None
+    except RedisError:
+        raise _unavailable("Leaderboard unavailable") from None
+    if found is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not on leaderboard")
+    size, me, neighbours = found
+    return MyRankResponse(size=size, me=_entry(me), neighbours=[_entry(e) for e in neighbours])
+
+
+@router.get("/{org_id}/tests/{test_id}/leaderboard", response_model=LeaderboardResponse)
+async def get_test_leaderboard(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    limit: int = Query(default=10, ge=1, le=MAX_TOP),
+    db: AsyncSession = Depends(get_async_db),
+    member: OrgMember = Depends(require_org_role_async("admin", "teacher", "student")),
+) -> LeaderboardResponse:
+    await _test_batch(db, org_id, test_id, member)
+    return await _top(db, "test", test_id, limit)
+
+
+@router.get("/{org_id}/tests/{test_id}/leaderboard/me", response_model=MyRankResponse)
+async def get_my_test_rank(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    around: int = Query(default=5, ge=0, le=MAX_AROUND),
+    db: AsyncSession = Depends(get_async_db),
+    member: OrgMember = Depends(require_org_role_async("admin", "teacher", "student")),
+) -> MyRankResponse:
+    await _test_batch(db, org_id, test_id, member)
+    return await _mine(db, "test", test_id, member.user_id, around)
+
+
+@router.get("/{org_id}/batches/{batch_id}/leaderboard", response_model=LeaderboardResponse)
+async def get_batch_leaderboard(
+    org_id: uuid.UUID,
+    batch_id: uuid.UUID,
+    limit: int = Query(default=10, ge=1, le=MAX_TOP),
+    db: AsyncSession = Depends(get_async_db),
+    member: OrgMember = Depends(require_org_role_async("admin", "teacher", "student")),
+) -> LeaderboardResponse:
+    # Ranked by total score over the batch's tests.
+    await _check_batch(db, org_id, batch_id, member)
+    return await _top(db, "batch", batch_id, limit)
+
+
+@router.get("/{org_id}/batches/{batch_id}/leaderboard/me", response_model=MyRankResponse)
+async def get_my_batch_rank(
+    org_id: uuid.UUID,
+    batch_id: uuid.UUID,
+    around: int = Query(default=5, ge=0, le=MAX_AROUND),
+    db: AsyncSession = Depends(get_async_db),
+    member: OrgMember = Depends(require_org_role_async("admin", "teacher", "student")),
+) -> MyRankResponse:
+    await _check_batch(db, org_id, batch_id, member)
+    return await _mine(db, "batch", batch_id, member.user_id, around)
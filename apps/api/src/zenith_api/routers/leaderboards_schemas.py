@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import uuid
+
+from pydantic import BaseModel
+
+
+class LeaderboardEntry(BaseModel):
+    user_id: uuid.UUID
+    score: int
+    rank: int
+
+
+class LeaderboardResponse(BaseModel):
+    # Users with a score on the board.
+    size: int
+    entries: list[LeaderboardEntry]
+
+
+class MyRankResponse(BaseModel):
+    size: int
+    me: LeaderboardEntry
+    # Best first, including `me`.
+    neighbours: list[LeaderboardEntry]
@@ -1,36 +1,56 @@
 from __future__ import annotations
 
+import csv
+import io
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Response, UploadFile, status
+from pydantic import ValidationError
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
-from zenith_api.auth.deps import get_current_user
-from zenith_api.auth.rbac import require_org_role
-from zenith_api.auth.security import hash_password
-from zenith_api.db.models import Membership, Organization, Role, User
+from zenith_api.auth.deps import Principal, get_current_user, get_verified_principal
+from zenith_api.auth.hashing import hash_password_pooled
+from zenith_api.auth.rbac import OrgMember, get_org_role, invalidate_org_role, require_org_role
+from zenith_api.config import settings
+from zenith_api.db.models import Batch, Membership, Organization, User
+from zenith_api.db.replica import get_read_db
 from zenith_api.db.session import get_db
+from zenith_api.jobs import create_job, fail_job
+from zenith_api.ratelimit import rate_limit
+from zenith_api.rbac.enrollment import (
+    MAX_REPORTED_ERRORS,
+    Enrollee,
+    discard_staged,
+    run_enrollment,
+    stage_enrollees,
+)
+from zenith_api.rbac.roles import get_role_id
+from zenith_api.routers.jobs import job_response
+from zenith_api.routers.jobs_schemas import JobResponse
 from zenith_api.routers.orgs_schemas import (
     AddMemberRequest,
     AddMemberResponse,
+    EnrollmentMember,
+    EnrollmentRequest,
     MeResponse,
     OrgCreateRequest,
     OrgCreateResponse,
 )
+from zenith_api.tasks import enrollment as enrollment_tasks
 
 router = APIRouter()
 
 
-def _get_role(db: Session, code: str) -> Role:
-    role = db.scalar(select(Role).where(Role.code == code))
-    if role is None:
+def _get_role_id(db: Session, code: str) -> uuid.UUID:
+    role_id = get_role_id(db, code)
+    if role_id is None:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Role '{code}' not found. Run seed.",
         )
-    return role
+    return role_id
 
 
 @router.post("", response_model=OrgCreateResponse)
@@ -51,7 +71,7 @@ def create_org(
         ) from None
     db.refresh(org)
 
-    admin_role = _get_role(db, "admin")
+    admin_role_id = _get_role_id(db, "admin")
 
     existing = db.scalar(
         select(Membership).where(
@@ -63,7 +83,7 @@ def create_org(
         m = Membership(
             organization_id=org.id,
             user_id=user.id,
-            role_id=admin_role.id,
+            role_id=admin_role_id,
         )
         db.add(m)
         db.commit()
@@ -76,14 +96,14 @@ def add_member(
     org_id: uuid.UUID,
     payload: AddMemberRequest,
     db: Session = Depends(get_db),
-    _admin_membership: Membership = Depends(require_org_role("admin")),
+    _admin: OrgMember = Depends(require_org_role("admin")),
 ) -> AddMemberResponse:
     # Ensure org exists
     org = db.scalar(select(Organization).where(Organization.id == org_id))
     if org is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organization not found")
 
-    role = _get_role(db, payload.role)
+    role_id = _get_role_id(db, payload.role)
 
     # Find or create user
     user = db.scalar(select(User).where(User.email == payload.email))
@@ -94,7 +114,7 @@ def add_member(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Password required when creating a new user",
             )
-        user = User(email=payload.email, hashed_password=hash_password(payload.password))
+        user = User(email=payload.email, hashed_password=hash_password_pooled(payload.password))
         db.add(user)
         db.commit()
         db.refresh(user)
@@ -111,15 +131,16 @@ def add_member(
         membership = Membership(
             organization_id=org_id,
             user_id=user.id,
-            role_id=role.id,
+            role_id=role_id,
         )
         db.add(membership)
         db.commit()
         db.refresh(membership)
     else:
-        membership.role_id = role.id
+        membership.role_id = role_id
         db.commit()
         db.refresh(membership)
+        invalidate_org_role(org_id, user.id)
 
     return AddMemberResponse(user_id=user.id, membership_id=membership.id)
 
@@ -127,22 +148,120 @@ def add_member(
 @router.get("/{org_id}/me", response_model=MeResponse)
 def me_in_org(
     org_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    principal: Principal = Depends(get_verified_principal),
 ) -> MeResponse:
-    membership = db.scalar(
-        select(Membership)
-        .options(joinedload(Membership.role))
-        .where(
-            Membership.organization_id == org_id,
-            Membership.user_id == user.id,
-        )
-    )
-    if membership is None:
+    role = get_org_role(db, org_id, principal.user_id)
+    if role is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Membership not found")
 
     return MeResponse(
-        user_id=user.id,
+        user_id=principal.user_id,
         organization_id=org_id,
-        role=membership.role.code,
+        role=role,
     )
+
+
+def _start_enrollment(
+    db: Session,
+    response: Response,
+    org_id: uuid.UUID,
+    admin: OrgMember,
+    batch_id: uuid.UUID | None,
+    role: str,
+    enrollees: list[Enrollee],
+) -> JobResponse:
+    if batch_id is not None:
+        batch = db.scalar(select(Batch).where(Batch.id == batch_id))
+        if batch is None or batch.organization_id != org_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+
+    job = create_job(
+        db,
+        organization_id=org_id,
+        kind="enrollment",
+        total=len(enrollees),
+        created_by=admin.user_id,
+    )
+    if len(enrollees) <= settings.enrollment_inline_max_rows:
+        # Hashes go through the bounded pool, so an enrollment sheds load like a login.
+        run_enrollment(db, job.id, org_id, batch_id, role, enrollees, hash_password_pooled)
+        db.refresh(job)
+        return job_response(job)
+
+    # New accounts need an argon2 hash each, so large lists go to a worker.
+    try:
+        stage_enrollees(job.id, enrollees)
+        enrollment_tasks.enroll_members.delay(
+            str(job.id), str(org_id), str(batch_id) if batch_id else None, role
+        )
+    except Exception as e:
+        discard_staged(job.id)
+        fail_job(db, job.id, str(e))
+        raise
+    response.status_code = status.HTTP_202_ACCEPTED
+    return job_response(job)
+
+
+@router.post(
+    "/{org_id}/enrollments",
+    response_model=JobResponse,
+    dependencies=[Depends(rate_limit("org.bulk", per="org", roles=("admin",)))],
+)
+def enroll_members(
+    org_id: uuid.UUID,
+    payload: EnrollmentRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+    admin: OrgMember = Depends(require_org_role("admin")),
+) -> JobResponse:
+    enrollees = [
+        Enrollee(row=i, email=m.email, password=m.password)
+        for i, m in enumerate(payload.members, start=1)
+    ]
+    return _start_enrollment(db, response, org_id, admin, payload.batch_id, payload.role, enrollees)
+
+
+@router.post(
+    "/{org_id}/enrollments/csv",
+    response_model=JobResponse,
+    dependencies=[Depends(rate_limit("org.bulk", per="org", roles=("admin",)))],
+)
+def enroll_members_csv(
+    org_id: uuid.UUID,
+    response: Response,
+    file: UploadFile = File(...),
+    role: str = Form(default="student", pattern="^(teacher|student)$"),
+    batch_id: uuid.UUID | None = Form(default=None),
+    db: Session = Depends(get_db),
+    admin: OrgMember = Depends(require_org_role("admin")),
+) -> JobResponse:
+    # Columns: email, and password for accounts that do not exist yet.
+    enrollees: list[Enrollee] = []
+    errors: list[dict[str, object]] = []
+    error_count = 0
+    try:
+        reader = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""))
+        for row, rec in enumerate(reader, start=2):
+            try:
+                m = EnrollmentMember.model_validate(
+                    {"email": rec.get("email"), "password": rec.get("password") or None}
+                )
+            except ValidationError as e:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": row, "msg": e.errors()[0]["msg"]})
+                continue
+            enrollees.append(Enrollee(row=row, email=m.email, password=m.password))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unreadable file: {e}"
+        ) from None
+    if error_count:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"error_count": error_count, "errors": errors},
+        )
+    if not enrollees:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No members")
+    return _start_enrollment(db, response, org_id, admin, batch_id, role, enrollees)
@@ -24,6 +24,17 @@ class AddMemberResponse(BaseModel):
     membership_id: uuid.UUID
 
 
+class EnrollmentMember(BaseModel):
+    email: EmailStr
+    password: str | None = Field(default=None, min_length=8, max_length=128)
+
+
+class EnrollmentRequest(BaseModel):
+    role: str = Field(default="student", pattern="^(teacher|student)$")
+    batch_id: uuid.UUID | None = None
+    members: list[EnrollmentMember] = Field(min_length=1, max_length=50_000)
+
+
 class MeResponse(BaseModel):
     user_id: uuid.UUID
     organization_id: uuid.UUID
@@ -1,47 +1,96 @@
 from __future__ import annotations
 
+import csv
+import io
 import uuid
-from datetime import UTC, datetime
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import and_, func, select
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import psycopg
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from sqlalchemy import and_, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from zenith_api.auth.deps import get_current_user
-from zenith_api.auth.rbac import require_batch_member, require_org_role
+from zenith_api.assessment.admission import admission_wait
+from zenith_api.assessment.answer_keys import get_answer_key, invalidate_answer_key
+from zenith_api.assessment.answer_store import AnswerWrite, flush_attempt, save_answers
+from zenith_api.assessment.leaderboard import record_submission
+from zenith_api.assessment.paper import get_paper
+from zenith_api.assessment.question_import import (
+    copy_questions,
+    error_detail,
+    parse_csv,
+    parse_jsonl,
+    validate_questions,
+)
+from zenith_api.assessment.scoring import EMPTY_BREAKDOWN, submit_and_score
+from zenith_api.assessment.test_window import get_test_window
+from zenith_api.auth.deps import Principal, get_principal, get_verified_principal
+from zenith_api.auth.rbac import (
+    OrgMember,
+    is_batch_member,
+    require_org_role,
+    require_org_role_async,
+)
+from zenith_api.config import settings
 from zenith_api.db.models import (
     Attempt,
-    AttemptAnswer,
     Batch,
-    Membership,
     Question,
     QuestionOption,
     Test,
-    User,
 )
-from zenith_api.db.session import get_db
+from zenith_api.db.replica import get_read_db, note_write, note_write_async
+from zenith_api.db.session import get_async_db, get_db
+from zenith_api.jobs import create_job
+from zenith_api.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from zenith_api.ratelimit import rate_limit
+from zenith_api.routers.jobs import job_response
+from zenith_api.routers.jobs_schemas import JobResponse
 from zenith_api.routers.tests_schemas import (
+    AnswerKeyUpdateRequest,
+    AnswerSyncItem,
+    AnswerSyncRequest,
+    AnswerSyncResponse,
     AnswerUpsertRequest,
     AttemptStartResponse,
     QuestionCreateRequest,
     QuestionCreateResponse,
+    QuestionImportResponse,
     SubmitAttemptResponse,
     TestCreateRequest,
     TestCreateResponse,
     TestListItem,
     TestListResponse,
 )
+from zenith_api.tasks import regrade as regrade_tasks
 
 router = APIRouter()
 
+# Answer autosave is the hot path: by default it trusts the signed token and never
+# loads the user row. Set EXAM_STATELESS_AUTH=false to re-check the user per request.
+exam_principal = get_principal if settings.exam_stateless_auth else get_verified_principal
+
 
 @router.post("/{org_id}/tests", response_model=TestCreateResponse)
 def create_test(
     org_id: uuid.UUID,
     payload: TestCreateRequest,
     db: Session = Depends(get_db),
-    _m: Membership = Depends(require_org_role("admin", "teacher")),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher")),
 ) -> TestCreateResponse:
     batch = db.scalar(select(Batch).where(Batch.id == payload.batch_id))
     if batch is None or batch.organization_id != org_id:
@@ -53,33 +102,68 @@ def create_test(
         title=payload.title,
         starts_at=payload.starts_at,
         ends_at=payload.ends_at,
+        duration_minutes=payload.duration_minutes,
+        marks_correct=payload.marks_correct,
+        marks_incorrect=payload.marks_incorrect,
     )
     db.add(t)
     db.commit()
     db.refresh(t)
+    note_write(_m.user_id)
     return TestCreateResponse(test_id=t.id)
 
 
 @router.get("/{org_id}/tests", response_model=TestListResponse)
 def list_tests(
     org_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    _m: Membership = Depends(require_org_role("admin", "teacher", "student")),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: Session = Depends(get_read_db),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher", "student")),
 ) -> TestListResponse:
-    rows = db.scalars(
-        select(Test).where(Test.organization_id == org_id).order_by(Test.created_at.desc())
-    ).all()
+    # Newest first, keyset on (created_at, id) via ix_tests_organization_id_created_at.
+    stmt = (
+        select(
+            Test.id,
+            Test.title,
+            Test.batch_id,
+            Test.starts_at,
+            Test.ends_at,
+            Test.duration_minutes,
+            Test.created_at,
+        )
+        .where(Test.organization_id == org_id)
+        .order_by(Test.created_at.desc(), Test.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        created_at, test_id = decode_cursor(cursor, 2)
+        try:
+            after = (datetime.fromisoformat(created_at), uuid.UUID(test_id))
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from None
+        stmt = stmt.where(tuple_(Test.created_at, Test.id) < after)
+
+    rows = db.execute(stmt).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at.isoformat(), rows[-1].id)
     return TestListResponse(
         items=[
             TestListItem(
-                id=t.id,
-                title=t.title,
-                batch_id=t.batch_id,
-                starts_at=t.starts_at,
-                ends_at=t.ends_at,
+                id=r.id,
+                title=r.title,
+                batch_id=r.batch_id,
+                starts_at=r.starts_at,
+                ends_at=r.ends_at,
+                duration_minutes=r.duration_minutes,
             )
-            for t in rows
-        ]
+            for r in rows
+        ],
+        next_cursor=next_cursor,
     )
 
 
@@ -89,7 +173,7 @@ def add_question(
     test_id: uuid.UUID,
     payload: QuestionCreateRequest,
     db: Session = Depends(get_db),
-    _m: Membership = Depends(require_org_role("admin", "teacher")),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher")),
 ) -> QuestionCreateResponse:
     test = db.scalar(select(Test).where(Test.id == test_id))
     if test is None or test.organization_id != org_id:
@@ -98,43 +182,250 @@ def add_question(
     if not payload.options:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Options required")
 
-    if payload.correct_position not in {o.position for o in payload.options}:
+    correct = payload.correct_set()
+    if not correct <= {o.position for o in payload.options}:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Invalid correct_position"
         )
 
-    q = Question(test_id=test_id, prompt=payload.prompt, position=payload.position)
+    q = Question(
+        test_id=test_id,
+        prompt=payload.prompt,
+        position=payload.position,
+        section=payload.section,
+        marks_correct=payload.marks_correct,
+        marks_incorrect=payload.marks_incorrect,
+    )
     db.add(q)
-    db.commit()
-    db.refresh(q)
+    db.flush()
 
     for o in payload.options:
         opt = QuestionOption(
             question_id=q.id,
             text=o.text,
             position=o.position,
-            is_correct=(o.position == payload.correct_position),
+            is_correct=o.position in correct,
         )
         db.add(opt)
 
+    db.execute(
+        update(Test)
+        .where(Test.id == test_id)
+        .values(content_version=Test.content_version + 1)
+    )
     db.commit()
+    invalidate_answer_key(test_id, test.content_version)
     return QuestionCreateResponse(question_id=q.id)
 
 
-@router.post("/{org_id}/tests/{test_id}/attempts/start", response_model=AttemptStartResponse)
-def start_attempt(
+def _start_regrade(
+    db: Session, response: Response, org_id: uuid.UUID, test_id: uuid.UUID, member: OrgMember
+) -> JobResponse:
+    submitted = db.scalar(
+        select(func.count())
+        .select_from(Attempt)
+        .where(Attempt.test_id == test_id, Attempt.submitted_at.is_not(None))
+    )
+    job = create_job(
+        db,
+        organization_id=org_id,
+        kind="regrade",
+        total=submitted or 0,
+        created_by=member.user_id,
+    )
+    regrade_tasks.regrade_test.delay(str(job.id), str(test_id))
+    response.status_code = status.HTTP_202_ACCEPTED
+    return job_response(job)
+
+
+@router.put(
+    "/{org_id}/tests/{test_id}/questions/{question_id}/answer-key",
+    response_model=JobResponse,
+)
+def update_answer_key(
     org_id: uuid.UUID,
     test_id: uuid.UUID,
+    question_id: uuid.UUID,
+    payload: AnswerKeyUpdateRequest,
+    response: Response,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> AttemptStartResponse:
+    member: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> JobResponse:
+    # Fixes which options are correct, then re-grades submitted attempts in the
+    # background; poll the returned job.
+    test = db.scalar(select(Test).where(Test.id == test_id))
+    if test is None or test.organization_id != org_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
+    positions = set(
+        db.scalars(
+            select(QuestionOption.position)
+            .join(Question, Question.id == QuestionOption.question_id)
+            .where(Question.id == question_id, Question.test_id == test_id)
+        )
+    )
+    if not positions:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
+    correct = set(payload.correct_positions)
+    if not correct <= positions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid correct_positions"
+        )
+
+    db.execute(
+        update(QuestionOption)
+        .where(QuestionOption.question_id == question_id)
+        .values(is_correct=QuestionOption.position.in_(correct))
+    )
+    db.execute(
+        update(Test)
+        .where(Test.id == test_id)
+        .values(content_version=Test.content_version + 1)
+    )
+    db.commit()
+    invalidate_answer_key(test_id, test.content_version)
+    return _start_regrade(db, response, org_id, test_id, member)
+
+
+@router.post("/{org_id}/tests/{test_id}/regrade", response_model=JobResponse)
+def regrade_test(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    response: Response,
+    db: Session = Depends(get_db),
+    member: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> JobResponse:
+    # For key changes made outside the API; safe to repeat.
     test = db.scalar(select(Test).where(Test.id == test_id))
+    if test is None or test.organization_id != org_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
+    return _start_regrade(db, response, org_id, test_id, member)
+
+
+@router.post(
+    "/{org_id}/tests/{test_id}/questions/import",
+    response_model=QuestionImportResponse,
+    dependencies=[Depends(rate_limit("org.bulk", per="org", roles=("admin", "teacher")))],
+)
+def import_questions(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    _m: OrgMember = Depends(require_org_role("admin", "teacher")),
+) -> QuestionImportResponse:
+    test = db.scalar(select(Test).where(Test.id == test_id))
+    if test is None or test.organization_id != org_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
+
+    # JSON lines of QuestionCreateRequest, or CSV with
+    # prompt,position,correct_position,option_1..option_N columns.
+    name = (file.filename or "").lower()
+    content_type = (file.content_type or "").split(";")[0]
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    if name.endswith(".csv") or content_type == "text/csv":
+        parsed = parse_csv(stream)
+    elif name.endswith((".jsonl", ".ndjson")) or content_type in {
+        "application/jsonl",
+        "application/x-ndjson",
+    }:
+        parsed = parse_jsonl(stream)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload a .jsonl or .csv file",
+        )
+
+    existing = set(db.scalars(select(Question.position).where(Question.test_id == test_id)))
+    try:
+        questions, errors, error_count = validate_questions(
+            parsed, existing, settings.question_import_max_rows
+        )
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unreadable file: {e}"
+        ) from None
+    if error_count:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=error_detail(errors, error_count),
+        )
+    if not questions:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No questions")
+
+    try:
+        imported = copy_questions(db, test_id, questions)
+        db.execute(
+            update(Test)
+            .where(Test.id == test_id)
+            .values(content_version=Test.content_version + 1)
+        )
+        db.commit()
+    except (IntegrityError, psycopg.IntegrityError):
+        # Another writer took one of the positions after validation.
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Question positions changed during import",
+        ) from None
+    invalidate_answer_key(test_id, test.content_version)
+    return QuestionImportResponse(imported=imported)
+
+
+@router.get("/{org_id}/tests/{test_id}/paper", response_class=Response)
+async def get_test_paper(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    if_none_match: str | None = Header(default=None),
+    accept_encoding: str = Header(default=""),
+    db: AsyncSession = Depends(get_async_db),
+    member: OrgMember = Depends(require_org_role_async("admin", "teacher", "student")),
+) -> Response:
+    test = await db.scalar(select(Test).where(Test.id == test_id))
+    if test is None or test.organization_id != org_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
+
+    if member.role == "student":
+        if not await is_batch_member(db, org_id, test.batch_id, member.user_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not in batch")
+        if test.starts_at and datetime.now(UTC) < test.starts_at:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Test not started")
+
+    paper = await get_paper(db, test)
+    gzipped = "gzip" in accept_encoding.lower()
+    # Strong validators differ per encoding, as the bytes differ.
+    etag = f'{paper.etag[:-1]}-gz"' if gzipped else paper.etag
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+
+    # If-None-Match compares weakly (RFC 9110): proxies that re-encode mark tags W/.
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return Response(paper.gzip_body, media_type="application/json", headers=headers)
+    return Response(paper.body, media_type="application/json", headers=headers)
+
+
+@router.post("/{org_id}/tests/{test_id}/attempts/start", response_model=AttemptStartResponse)
+async def start_attempt(
+    org_id: uuid.UUID,
+    test_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(exam_principal),
+) -> AttemptStartResponse:
+    # Everyone opens the exam in the same second: window and batch membership come
+    # from cache, and the attempt is created or found without a failing INSERT.
+    test = await get_test_window(db, test_id)
     if test is None or test.organization_id != org_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
 
     # must be in the test batch
-    _ = require_batch_member()(org_id=org_id, batch_id=test.batch_id, db=db, user=user)
+    if not await is_batch_member(db, org_id, test.batch_id, principal.user_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not in batch")
 
     now = datetime.now(UTC)
     if test.starts_at and now < test.starts_at:
@@ -142,106 +433,217 @@ def start_attempt(
     if test.ends_at and now > test.ends_at:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Test ended")
 
-    a = Attempt(test_id=test_id, user_id=user.id)
-    db.add(a)
-    try:
-        db.commit()
-    except IntegrityError:
-        db.rollback()
-        existing = db.scalar(
-            select(Attempt).where(and_(Attempt.test_id == test_id, Attempt.user_id == user.id))
+    # Students resuming an attempt they already have (after a reload, say) skip the
+    # admission gate and keep the deadline set when the attempt was first started.
+    existing = select(Attempt.id, Attempt.deadline_at).where(
+        and_(Attempt.test_id == test_id, Attempt.user_id == principal.user_id)
+    )
+    row = (await db.execute(existing)).first()
+    if row is not None:
+        return AttemptStartResponse(attempt_id=row.id, deadline_at=row.deadline_at, server_time=now)
+
+    wait = await admission_wait(test_id, principal.user_id)
+    if wait > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Your attempt opens in {wait} seconds",
+            headers={"Retry-After": str(wait)},
         )
-        if existing is None:
-            raise
-        return AttemptStartResponse(attempt_id=existing.id)
 
-    db.refresh(a)
-    return AttemptStartResponse(attempt_id=a.id)
+    # A double-clicked start may race this one; the loser reads the winner's row.
+    row = (
+        await db.execute(
+            pg_insert(Attempt)
+            .values(
+                id=uuid.uuid4(),
+                test_id=test_id,
+                user_id=principal.user_id,
+                deadline_at=test.deadline_for(now),
+            )
+            .on_conflict_do_nothing(constraint="uq_attempts_test_user")
+            .returning(Attempt.id, Attempt.deadline_at)
+        )
+    ).first()
+    if row is None:
+        row = (await db.execute(existing)).first()
+    await db.commit()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Attempt not created")
+    return AttemptStartResponse(attempt_id=row.id, deadline_at=row.deadline_at, server_time=now)
 
 
-@router.put("/{org_id}/attempts/{attempt_id}/answers/{question_id}")
-def upsert_answer(
+async def _get_attempt_test(
+    db: AsyncSession,
     org_id: uuid.UUID,
     attempt_id: uuid.UUID,
-    question_id: uuid.UUID,
-    payload: AnswerUpsertRequest,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> dict[str, str]:
-    attempt = db.scalar(select(Attempt).where(Attempt.id == attempt_id))
-    if attempt is None or attempt.user_id != user.id:
+    user_id: uuid.UUID,
+) -> tuple[uuid.UUID, int]:
+    # The deadline rides along on the row every answer write already loads.
+    row = (
+        await db.execute(
+            select(
+                Attempt.user_id,
+                Attempt.deadline_at,
+                Attempt.submitted_at,
+                Test.organization_id,
+                Test.id,
+                Test.content_version,
+            )
+            .join(Test, Attempt.test_id == Test.id)
+            .where(Attempt.id == attempt_id)
+        )
+    ).tuples().first()
+    if row is None or row[0] != user_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attempt not found")
-
-    test = db.scalar(select(Test).where(Test.id == attempt.test_id))
-    if test is None or test.organization_id != org_id:
+    _, deadline_at, submitted_at, test_org_id, test_id, content_version = row
+    if test_org_id != org_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Test not found")
+    if submitted_at is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Attempt submitted")
+    # The grace absorbs writes sent just before the deadline and delivered after it.
+    if deadline_at is not None and datetime.now(UTC) > deadline_at + timedelta(
+        seconds=settings.answer_grace_seconds
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Time is up")
+    return test_id, content_version
+
+
+def _dedupe_answers(answers: list[AnswerSyncItem]) -> dict[uuid.UUID, AnswerSyncItem]:
+    # One row per question: Postgres rejects ON CONFLICT touching the same row twice.
+    latest: dict[uuid.UUID, AnswerSyncItem] = {}
+    for a in answers:
+        prev = latest.get(a.question_id)
+        if (
+            prev is None
+            or a.client_seq is None
+            or prev.client_seq is None
+            or a.client_seq >= prev.client_seq
+        ):
+            latest[a.question_id] = a
+    return latest
+
+
+async def _upsert_answers(
+    db: AsyncSession,
+    org_id: uuid.UUID,
+    attempt_id: uuid.UUID,
+    user_id: uuid.UUID,
+    answers: list[AnswerSyncItem],
+) -> int:
+    test_id, content_version = await _get_attempt_test(db, org_id, attempt_id, user_id)
+    key = await get_answer_key(db, test_id, content_version)
+
+    latest = _dedupe_answers(answers)
+    for a in latest.values():
+        if not key.is_valid(a.question_id, a.selected_option_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid option for question {a.question_id}",
+            )
 
-    q = db.scalar(select(Question).where(Question.id == question_id))
-    if q is None or q.test_id != test.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
+    return await save_answers(
+        db,
+        attempt_id,
+        [
+            AnswerWrite(
+                question_id=a.question_id,
+                selected_option_id=a.selected_option_id,
+                client_seq=a.client_seq,
+            )
+            for a in latest.values()
+        ],
+    )
 
-    opt = db.scalar(select(QuestionOption).where(QuestionOption.id == payload.selected_option_id))
-    if opt is None or opt.question_id != q.id:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid option")
 
-    row = db.scalar(
-        select(AttemptAnswer).where(
-            AttemptAnswer.attempt_id == attempt_id,
-            AttemptAnswer.question_id == question_id,
-        )
+@router.put(
+    "/{org_id}/attempts/{attempt_id}/answers/{question_id}",
+    dependencies=[Depends(rate_limit("answers.save", per="user"))],
+)
+async def upsert_answer(
+    org_id: uuid.UUID,
+    attempt_id: uuid.UUID,
+    question_id: uuid.UUID,
+    payload: AnswerUpsertRequest,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(exam_principal),
+) -> dict[str, str]:
+    await _upsert_answers(
+        db,
+        org_id,
+        attempt_id,
+        principal.user_id,
+        [
+            AnswerSyncItem(
+                question_id=question_id,
+                selected_option_id=payload.selected_option_id,
+                client_seq=payload.client_seq,
+            )
+        ],
     )
-    if row is None:
-        row = AttemptAnswer(
-            attempt_id=attempt_id,
-            question_id=question_id,
-            selected_option_id=payload.selected_option_id,
-        )
-        db.add(row)
-    else:
-        row.selected_option_id = payload.selected_option_id
-
-    db.commit()
     return {"status": "ok"}
 
 
+@router.put(
+    "/{org_id}/attempts/{attempt_id}/answers",
+    response_model=AnswerSyncResponse,
+    dependencies=[Depends(rate_limit("answers.save", per="user"))],
+)
+async def sync_answers(
+    org_id: uuid.UUID,
+    attempt_id: uuid.UUID,
+    payload: AnswerSyncRequest,
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(exam_principal),
+) -> AnswerSyncResponse:
+    applied = await _upsert_answers(db, org_id, attempt_id, principal.user_id, payload.answers)
+    return AnswerSyncResponse(applied=applied, ignored=len(payload.answers) - applied)
+
+
 @router.post("/{org_id}/attempts/{attempt_id}/submit", response_model=SubmitAttemptResponse)
-def submit_attempt(
+async def submit_attempt(
     org_id: uuid.UUID,
     attempt_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(exam_principal),
 ) -> SubmitAttemptResponse:
-    attempt = db.scalar(select(Attempt).where(Attempt.id == attempt_id))
-    if attempt is None or attempt.user_id != user.id:
+    attempt = await db.scalar(select(Attempt).where(Attempt.id == attempt_id))
+    if attempt is None or attempt.user_id != principal.user_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attempt not found")
 
-    test = db.scalar(select(Test).where(Test.id == attempt.test_id))
+    test = await db.scalar(select(Test).where(Test.id == attempt.test_id))
     if test is None or test.organization_id != org_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Test not found"
         )
 
-    total = db.scalar(
-        select(func.count())
-        .select_from(Question)
-        .where(Question.test_id == test.id)
-    ) or 0
-
-    correct = db.scalar(
-        select(func.count())
-        .select_from(AttemptAnswer)
-        .join(QuestionOption, AttemptAnswer.selected_option_id == QuestionOption.id)
-        .join(Question, AttemptAnswer.question_id == Question.id)
-        .where(
-            AttemptAnswer.attempt_id == attempt.id,
-            Question.test_id == test.id,
-            QuestionOption.is_correct.is_(True),
-        )
-    ) or 0
-
-    attempt.submitted_at = datetime.now(UTC)
-    attempt.score = int(correct)
-    db.commit()
-
-    return SubmitAttemptResponse(score=int(correct), total=int(total))
+    if attempt.submitted_at is not None:
+        # Already submitted, by the student or by the deadline sweep.
+        return _submit_response(attempt.score or 0, attempt.score_breakdown or EMPTY_BREAKDOWN)
+
+    # Buffered answers must reach Postgres before they can be scored.
+    await flush_attempt(db, attempt.id)
+
+    scored = await submit_and_score(db, test.id, attempt.id, datetime.now(UTC))
+    if scored is None:
+        # The deadline sweep got there first.
+        await db.rollback()
+        await db.refresh(attempt)
+        return _submit_response(attempt.score or 0, attempt.score_breakdown or EMPTY_BREAKDOWN)
+    score, breakdown = scored
+    await db.commit()
+    await note_write_async(principal.user_id)
+    await record_submission(db, test.id, test.batch_id, principal.user_id, score)
+
+    return _submit_response(score, breakdown)
+
+
+def _submit_response(score: int, breakdown: dict[str, Any]) -> SubmitAttemptResponse:
+    return SubmitAttemptResponse(
+        score=score,
+        total=breakdown["max_score"],
+        correct=breakdown["correct"],
+        incorrect=breakdown["incorrect"],
+        unattempted=breakdown["unattempted"],
+        sections=breakdown["sections"],
+    )
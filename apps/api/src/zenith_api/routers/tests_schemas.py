@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 
 
 class TestCreateRequest(BaseModel):
@@ -11,6 +11,10 @@ class TestCreateRequest(BaseModel):
     title: str
     starts_at: datetime | None = None
     ends_at: datetime | None = None
+    # Per-student time limit from starting the attempt; ends_at still caps it.
+    duration_minutes: int | None = Field(default=None, ge=1)
+    marks_correct: int = Field(default=1, ge=0)
+    marks_incorrect: int = Field(default=0, le=0)  # negative marking, e.g. -1
 
 
 class TestCreateResponse(BaseModel):
@@ -26,33 +30,93 @@ class QuestionCreateRequest(BaseModel):
     prompt: str
     position: int
     options: list[OptionCreate]
-    correct_position: int  # which option position is correct
+    # Either the correct option's position, or several when more than one is accepted.
+    correct_position: int | None = None
+    correct_positions: list[int] | None = Field(default=None, min_length=1)
+    section: str | None = Field(default=None, max_length=100)
+    # Override the test's marks for this question.
+    marks_correct: int | None = Field(default=None, ge=0)
+    marks_incorrect: int | None = Field(default=None, le=0)
+
+    @model_validator(mode="after")
+    def _one_answer_form(self) -> QuestionCreateRequest:
+        if (self.correct_position is None) == (self.correct_positions is None):
+            raise ValueError("give exactly one of correct_position or correct_positions")
+        return self
+
+    def correct_set(self) -> set[int]:
+        if self.correct_positions is not None:
+            return set(self.correct_positions)
+        return {self.correct_position} if self.correct_position is not None else set()
 
 
 class QuestionCreateResponse(BaseModel):
     question_id: uuid.UUID
 
 
+class AnswerKeyUpdateRequest(BaseModel):
+    correct_positions: list[int] = Field(min_length=1)
+
+
+class QuestionImportResponse(BaseModel):
+    imported: int
+
+
 class TestListItem(BaseModel):
     id: uuid.UUID
     title: str
     batch_id: uuid.UUID
     starts_at: datetime | None
     ends_at: datetime | None
+    duration_minutes: int | None
 
 
 class TestListResponse(BaseModel):
     items: list[TestListItem]
+    # Pass back as `cursor` for the next page; null on the last page.
+    next_cursor: str | None = None
 
 
 class AttemptStartResponse(BaseModel):
     attempt_id: uuid.UUID
+    # Answers are refused after this; count down from server_time, not the client clock.
+    deadline_at: datetime | None
+    server_time: datetime
 
 
 class AnswerUpsertRequest(BaseModel):
     selected_option_id: uuid.UUID
+    client_seq: int | None = Field(default=None, ge=0)
+
+
+class AnswerSyncItem(BaseModel):
+    question_id: uuid.UUID
+    selected_option_id: uuid.UUID
+    client_seq: int | None = Field(default=None, ge=0)
+
+
+class AnswerSyncRequest(BaseModel):
+    answers: list[AnswerSyncItem] = Field(min_length=1, max_length=500)
+
+
+class AnswerSyncResponse(BaseModel):
+    applied: int  # rows inserted or updated
+    ignored: int  # stale (older client_seq) or duplicate writes
+
+
+class SectionScore(BaseModel):
+    section: str | None
+    score: int
+    max_score: int
+    correct: int
+    incorrect: int
+    unattempted: int
 
 
 class SubmitAttemptResponse(BaseModel):
     score: int
-    total: int
+    total: int  # maximum possible score
+    correct: int
+    incorrect: int
+    unattempted: int
+    sections: list[SectionScore]
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from zenith_api.assessment.analytics import (
+    refresh_analytics,
+    run_analytics,
+    tests_due_for_analytics,
+)
+from zenith_api.config import settings
+from zenith_api.db.session import SessionLocal
+from zenith_api.redis_client import get_redis
+from zenith_api.worker import celery_app
+
+
+def _running_key(test_id: str) -> str:
+    return f"analytics:running:{test_id}"
+
+
+@celery_app.task(name="zenith_api.tasks.analytics.compute_test_analytics", ignore_result=True)
+def compute_test_analytics(test_id: str, job_id: str | None = None) -> None:
+    with SessionLocal() as db:
+        if job_id is None:
+            # A failed run keeps its marker, so the test is retried once it expires
+            # rather than on every beat.
+            refresh_analytics(db, uuid.UUID(test_id))
+            get_redis().delete(_running_key(test_id))
+        else:
+            run_analytics(db, uuid.UUID(job_id), uuid.UUID(test_id))
+
+
+@celery_app.task(name="zenith_api.tasks.analytics.schedule_closed_tests", ignore_result=True)
+def schedule_closed_tests() -> int:
+    # A test stays due until its run commits, so each one is marked when queued and
+    # skipped by later beats while the marker is there.
+    closed_before = datetime.now(UTC) - timedelta(seconds=settings.analytics_delay_seconds)
+    with SessionLocal() as db:
+        due = tests_due_for_analytics(db, closed_before)
+    r = get_redis()
+    queued = 0
+    for test_id in map(str, due):
+        if r.set(_running_key(test_id), 1, nx=True, ex=settings.analytics_running_ttl_seconds):
+            compute_test_analytics.delay(test_id)
+            queued += 1
+    return queued
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from zenith_api.assessment.answer_store import flush_dirty
+from zenith_api.config import settings
+from zenith_api.db.session import SessionLocal
+from zenith_api.worker import celery_app
+
+
+@celery_app.task(name="zenith_api.tasks.answers.flush_answer_buffer", ignore_result=True)
+def flush_answer_buffer() -> int:
+    if settings.answer_store != "redis":
+        return 0
+    with SessionLocal() as db:
+        return flush_dirty(db, limit=settings.answer_flush_batch_size)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from sqlalchemy import select
+
+from zenith_api.assessment.deadlines import finalize_overdue_attempts
+from zenith_api.assessment.leaderboard import invalidate_boards
+from zenith_api.db.models import Test
+from zenith_api.db.session import SessionLocal
+from zenith_api.worker import celery_app
+
+
+@celery_app.task(name="zenith_api.tasks.attempts.finalize_overdue", ignore_result=True)
+def finalize_overdue() -> int:
+    with SessionLocal() as db:
+        closed = finalize_overdue_attempts(db, datetime.now(UTC))
+        changed = [test_id for test_id, n in closed.items() if n]
+        # Whole cohorts land at once; rebuilding each board once beats a write per user.
+        for test_id, batch_id in db.execute(
+            select(Test.id, Test.batch_id).where(Test.id.in_(changed))
+        ).tuples():
+            invalidate_boards(test_id, batch_id)
+    return sum(closed.values())
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from zenith_api.auth.refresh_tokens import purge_refresh_tokens
+from zenith_api.config import settings
+from zenith_api.db.session import SessionLocal
+from zenith_api.worker import celery_app
+
+
+@celery_app.task(name="zenith_api.tasks.auth.purge_refresh_tokens", ignore_result=True)
+def purge_expired_refresh_tokens() -> int:
+    with SessionLocal() as db:
+        return purge_refresh_tokens(
+            db,
+            batch_size=settings.refresh_purge_batch_size,
+            revoked_retention=timedelta(days=settings.refresh_revoked_retention_days),
+        )
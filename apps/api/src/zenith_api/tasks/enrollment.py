@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import uuid
+
+from zenith_api.db.session import SessionLocal
+from zenith_api.rbac.enrollment import run_staged_enrollment
+from zenith_api.worker import celery_app
+
+
+@celery_app.task(name="zenith_api.tasks.enrollment.enroll_members", ignore_result=True)
+def enroll_members(job_id: str, org_id: str, batch_id: str | None, role: str) -> None:
+    # The rows themselves are staged in Redis by the API (rbac.enrollment).
+    with SessionLocal() as db:
+        run_staged_enrollment(
+            db,
+            uuid.UUID(job_id),
+            uuid.UUID(org_id),
+            uuid.UUID(batch_id) if batch_id else None,
+            role,
+        )
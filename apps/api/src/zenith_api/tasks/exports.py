@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import uuid
+
+from zenith_api.assessment.exports import Kind, Scope, purge_exports, run_export
+from zenith_api.config import settings
+from zenith_api.db.session import ReadSessionLocal, SessionLocal
+from zenith_api.worker import celery_app
+
+
+@celery_app.task(name="zenith_api.tasks.exports.export_results", ignore_result=True)
+def export_results(job_id: str, kind: Kind, scope: Scope, scope_id: str) -> None:
+    # Rows come from the replica when there is one; progress goes to the primary.
+    with SessionLocal() as db, (ReadSessionLocal or SessionLocal)() as read_db:
+        run_export(db, read_db, uuid.UUID(job_id), kind, scope, uuid.UUID(scope_id))
+
+
+@celery_app.task(name="zenith_api.tasks.exports.purge_old_exports", ignore_result=True)
+def purge_old_exports() -> int:
+    return purge_exports(settings.export_retention_hours * 3600)
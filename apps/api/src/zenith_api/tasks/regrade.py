@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import uuid
+
+from zenith_api.assessment.analytics import has_analytics
+from zenith_api.assessment.leaderboard import invalidate_boards
+from zenith_api.assessment.regrade import run_regrade
+from zenith_api.db.models import Test
+from zenith_api.db.session import SessionLocal
+from zenith_api.tasks import analytics as analytics_tasks
+from zenith_api.worker import celery_app
+
+
+@celery_app.task(name="zenith_api.tasks.regrade.regrade_test", ignore_result=True)
+def regrade_test(job_id: str, test_id: str) -> None:
+    with SessionLocal() as db:
+        out = run_regrade(db, uuid.UUID(job_id), uuid.UUID(test_id))
+        if not out["changed"]:
+            return
+        # Published ranks and item stats are stale once any score moved.
+        test = db.get(Test, uuid.UUID(test_id))
+        if test is not None:
+            invalidate_boards(test.id, test.batch_id)
+        if has_analytics(db, uuid.UUID(test_id)):
+            analytics_tasks.compute_test_analytics.delay(test_id)
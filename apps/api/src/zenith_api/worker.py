@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import Any
+
+from celery import Celery
+
+from zenith_api.config import settings
+
+celery_app = Celery(
+    "zenith_api",
+    broker=settings.redis_url,
+    include=[
+        "zenith_api.tasks.analytics",
+        "zenith_api.tasks.answers",
+        "zenith_api.tasks.attempts",
+        "zenith_api.tasks.auth",
+        "zenith_api.tasks.enrollment",
+        "zenith_api.tasks.exports",
+        "zenith_api.tasks.regrade",
+    ],
+)
+
+beat_schedule: dict[str, dict[str, Any]] = {
+    "purge-refresh-tokens": {
+        "task": "zenith_api.tasks.auth.purge_refresh_tokens",
+        "schedule": settings.refresh_purge_interval_seconds,
+    },
+    "finalize-overdue-attempts": {
+        "task": "zenith_api.tasks.attempts.finalize_overdue",
+        "schedule": settings.attempt_finalize_interval_seconds,
+    },
+    "purge-exports": {
+        "task": "zenith_api.tasks.exports.purge_old_exports",
+        "schedule": settings.export_purge_interval_seconds,
+    },
+    "schedule-test-analytics": {
+        "task": "zenith_api.tasks.analytics.schedule_closed_tests",
+        "schedule": settings.analytics_schedule_interval_seconds,
+    },
+}
+if settings.answer_store == "redis":
+    beat_schedule["flush-answer-buffer"] = {
+        "task": "zenith_api.tasks.answers.flush_answer_buffer",
+        "schedule": settings.answer_flush_interval_seconds,
+    }
+
+celery_app.conf.beat_schedule = beat_schedule
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+
+from zenith_api.db.session import async_engine, engine, read_engine
+
+
+@pytest.fixture
+def query_budget() -> Callable[[int], AbstractContextManager[list[str]]]:
+    # with query_budget(3): client.get(...) fails when the block runs more than three
+    # statements on any engine, listing them, so an N+1 shows up as a test failure.
+    @contextmanager
+    def budget(max_queries: int) -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def count(_conn: Any, _cursor: Any, statement: str, *_args: Any) -> None:
+            statements.append(statement)
+
+        engines = [engine, async_engine.sync_engine]
+        if read_engine is not None:
+            engines.append(read_engine)
+        for e in engines:
+            event.listen(e, "before_cursor_execute", count)
+        try:
+            yield statements
+        finally:
+            for e in engines:
+                event.remove(e, "before_cursor_execute", count)
+        assert len(statements) <= max_queries, (
+            f"{len(statements)} queries, budget {max_queries}:\n" + "\n\n".join(statements)
+        )
+
+    return budget
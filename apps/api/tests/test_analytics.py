@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import uuid
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from zenith_api.assessment.analytics import Responses, analyse
+from zenith_api.main import app
+from zenith_api.worker import celery_app
+
+client = TestClient(app)
+
+
+def _auth(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_analyse_matches_reference_statistics() -> None:
+    rng = np.random.default_rng(7)
+    n, q = 200, 5
+    # Two options per question; option 2*i is the correct one for question i.
+    choice = (np.arange(q) * 2 + rng.integers(0, 2, size=(n, q))).astype(np.int32)
+    choice[rng.random((n, q)) < 0.1] = -1
+    option_correct = np.arange(2 * q) % 2 == 0
+    correct = (choice >= 0) & option_correct[np.maximum(choice, 0)]
+    scores = correct.sum(axis=1).astype(np.float64)
+    r = Responses(
+        attempt_ids=[uuid.uuid4() for _ in range(n)],
+        user_ids=[uuid.uuid4() for _ in range(n)],
+        scores=scores,
+        question_ids=[uuid.uuid4() for _ in range(q)],
+        option_ids=[uuid.uuid4() for _ in range(2 * q)],
+        option_positions=[1, 2] * q,
+        option_question=np.repeat(np.arange(q), 2),
+        option_correct=option_correct,
+        choice=choice,
+    )
+
+    a = analyse(r)
+
+    for i, stats in enumerate(a.questions):
+        assert stats["p_value"] == pytest.approx(correct[:, i].mean())
+        assert stats["point_biserial"] == pytest.approx(np.corrcoef(correct[:, i], scores)[0, 1])
+        assert sum(o["count"] for o in stats["options"]) == stats["attempted"]
+    best = int(np.argmax(scores))
+    assert a.rank[best] == 1
+    assert a.percentile[best] == 100.0
+    assert all(a.rank[i] == 1 + int((scores > scores[i]).sum()) for i in range(n))
+
+
+def test_closed_test_analytics_endpoints(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    admin = client.post(
+        "/auth/register",
+        json={"email": f"admin-{uuid.uuid4().hex}@example.com", "password": "Password123!"},
+    ).json()
+    h = _auth(admin["access_token"])
+    org_id = client.post("/orgs", json={"name": f"Org {uuid.uuid4().hex}"}, headers=h).json()[
+        "organization_id"
+    ]
+    batch_id = client.post(f"/orgs/{org_id}/batches", json={"name": "Batch"}, headers=h).json()[
+        "batch_id"
+    ]
+    test_id = client.post(
+        f"/orgs/{org_id}/tests", json={"batch_id": batch_id, "title": "Mock"}, headers=h
+    ).json()["test_id"]
+    r = client.get(f"/orgs/{org_id}/tests/{test_id}/analytics", headers=h)
+    assert r.status_code == 404
+
+    questions = []
+    for pos in (1, 2):
+        r = client.post(
+            f"/orgs/{org_id}/tests/{test_id}/questions",
+            json={
+                "prompt": f"Q{pos}",
+                "position": pos,
+                "options": [{"text": "A", "position": 1}, {"text": "B", "position": 2}],
+                "correct_position": 1,
+            },
+            headers=h,
+        )
+        questions.append(r.json()["question_id"])
+
+    from sqlalchemy import select
+
+    from zenith_api.db.models import QuestionOption
+    from zenith_api.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        option = {
+            (str(qid), pos): str(oid)
+            for qid, pos, oid in db.execute(
+                select(
+                    QuestionOption.question_id, QuestionOption.position, QuestionOption.id
+                ).where(QuestionOption.question_id.in_([uuid.UUID(q) for q in questions]))
+            )
+        }
+
+    # Scores 2, 1 and 0.
+    picks = [[1, 1], [1, 2], [2, None]]
+    students = []
+    for choices in picks:
+        email = f"student-{uuid.uuid4().hex}@example.com"
+        client.post(
+            f"/orgs/{org_id}/members",
+            json={"email": email, "role": "student", "password": "Password123!"},
+            headers=h,
+        )
+        client.post(f"/orgs/{org_id}/batches/{batch_id}/members", json={"email": email}, headers=h)
+        sh = _auth(
+            client.post("/auth/login", json={"email": email, "password": "Password123!"}).json()[
+                "access_token"
+            ]
+        )
+        attempt_id = client.post(
+            f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=sh
+        ).json()["attempt_id"]
+        answers = [
+            {"question_id": q, "selected_option_id": option[(q, p)]}
+            for q, p in zip(questions, choices, strict=True)
+            if p is not None
+        ]
+        client.put(
+            f"/orgs/{org_id}/attempts/{attempt_id}/answers", json={"answers": answers}, headers=sh
+        )
+        r = client.post(f"/orgs/{org_id}/attempts/{attempt_id}/submit", headers=sh)
+        assert r.status_code == 200, r.text
+        students.append(sh)
+
+    r = client.post(f"/orgs/{org_id}/tests/{test_id}/analytics", headers=h)
+    assert r.status_code == 202, r.text
+    job = client.get(f"/orgs/{org_id}/jobs/{r.json()['job_id']}", headers=h).json()
+    assert job["status"] == "succeeded", job
+
+    body = client.get(f"/orgs/{org_id}/tests/{test_id}/analytics", headers=h).json()
+    assert (body["attempts"], body["mean_score"], body["max_score"]) == (3, 1.0, 2)
+    q1, q2 = body["questions"]
+    assert (q1["attempted"], q1["correct"]) == (3, 2)
+    assert (q2["attempted"], q2["correct"]) == (2, 1)
+    assert q1["discrimination"] == 1.0
+    assert [o["count"] for o in q1["options"]] == [2, 1]
+    assert q1["options"][0]["mean_score"] == 1.5
+
+    r = client.get(f"/orgs/{org_id}/tests/{test_id}/analytics/ranks?limit=2", headers=h)
+    page = r.json()
+    assert [i["rank"] for i in page["items"]] == [1, 2]
+    r = client.get(
+        f"/orgs/{org_id}/tests/{test_id}/analytics/ranks",
+        params={"limit": 2, "cursor": page["next_cursor"]},
+        headers=h,
+    )
+    assert [(i["rank"], i["score"]) for i in r.json()["items"]] == [(3, 0)]
+
+    me = client.get(f"/orgs/{org_id}/tests/{test_id}/analytics/me", headers=students[1]).json()
+    assert (me["rank"], me["score"]) == (2, 1)
+    assert me["percentile"] == pytest.approx(200 / 3)
+    r = client.get(f"/orgs/{org_id}/tests/{test_id}/analytics/ranks", headers=students[1])
+    assert r.status_code == 403
+
+
+def test_scheduler_does_not_requeue_a_running_test(monkeypatch: pytest.MonkeyPatch) -> None:
+    from datetime import UTC, datetime, timedelta
+
+    from redis.exceptions import RedisError
+    from sqlalchemy import update
+
+    from zenith_api.db.models import Test
+    from zenith_api.db.session import SessionLocal
+    from zenith_api.redis_client import get_redis
+    from zenith_api.tasks import analytics as analytics_tasks
+
+    try:
+        get_redis().ping()
+    except RedisError:
+        pytest.skip("needs Redis")
+
+    admin = client.post(
+        "/auth/register",
+        json={"email": f"admin-{uuid.uuid4().hex}@example.com", "password": "Password123!"},
+    ).json()
+    h = _auth(admin["access_token"])
+    org_id = client.post("/orgs", json={"name": f"Org {uuid.uuid4().hex}"}, headers=h).json()[
+        "organization_id"
+    ]
+    batch_id = client.post(f"/orgs/{org_id}/batches", json={"name": "Batch"}, headers=h).json()[
+        "batch_id"
+    ]
+    test_id = client.post(
+        f"/orgs/{org_id}/tests", json={"batch_id": batch_id, "title": "Mock"}, headers=h
+    ).json()["test_id"]
+    with SessionLocal() as db:
+        db.execute(
+            update(Test)
+            .where(Test.id == test_id)
+            .values(ends_at=datetime.now(UTC) - timedelta(hours=1))
+        )
+        db.commit()
+
+    queued: list[str] = []
+    monkeypatch.setattr(
+        analytics_tasks.compute_test_analytics, "delay", lambda tid: queued.append(tid)
+    )
+    analytics_tasks.schedule_closed_tests()
+    analytics_tasks.schedule_closed_tests()
+    assert queued.count(test_id) == 1
+
+    # A failing run leaves the marker, so the next beats don't retry it straight away.
+    def broken(*_args: object) -> None:
+        raise RuntimeError("analysis failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(analytics_tasks, "refresh_analytics", broken)
+        with pytest.raises(RuntimeError):
+            analytics_tasks.compute_test_analytics(test_id)
+    assert get_redis().ttl(f"analytics:running:{test_id}") > 0
+    analytics_tasks.schedule_closed_tests()
+    assert queued.count(test_id) == 1
+
+    # Once a run succeeds the test is no longer due, and the marker is gone.
+    analytics_tasks.compute_test_analytics(test_id)
+    assert not get_redis().exists(f"analytics:running:{test_id}")
+    analytics_tasks.schedule_closed_tests()
+    assert queued.count(test_id) == 1
@@ -0,0 +1,775 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import RedisError
+
+from zenith_api.config import settings
+from zenith_api.main import app
+from zenith_api.redis_client import get_redis
+
+client = TestClient(app)
+
+
+def _auth(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _register(email: str) -> dict:
+    r = client.post("/auth/register", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _setup_exam() -> dict:
+    admin = _register(f"admin-{uuid.uuid4().hex}@example.com")
+    h = _auth(admin["access_token"])
+
+    org_id = client.post("/orgs", json={"name": f"Org {uuid.uuid4().hex}"}, headers=h).json()[
+        "organization_id"
+    ]
+    batch_id = client.post(f"/orgs/{org_id}/batches", json={"name": "JEE 2026"}, headers=h).json()[
+        "batch_id"
+    ]
+
+    student_email = f"student-{uuid.uuid4().hex}@example.com"
+    r = client.post(
+        f"/orgs/{org_id}/members",
+        json={"email": student_email, "role": "student", "password": "Password123!"},
+        headers=h,
+    )
+    assert r.status_code == 200, r.text
+    r = client.post(
+        f"/orgs/{org_id}/batches/{batch_id}/members", json={"email": student_email}, headers=h
+    )
+    assert r.status_code == 200, r.text
+
+    test_id = client.post(
+        f"/orgs/{org_id}/tests", json={"batch_id": batch_id, "title": "Mock 1"}, headers=h
+    ).json()["test_id"]
+
+    questions = []
+    for pos in (1, 2):
+        r = client.post(
+            f"/orgs/{org_id}/tests/{test_id}/questions",
+            json={
+                "prompt": f"Q{pos}",
+                "position": pos,
+                "options": [{"text": "A", "position": 1}, {"text": "B", "position": 2}],
+                "correct_position": 1,
+            },
+            headers=h,
+        )
+        assert r.status_code == 200, r.text
+        questions.append(r.json()["question_id"])
+
+    student = client.post(
+        "/auth/login", json={"email": student_email, "password": "Password123!"}
+    ).json()
+    return {
+        "org_id": org_id,
+        "test_id": test_id,
+        "questions": questions,
+        "admin": h,
+        "student": _auth(student["access_token"]),
+    }
+
+
+def _option_ids(exam: dict) -> dict[str, list[str]]:
+    # Options are not exposed by the API yet; read them straight from the DB.
+    from sqlalchemy import select
+
+    from zenith_api.db.models import QuestionOption
+    from zenith_api.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(QuestionOption.question_id, QuestionOption.id)
+            .where(QuestionOption.question_id.in_([uuid.UUID(q) for q in exam["questions"]]))
+            .order_by(QuestionOption.position)
+        ).all()
+    out: dict[str, list[str]] = {q: [] for q in exam["questions"]}
+    for qid, oid in rows:
+        out[str(qid)].append(str(oid))
+    return out
+
+
+def test_bulk_answer_sync_drops_stale_writes() -> None:
+    exam = _setup_exam()
+    org_id, test_id = exam["org_id"], exam["test_id"]
+    q1, q2 = exam["questions"]
+    opts = _option_ids(exam)
+
+    r = client.post(f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=exam["student"])
+    assert r.status_code == 200, r.text
+    attempt_id = r.json()["attempt_id"]
+    url = f"/orgs/{org_id}/attempts/{attempt_id}/answers"
+
+    r = client.put(
+        url,
+        json={
+            "answers": [
+                {"question_id": q1, "selected_option_id": opts[q1][1], "client_seq": 5},
+                {"question_id": q2, "selected_option_id": opts[q2][0], "client_seq": 6},
+            ]
+        },
+        headers=exam["student"],
+    )
+    assert r.status_code == 200, r.text
+    assert r.json() == {"applied": 2, "ignored": 0}
+
+    # An out-of-order retry carrying an older sequence must not win.
+    r = client.put(
+        url,
+        json={
+            "answers": [
+                {"question_id": q1, "selected_option_id": opts[q1][0], "client_seq": 7},
+                {"question_id": q2, "selected_option_id": opts[q2][1], "client_seq": 3},
+            ]
+        },
+        headers=exam["student"],
+    )
+    assert r.status_code == 200, r.text
+    assert r.json() == {"applied": 1, "ignored": 1}
+
+    r = client.post(f"/orgs/{org_id}/attempts/{attempt_id}/submit", headers=exam["student"])
+    assert r.status_code == 200, r.text
+    assert (r.json()["score"], r.json()["total"]) == (2, 2)
+
+
+def test_bulk_answer_sync_rejects_foreign_option() -> None:
+    exam = _setup_exam()
+    org_id, test_id = exam["org_id"], exam["test_id"]
+    q1, q2 = exam["questions"]
+    opts = _option_ids(exam)
+
+    attempt_id = client.post(
+        f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=exam["student"]
+    ).json()["attempt_id"]
+
+    r = client.put(
+        f"/orgs/{org_id}/attempts/{attempt_id}/answers",
+        json={"answers": [{"question_id": q1, "selected_option_id": opts[q2][0]}]},
+        headers=exam["student"],
+    )
+    assert r.status_code == 400
+
+    r = client.put(
+        f"/orgs/{org_id}/attempts/{attempt_id}/answers",
+        json={"answers": [{"question_id": q1, "selected_option_id": opts[q1][0]}]},
+        headers=exam["admin"],
+    )
+    assert r.status_code == 404
+
+
+def test_answer_key_refreshes_after_question_added() -> None:
+    exam = _setup_exam()
+    org_id, test_id = exam["org_id"], exam["test_id"]
+    q1, _ = exam["questions"]
+    opts = _option_ids(exam)
+
+    attempt_id = client.post(
+        f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=exam["student"]
+    ).json()["attempt_id"]
+    r = client.put(
+        f"/orgs/{org_id}/attempts/{attempt_id}/answers/{q1}",
+        json={"selected_option_id": opts[q1][0]},
+        headers=exam["student"],
+    )
+    assert r.status_code == 200, r.text
+
+    r = client.post(
+        f"/orgs/{org_id}/tests/{test_id}/questions",
+        json={
+            "prompt": "Q3",
+            "position": 3,
+            "options": [{"text": "A", "position": 1}, {"text": "B", "position": 2}],
+            "correct_position": 2,
+        },
+        headers=exam["admin"],
+    )
+    assert r.status_code == 200, r.text
+    q3 = r.json()["question_id"]
+    exam["questions"].append(q3)
+    opts = _option_ids(exam)
+
+    r = client.put(
+        f"/orgs/{org_id}/attempts/{attempt_id}/answers/{q3}",
+        json={"selected_option_id": opts[q3][1]},
+        headers=exam["student"],
+    )
+    assert r.status_code == 200, r.text
+
+    r = client.post(f"/orgs/{org_id}/attempts/{attempt_id}/submit", headers=exam["student"])
+    body = r.json()
+    assert (body["score"], body["total"], body["unattempted"]) == (2, 3, 1)
+
+
+def test_marking_scheme_sections_and_rescore() -> None:
+    from sqlalchemy import update
+
+    from zenith_api.assessment.scoring import rescore_attempts
+    from zenith_api.db.models import Attempt, QuestionOption, Test
+    from zenith_api.db.session import SessionLocal
+
+    exam = _setup_exam()
+    org_id, test_id = exam["org_id"], exam["test_id"]
+    with SessionLocal() as db:
+        db.execute(
+            update(Test).where(Test.id == test_id).values(marks_correct=4, marks_incorrect=-1)
+        )
+        db.commit()
+    # Two accepted answers and its own marks.
+    r = client.post(
+        f"/orgs/{org_id}/tests/{test_id}/questions",
+        json={
+            "prompt": "Q3",
+            "position": 3,
+            "options": [{"text": "A", "position": 1}, {"text": "B", "position": 2}],
+            "correct_positions": [1, 2],
+            "section": "Chemistry",
+            "marks_correct": 3,
+        },
+        headers=exam["admin"],
+    )
+    assert r.status_code == 200, r.text
+    exam["questions"].append(r.json()["question_id"])
+    q1, q2, q3 = exam["questions"]
+    opts = _option_ids(exam)
+
+    paper = client.get(f"/orgs/{org_id}/tests/{test_id}/paper", headers=exam["student"]).json()
+    marks = [(q["section"], q["marks_correct"], q["marks_incorrect"]) for q in paper["questions"]]
+    assert marks == [(None, 4, -1), (None, 4, -1), ("Chemistry", 3, -1)]
+
+    attempt_id = client.post(
+        f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=exam["student"]
+    ).json()["attempt_id"]
+    r = client.put(
+        f"/orgs/{org_id}/attempts/{attempt_id}/answers",
+        json={
+            "answers": [
+                {"question_id": q1, "selected_option_id": opts[q1][0]},
+                {"question_id": q2, "selected_option_id": opts[q2][1]},
+                {"question_id": q3, "selected_option_id": opts[q3][1]},
+            ]
+        },
+        headers=exam["student"],
+    )
+    assert r.status_code == 200, r.text
+
+    r = client.post(f"/orgs/{org_id}/attempts/{attempt_id}/submit", headers=exam["student"])
+    assert r.status_code == 200, r.text
+    assert r.json() == {
+        "score": 4 - 1 + 3,
+        "total": 11,
+        "correct": 2,
+        "incorrect": 1,
+        "unattempted": 0,
+        "sections": [
+            {
+                "section": None,
+                "score": 3,
+                "max_score": 8,
+                "correct": 1,
+                "incorrect": 1,
+                "unattempted": 0,
+            },
+            {
+                "section": "Chemistry",
+                "score": 3,
+                "max_score": 3,
+                "correct": 1,
+                "incorrect": 0,
+                "unattempted": 0,
+            },
+        ],
+    }
+
+    # Answer-key correction: Q2's answer was B all along.
+    with SessionLocal() as db:
+        db.execute(
+            update(QuestionOption)
+            .where(QuestionOption.question_id == q2)
+            .values(is_correct=QuestionOption.id == opts[q2][1])
+        )
+        assert rescore_attempts(db, uuid.UUID(test_id), [uuid.UUID(attempt_id)]) == 1
+        db.commit()
+        attempt = db.get(Attempt, uuid.UUID(attempt_id))
+        assert attempt is not None
+        assert attempt.score == 11
+        assert attempt.score_breakdown is not None
+        assert attempt.score_breakdown["incorrect"] == 0
+
+
+def test_paper_hides_answers_and_revalidates() -> None:
+    exam = _setup_exam()
+    url = f"/orgs/{exam['org_id']}/tests/{exam['test_id']}/paper"
+
+    outsider = _register(f"outsider-{uuid.uuid4().hex}@example.com")
+    assert client.get(url, headers=_auth(outsider["access_token"])).status_code == 404
+    assert client.get(url).status_code == 401
+
+    r = client.get(url, headers=exam["student"])
+    assert r.status_code == 200, r.text
+    assert r.headers["content-encoding"] == "gzip"
+    paper = r.json()
+    assert [q["id"] for q in paper["questions"]] == exam["questions"]
+    assert "is_correct" not in r.text
+
+    r = client.get(url, headers={**exam["student"], "If-None-Match": r.headers["etag"]})
+    assert r.status_code == 304
+    assert r.content == b""
+    weak = f'"other", W/{r.headers["etag"]}'
+    assert client.get(url, headers={**exam["student"], "If-None-Match": weak}).status_code == 304
+
+    # Adding a question changes the paper, so the old validator no longer matches.
+    etag = r.headers["etag"]
+    client.post(
+        f"/orgs/{exam['org_id']}/tests/{exam['test_id']}/questions",
+        json={
+            "prompt": "Q3",
+            "position": 3,
+            "options": [{"text": "A", "position": 1}, {"text": "B", "position": 2}],
+            "correct_position": 1,
+        },
+        headers=exam["admin"],
+    )
+    r = client.get(url, headers={**exam["student"], "If-None-Match": etag})
+    assert r.status_code == 200
+    assert len(r.json()["questions"]) == 3
+
+
+def test_start_admission_gate_queues_the_spike(monkeypatch: pytest.MonkeyPatch) -> None:
+    try:
+        get_redis().ping()
+    except RedisError:
+        pytest.skip("needs Redis")
+    # One start every 30s after a burst of two.
+    monkeypatch.setattr(settings, "attempt_start_rate", 1 / 30)
+    monkeypatch.setattr(settings, "attempt_start_burst", 2)
+
+    exam = _setup_exam()
+    org_id, test_id = exam["org_id"], exam["test_id"]
+    url = f"/orgs/{org_id}/tests/{test_id}/attempts/start"
+    batch_id = client.get(f"/orgs/{org_id}/batches", headers=exam["admin"]).json()["items"][0]["id"]
+
+    def student() -> dict[str, str]:
+        email = f"student-{uuid.uuid4().hex}@example.com"
+        client.post(
+            f"/orgs/{org_id}/members",
+            json={"email": email, "role": "student", "password": "Password123!"},
+            headers=exam["admin"],
+        )
+        client.post(
+            f"/orgs/{org_id}/batches/{batch_id}/members",
+            json={"email": email},
+            headers=exam["admin"],
+        )
+        login = client.post("/auth/login", json={"email": email, "password": "Password123!"})
+        return _auth(login.json()["access_token"])
+
+    second, third = student(), student()
+
+    r = client.post(url, headers=exam["student"])
+    assert r.status_code == 200, r.text
+    attempt_id = r.json()["attempt_id"]
+
+    # Resuming an existing attempt (a reload) is never queued and takes no slot.
+    for _ in range(3):
+        r = client.post(url, headers=exam["student"])
+        assert r.status_code == 200
+        assert r.json()["attempt_id"] == attempt_id
+    assert client.post(url, headers=second).status_code == 200
+
+    r = client.post(url, headers=third)
+    assert r.status_code == 429
+    assert 0 < int(r.headers["retry-after"]) <= 30
+    assert "opens in" in r.json()["detail"]
+
+
+def test_bulk_question_import() -> None:
+    exam = _setup_exam()
+    url = f"/orgs/{exam['org_id']}/tests/{exam['test_id']}/questions/import"
+
+    lines = [
+        json.dumps(
+            {
+                "prompt": f"Q{pos}",
+                "position": pos,
+                "options": [{"text": "A", "position": 1}, {"text": "B", "position": 2}],
+                "correct_position": 2,
+            }
+        )
+        for pos in (3, 4)
+    ]
+    r = client.post(
+        url, files={"file": ("bank.jsonl", "\n".join(lines).encode())}, headers=exam["admin"]
+    )
+    assert r.status_code == 200, r.text
+    assert r.json() == {"imported": 2}
+
+    csv_body = (
+        "prompt,position,correct_position,option_1,option_2,option_3\n"
+        "Q5,5,3,A,B,C\n"
+        "Q6,4,1,A,B,\n"  # position already used
+        "Q7,7,3,A,B,\n"  # no third option
+    )
+    r = client.post(url, files={"file": ("bank.csv", csv_body.encode())}, headers=exam["admin"])
+    assert r.status_code == 422
+    detail = r.json()["detail"]
+    assert detail["error_count"] == 2
+    assert [e["row"] for e in detail["errors"]] == [3, 4]
+
+    # Nothing from a failed upload is written.
+    paper = client.get(
+        f"/orgs/{exam['org_id']}/tests/{exam['test_id']}/paper", headers=exam["admin"]
+    ).json()
+    assert [q["position"] for q in paper["questions"]] == [1, 2, 3, 4]
+    assert paper["questions"][3]["options"][1]["text"] == "B"
+
+
+def test_answer_key_fix_regrades_in_background(monkeypatch: pytest.MonkeyPatch) -> None:
+    from zenith_api.worker import celery_app
+
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(settings, "regrade_chunk_size", 1)
+    exam = _setup_exam()
+    org_id, test_id = exam["org_id"], exam["test_id"]
+    q1, q2 = exam["questions"]
+    opts = _option_ids(exam)
+
+    attempt_id = client.post(
+        f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=exam["student"]
+    ).json()["attempt_id"]
+    client.put(
+        f"/orgs/{org_id}/attempts/{attempt_id}/answers",
+        json={
+            "answers": [
+                {"question_id": q1, "selected_option_id": opts[q1][1]},
+                {"question_id": q2, "selected_option_id": opts[q2][0]},
+            ]
+        },
+        headers=exam["student"],
+    )
+    r = client.post(f"/orgs/{org_id}/attempts/{attempt_id}/submit", headers=exam["student"])
+    assert r.json()["score"] == 1
+
+    url = f"/orgs/{org_id}/tests/{test_id}/questions/{q1}/answer-key"
+    r = client.put(url, json={"correct_positions": [3]}, headers=exam["admin"])
+    assert r.status_code == 400
+    r = client.put(url, json={"correct_positions": [2]}, headers=exam["admin"])
+    assert r.status_code == 202, r.text
+    job = client.get(f"/orgs/{org_id}/jobs/{r.json()['job_id']}", headers=exam["admin"]).json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"attempts": 1, "changed": 1}
+
+    from zenith_api.db.models import Attempt
+    from zenith_api.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        attempt = db.get(Attempt, uuid.UUID(attempt_id))
+        assert attempt is not None
+        assert attempt.score == 2
+
+    # Nothing left to change on a second run.
+    r = client.post(f"/orgs/{org_id}/tests/{test_id}/regrade", headers=exam["admin"])
+    assert r.status_code == 202, r.text
+    job = client.get(f"/orgs/{org_id}/jobs/{r.json()['job_id']}", headers=exam["admin"]).json()
+    assert job["result"] == {"attempts": 1, "changed": 0}
+
+
+def test_deadline_blocks_late_answers_and_sweep_submits() -> None:
+    from datetime import UTC, datetime, timedelta
+
+    from sqlalchemy import update
+
+    from zenith_api.assessment.deadlines import finalize_overdue_attempts
+    from zenith_api.assessment.scoring import submit_and_score
+    from zenith_api.db.models import Attempt, Test
+    from zenith_api.db.session import AsyncSessionLocal, SessionLocal
+
+    exam = _setup_exam()
+    org_id, test_id = exam["org_id"], exam["test_id"]
+    q1, q2 = exam["questions"]
+    opts = _option_ids(exam)
+    ends_at = datetime.now(UTC) + timedelta(hours=1)
+    with SessionLocal() as db:
+        db.execute(
+            update(Test).where(Test.id == test_id).values(ends_at=ends_at, duration_minutes=30)
+        )
+        db.commit()
+
+    r = client.post(f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=exam["student"])
+    body = r.json()
+    attempt_id = body["attempt_id"]
+    deadline = datetime.fromisoformat(body["deadline_at"])
+    assert timedelta(minutes=29) < deadline - datetime.fromisoformat(body["server_time"])
+    assert deadline < ends_at
+
+    url = f"/orgs/{org_id}/attempts/{attempt_id}/answers/{q1}"
+    r = client.put(url, json={"selected_option_id": opts[q1][0]}, headers=exam["student"])
+    assert r.status_code == 200, r.text
+
+    # Time runs out.
+    with SessionLocal() as db:
+        db.execute(
+            update(Attempt)
+            .where(Attempt.id == attempt_id)
+            .values(deadline_at=datetime.now(UTC) - timedelta(minutes=1))
+        )
+        db.commit()
+    r = client.put(
+        f"/orgs/{org_id}/attempts/{attempt_id}/answers/{q2}",
+        json={"selected_option_id": opts[q2][0]},
+        headers=exam["student"],
+    )
+    assert r.status_code == 403
+
+    with SessionLocal() as db:
+        closed = finalize_overdue_attempts(db, datetime.now(UTC))
+        assert closed[uuid.UUID(test_id)] == 1
+        attempt = db.get(Attempt, uuid.UUID(attempt_id))
+        assert attempt is not None
+        assert attempt.submitted_at is not None
+        assert attempt.score == 1
+        assert not finalize_overdue_attempts(db, datetime.now(UTC)).get(uuid.UUID(test_id))
+
+    # A submit that read the attempt before the sweep closed it leaves the sweep's score.
+    async def late_submit() -> object:
+        async with AsyncSessionLocal() as adb:
+            scored = await submit_and_score(
+                adb, uuid.UUID(test_id), uuid.UUID(attempt_id), datetime.now(UTC)
+            )
+            await adb.commit()
+            return scored
+
+    assert asyncio.run(late_submit()) is None
+    with SessionLocal() as db:
+        attempt = db.get(Attempt, uuid.UUID(attempt_id))
+        assert attempt is not None
+        assert attempt.submitted_at == attempt.deadline_at
+
+    r = client.post(f"/orgs/{org_id}/attempts/{attempt_id}/submit", headers=exam["student"])
+    assert (r.json()["score"], r.json()["unattempted"]) == (1, 1)
+    r = client.put(url, json={"selected_option_id": opts[q1][1]}, headers=exam["student"])
+    assert r.status_code == 409
+
+
+def test_exam_hot_path_query_budgets(
+    query_budget: Callable[..., Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Budgets for the Postgres answer store; the Redis buffer's submit is covered below.
+    monkeypatch.setattr(settings, "answer_store", "postgres")
+    exam = _setup_exam()
+    org_id, test_id = exam["org_id"], exam["test_id"]
+    q1, q2 = exam["questions"]
+    opts = _option_ids(exam)
+    student = exam["student"]
+
+    with query_budget(4):
+        r = client.post(f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=student)
+    assert r.status_code == 200, r.text
+    assert r.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="4 queries"' in r.headers["server-timing"]
+    attempt_id = r.json()["attempt_id"]
+    # A resume finds the attempt and stops there.
+    with query_budget(3):
+        r = client.post(f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=student)
+    assert r.json()["attempt_id"] == attempt_id
+
+    with query_budget(3):
+        client.get(f"/orgs/{org_id}/tests/{test_id}/paper", headers=student)
+    with query_budget(3):
+        r = client.put(
+            f"/orgs/{org_id}/attempts/{attempt_id}/answers/{q1}",
+            json={"selected_option_id": opts[q1][0]},
+            headers=student,
+        )
+    assert r.status_code == 200, r.text
+    with query_budget(2):
+        r = client.put(
+            f"/orgs/{org_id}/attempts/{attempt_id}/answers",
+            json={"answers": [{"question_id": q2, "selected_option_id": opts[q2][0]}]},
+            headers=student,
+        )
+    assert r.status_code == 200, r.text
+    with query_budget(3):
+        r = client.post(f"/orgs/{org_id}/attempts/{attempt_id}/submit", headers=student)
+    assert r.json()["score"] == 2
+    with query_budget(2):
+        client.get(f"/orgs/{org_id}/tests", headers=exam["admin"])
+
+
+@pytest.fixture
+def redis_answer_store(monkeypatch: pytest.MonkeyPatch) -> None:
+    try:
+        get_redis().ping()
+    except RedisError:
+        pytest.skip("needs Redis")
+    monkeypatch.setattr(settings, "answer_store", "redis")
+
+
+def _stored_answers(attempt_id: str) -> dict[str, str]:
+    from sqlalchemy import select
+
+    from zenith_api.db.models import AttemptAnswer
+    from zenith_api.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(AttemptAnswer.question_id, AttemptAnswer.selected_option_id).where(
+                AttemptAnswer.attempt_id == uuid.UUID(attempt_id)
+            )
+        ).all()
+    return {str(q): str(o) for q, o in rows}
+
+
+@pytest.mark.usefixtures("redis_answer_store")
+def test_redis_buffer_drops_stale_writes_and_flushes_on_submit(
+    query_budget: Callable[..., Any],
+) -> None:
+    from zenith_api.assessment.answer_store import DIRTY_KEY
+
+    exam = _setup_exam()
+    org_id, test_id = exam["org_id"], exam["test_id"]
+    q1, q2 = exam["questions"]
+    opts = _option_ids(exam)
+    attempt_id = client.post(
+        f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=exam["student"]
+    ).json()["attempt_id"]
+    url = f"/orgs/{org_id}/attempts/{attempt_id}/answers"
+
+    def sync(*answers: tuple[str, str, int | None]) -> dict[str, int]:
+        items = [
+            {"question_id": q, "selected_option_id": o, "client_seq": seq} for q, o, seq in answers
+        ]
+        r = client.put(url, json={"answers": items}, headers=exam["student"])
+        assert r.status_code == 200, r.text
+        return r.json()
+
+    assert sync((q1, opts[q1][1], 5), (q2, opts[q2][1], 6)) == {"applied": 2, "ignored": 0}
+    # Equal or older sequences lose; a newer one wins.
+    assert sync((q1, opts[q1][0], 5), (q2, opts[q2][0], 3)) == {"applied": 0, "ignored": 2}
+    assert sync((q2, opts[q2][0], 7)) == {"applied": 1, "ignored": 0}
+    # An unsequenced write always wins, and a sequenced one may follow it.
+    assert sync((q1, opts[q1][0], None)) == {"applied": 1, "ignored": 0}
+    assert sync((q1, opts[q1][1], 1)) == {"applied": 1, "ignored": 0}
+    assert sync((q1, opts[q1][0], 2)) == {"applied": 1, "ignored": 0}
+
+    buffered = get_redis().hgetall(f"answers:{attempt_id}")
+    assert buffered == {q1: f"{opts[q1][0]}|2", q2: f"{opts[q2][0]}|7"}
+    assert get_redis().zscore(DIRTY_KEY, attempt_id) is not None
+    assert _stored_answers(attempt_id) == {}
+
+    # Submit flushes the buffer first (one extra upsert), so both answers are scored.
+    with query_budget(4):
+        r = client.post(f"/orgs/{org_id}/attempts/{attempt_id}/submit", headers=exam["student"])
+    assert r.status_code == 200, r.text
+    assert r.json()["score"] == 2
+    assert _stored_answers(attempt_id) == {q1: opts[q1][0], q2: opts[q2][0]}
+    assert not get_redis().exists(f"answers:{attempt_id}")
+    assert not get_redis().exists(f"answers:seq:{attempt_id}")
+    assert get_redis().zscore(DIRTY_KEY, attempt_id) is None
+
+
+@pytest.mark.usefixtures("redis_answer_store")
+def test_redis_flush_acks_only_what_it_wrote(monkeypatch: pytest.MonkeyPatch) -> None:
+    from sqlalchemy.orm import Session
+
+    from zenith_api.assessment.answer_store import DIRTY_KEY, flush_attempts
+    from zenith_api.db.session import SessionLocal
+
+    exam = _setup_exam()
+    org_id, test_id = exam["org_id"], exam["test_id"]
+    q1, q2 = exam["questions"]
+    opts = _option_ids(exam)
+    attempt_id = client.post(
+        f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=exam["student"]
+    ).json()["attempt_id"]
+    url = f"/orgs/{org_id}/attempts/{attempt_id}/answers"
+    client.put(
+        url,
+        json={
+            "answers": [
+                {"question_id": q1, "selected_option_id": opts[q1][0], "client_seq": 1},
+                {"question_id": q2, "selected_option_id": opts[q2][0], "client_seq": 1},
+            ]
+        },
+        headers=exam["student"],
+    )
+    buffered = get_redis().hgetall(f"answers:{attempt_id}")
+
+    # Postgres fails: nothing is acknowledged, so nothing is lost.
+    def failing_commit(self: Session) -> None:
+        raise RuntimeError("database went away")
+
+    with monkeypatch.context() as m, SessionLocal() as db:
+        m.setattr(Session, "commit", failing_commit)
+        with pytest.raises(RuntimeError):
+            flush_attempts(db, [attempt_id])
+    assert get_redis().hgetall(f"answers:{attempt_id}") == buffered
+    assert _stored_answers(attempt_id) == {}
+
+    # The student changes q1 while the flush is writing: the flush acknowledges q2 only.
+    commit = Session.commit
+
+    def commit_during_a_write(self: Session) -> None:
+        answer = {"question_id": q1, "selected_option_id": opts[q1][1], "client_seq": 2}
+        r = client.put(url, json={"answers": [answer]}, headers=exam["student"])
+        assert r.json()["applied"] == 1
+        commit(self)
+
+    with monkeypatch.context() as m, SessionLocal() as db:
+        m.setattr(Session, "commit", commit_during_a_write)
+        assert flush_attempts(db, [attempt_id]) == 2
+    assert _stored_answers(attempt_id) == {q1: opts[q1][0], q2: opts[q2][0]}
+    assert get_redis().hgetall(f"answers:{attempt_id}") == {q1: f"{opts[q1][1]}|2"}
+    assert get_redis().zscore(DIRTY_KEY, attempt_id) is not None
+
+    # The next flush writes the newer answer and clears the attempt.
+    with SessionLocal() as db:
+        assert flush_attempts(db, [attempt_id]) == 1
+    assert _stored_answers(attempt_id) == {q1: opts[q1][1], q2: opts[q2][0]}
+    assert not get_redis().exists(f"answers:{attempt_id}")
+    assert get_redis().zscore(DIRTY_KEY, attempt_id) is None
+
+    # A retry older than what was flushed is still reported as ignored.
+    answer = {"question_id": q1, "selected_option_id": opts[q1][0], "client_seq": 1}
+    r = client.put(url, json={"answers": [answer]}, headers=exam["student"])
+    assert r.json() == {"applied": 0, "ignored": 1}
+
+    # While a submit holds the attempt, other flushes leave it alone.
+    answer = {"question_id": q2, "selected_option_id": opts[q2][1], "client_seq": 2}
+    client.put(url, json={"answers": [answer]}, headers=exam["student"])
+    get_redis().set(f"answers:flush:lock:{attempt_id}", "submit", ex=60)
+    try:
+        with SessionLocal() as db:
+            assert flush_attempts(db, [attempt_id]) == 0
+        assert get_redis().get(f"answers:flush:lock:{attempt_id}") == "submit"
+    finally:
+        get_redis().delete(f"answers:flush:lock:{attempt_id}")
+    with SessionLocal() as db:
+        assert flush_attempts(db, [attempt_id], closing=True) == 1
+    assert _stored_answers(attempt_id)[q2] == opts[q2][1]
+    assert not get_redis().exists(f"answers:seq:{attempt_id}")
+
+
+@pytest.mark.usefixtures("redis_answer_store")
+def test_redis_flusher_survives_losing_its_lock(monkeypatch: pytest.MonkeyPatch) -> None:
+    from zenith_api.assessment import answer_store
+    from zenith_api.db.session import SessionLocal
+
+    def slow_flush(db: object, attempt_ids: object) -> int:
+        # The run outlives the lock's timeout.
+        get_redis().delete(answer_store.FLUSH_LOCK_KEY)
+        return 0
+
+    monkeypatch.setattr(answer_store, "flush_attempts", slow_flush)
+    with SessionLocal() as db:
+        assert answer_store.flush_dirty(db, limit=10) == 0
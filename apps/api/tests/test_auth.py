@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
+from datetime import UTC, datetime, timedelta
 
+import pytest
 from fastapi.testclient import TestClient
+from passlib.hash import argon2
+from sqlalchemy import select
 
+from zenith_api.auth.refresh_tokens import purge_refresh_tokens
+from zenith_api.auth.security import hash_token
+from zenith_api.config import settings
+from zenith_api.db.models import RefreshToken, User
+from zenith_api.db.session import SessionLocal
 from zenith_api.main import app
 
 client = TestClient(app)
@@ -31,7 +41,11 @@ def test_register_login_refresh() -> None:
     assert r3.status_code == 200, r3.text
     data3 = r3.json()
     assert "access_token" in data3
-    assert data3["refresh_token"] == data2["refresh_token"]
+    assert data3["refresh_token"] != data2["refresh_token"]
+
+    # Rotated: the old token no longer works.
+    r4 = client.post("/auth/refresh", json={"refresh_token": data2["refresh_token"]})
+    assert r4.status_code == 401
 
 
 def test_login_wrong_password() -> None:
@@ -42,3 +56,100 @@ def test_login_wrong_password() -> None:
 
     r = client.post("/auth/login", json={"email": email, "password": "wrong"})
     assert r.status_code == 401
+
+
+def test_principal_from_token_claims() -> None:
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from zenith_api.auth.deps import get_principal
+    from zenith_api.auth.security import create_access_token
+
+    user_id, org_id = uuid.uuid4(), uuid.uuid4()
+    token = create_access_token(
+        user_id=str(user_id), expires_minutes=5, org_roles={str(org_id): "student"}
+    )
+
+    # No DB session involved: the principal comes purely from the signed claims.
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    principal = asyncio.run(get_principal(creds))
+    assert principal.user_id == user_id
+    assert principal.org_roles == {org_id: "student"}
+
+
+def test_login_upgrades_outdated_hash() -> None:
+    email = f"c-{uuid.uuid4().hex}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "Password123!"})
+
+    # Simulate a hash made before the argon2 parameters were raised.
+    weak = argon2.using(rounds=1, memory_cost=1024, parallelism=1).hash("Password123!")
+    with SessionLocal() as db:
+        user = db.scalars(select(User).where(User.email == email)).one()
+        user.hashed_password = weak
+        db.commit()
+
+    r = client.post("/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200, r.text
+
+    with SessionLocal() as db:
+        stored = db.scalars(select(User.hashed_password).where(User.email == email)).one()
+    assert stored != weak
+    assert f"m={settings.argon2_memory_cost_kib},t={settings.argon2_time_cost}," in stored
+
+
+def test_login_sheds_when_hash_pool_is_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    email = f"d-{uuid.uuid4().hex}@example.com"
+    client.post("/auth/register", json={"email": email, "password": "Password123!"})
+    monkeypatch.setattr(settings, "password_hash_max_pending", 0)
+    r = client.post("/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+
+
+def test_refresh_token_reuse_revokes_the_family(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "refresh_reuse_grace_seconds", 0)
+    email = f"e-{uuid.uuid4().hex}@example.com"
+    stolen = client.post(
+        "/auth/register", json={"email": email, "password": "Password123!"}
+    ).json()["refresh_token"]
+
+    current = client.post("/auth/refresh", json={"refresh_token": stolen}).json()["refresh_token"]
+    r = client.post("/auth/refresh", json={"refresh_token": stolen})
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Refresh token reuse detected"
+
+    # The legitimate holder's newer token died with the family.
+    r = client.post("/auth/refresh", json={"refresh_token": current})
+    assert r.status_code == 401
+    # Further attempts with the stolen token are answered from the cache.
+    r = client.post("/auth/refresh", json={"refresh_token": stolen})
+    assert r.json()["detail"] == "Refresh token revoked"
+
+
+def test_purge_removes_expired_and_old_revoked_tokens() -> None:
+    email = f"f-{uuid.uuid4().hex}@example.com"
+    tokens = [
+        client.post(path, json={"email": email, "password": "Password123!"}).json()[
+            "refresh_token"
+        ]
+        for path in ("/auth/register", "/auth/login", "/auth/login")
+    ]
+    expired, old_revoked, live = (hash_token(t) for t in tokens)
+    now = datetime.now(UTC)
+    with SessionLocal() as db:
+        rows = {
+            rt.token_hash: rt
+            for rt in db.scalars(
+                select(RefreshToken).where(RefreshToken.token_hash.in_([expired, old_revoked]))
+            )
+        }
+        rows[expired].expires_at = now - timedelta(seconds=1)
+        rows[old_revoked].revoked_at = now - timedelta(days=8)
+        db.commit()
+
+        assert purge_refresh_tokens(db, batch_size=1, revoked_retention=timedelta(days=7)) >= 2
+        left = db.scalars(
+            select(RefreshToken.token_hash).where(
+                RefreshToken.token_hash.in_([expired, old_revoked, live])
+            )
+        ).all()
+    assert left == [live]
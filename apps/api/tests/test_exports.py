@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import csv
+import io
+import os
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from zenith_api.config import settings
+from zenith_api.main import app
+from zenith_api.worker import celery_app
+
+client = TestClient(app)
+
+
+def _auth(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _rows(body: bytes) -> list[list[str]]:
+    return list(csv.reader(io.StringIO(body.decode("utf-8-sig"))))
+
+
+def test_export_streams_and_runs_as_job(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(settings, "export_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "export_chunk_rows", 1)
+    admin = client.post(
+        "/auth/register",
+        json={"email": f"admin-{uuid.uuid4().hex}@example.com", "password": "Password123!"},
+    ).json()
+    h = _auth(admin["access_token"])
+    org_id = client.post("/orgs", json={"name": f"Org {uuid.uuid4().hex}"}, headers=h).json()[
+        "organization_id"
+    ]
+    batch_id = client.post(f"/orgs/{org_id}/batches", json={"name": "Batch"}, headers=h).json()[
+        "batch_id"
+    ]
+    test_id = client.post(
+        f"/orgs/{org_id}/tests", json={"batch_id": batch_id, "title": "=Mock"}, headers=h
+    ).json()["test_id"]
+    for pos in (1, 2):
+        client.post(
+            f"/orgs/{org_id}/tests/{test_id}/questions",
+            json={
+                "prompt": f"Q{pos}",
+                "position": pos,
+                "options": [{"text": "A", "position": 1}, {"text": "B", "position": 2}],
+                "correct_position": 1,
+            },
+            headers=h,
+        )
+
+    email = f"student-{uuid.uuid4().hex}@example.com"
+    client.post(
+        f"/orgs/{org_id}/members",
+        json={"email": email, "role": "student", "password": "Password123!"},
+        headers=h,
+    )
+    client.post(f"/orgs/{org_id}/batches/{batch_id}/members", json={"email": email}, headers=h)
+    sh = _auth(
+        client.post("/auth/login", json={"email": email, "password": "Password123!"}).json()[
+            "access_token"
+        ]
+    )
+    attempt_id = client.post(f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=sh).json()[
+        "attempt_id"
+    ]
+    paper = client.get(f"/orgs/{org_id}/tests/{test_id}/paper", headers=sh).json()
+    answers = [
+        {"question_id": q["id"], "selected_option_id": q["options"][0]["id"]}
+        for q in paper["questions"]
+    ]
+    client.put(
+        f"/orgs/{org_id}/attempts/{attempt_id}/answers", json={"answers": answers}, headers=sh
+    )
+    r = client.post(f"/orgs/{org_id}/attempts/{attempt_id}/submit", headers=sh)
+    assert r.status_code == 200, r.text
+
+    r = client.get(f"/orgs/{org_id}/tests/{test_id}/export", headers=h)
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("text/csv")
+    header, row = _rows(r.content)
+    assert header[:3] == ["test_id", "test_title", "attempt_id"]
+    assert row[1] == "'=Mock"
+    assert (row[2], row[7], row[9]) == (attempt_id, "2", "2")
+
+    r = client.get(f"/orgs/{org_id}/batches/{batch_id}/export?kind=answers", headers=h)
+    rows = _rows(r.content)[1:]
+    assert len(rows) == 2
+    assert {row[-1] for row in rows} == {"True"}
+    assert client.get(f"/orgs/{org_id}/tests/{test_id}/export", headers=sh).status_code == 403
+    assert client.get(f"/orgs/{org_id}/tests/{uuid.uuid4()}/export", headers=h).status_code == 404
+
+    r = client.post(f"/orgs/{org_id}/tests/{test_id}/exports?kind=answers", headers=h)
+    assert r.status_code == 202, r.text
+    job = client.get(f"/orgs/{org_id}/jobs/{r.json()['job_id']}", headers=h).json()
+    assert job["status"] == "succeeded", job
+    assert (job["total"], job["processed"], job["result"]["rows"]) == (2, 2, 2)
+    r = client.get(f"/orgs/{org_id}/jobs/{job['job_id']}/download", headers=h)
+    assert r.status_code == 200
+    assert len(_rows(r.content)) == 3
+
+    # Past the retention period the file is purged and the download is gone.
+    from zenith_api.tasks.exports import purge_old_exports
+
+    export = tmp_path / job["result"]["file"]
+    running = tmp_path / f"{uuid.uuid4()}.partial"
+    running.write_text("test_id\n")
+    other = tmp_path / "notes.txt"
+    other.write_text("keep")
+    stale = time.time() - settings.export_retention_hours * 3600 - 60
+    os.utime(export, (stale, stale))
+    os.utime(other, (stale, stale))
+    assert purge_old_exports() == 1
+    assert not export.exists()
+    assert running.exists() and other.exists()
+    r = client.get(f"/orgs/{org_id}/jobs/{job['job_id']}/download", headers=h)
+    assert r.status_code == 410
@@ -8,3 +8,34 @@ def test_health() -> None:
     r = client.get("/health")
     assert r.status_code == 200
     assert r.json() == {"status": "ok"}
+
+
+def test_health_answer_store() -> None:
+    client = TestClient(app)
+    r = client.get("/health/answer-store")
+    assert r.status_code == 200
+    assert r.json()["mode"] in {"postgres", "redis"}
+
+
+def test_health_db_reports_pools() -> None:
+    client = TestClient(app)
+    r = client.get("/health/db")
+    assert r.status_code == 200
+    pools = r.json()["pools"]
+    assert pools["sync"]["checkouts"] >= 1
+    assert {"checked_out", "overflow", "wait_avg_ms", "timeouts"} <= pools["async"].keys()
+
+
+def test_metrics_exposes_routes_pools_and_caches() -> None:
+    client = TestClient(app)
+    client.get("/health/db")
+    client.get("/no-such-route")
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert 'zenith_http_request_duration_seconds_count{method="GET",route="/health/db"}' in body
+    assert 'zenith_http_requests_total{method="GET",route="unmatched",status="404"}' in body
+    assert 'zenith_db_pool_checkouts_total{outcome="ok",pool="sync"}' in body
+    assert "zenith_http_requests_in_flight" in body
+    assert "# TYPE zenith_password_hash_pending gauge" in body
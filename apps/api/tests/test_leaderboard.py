@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import RedisError
+from sqlalchemy import select
+
+from zenith_api.assessment.leaderboard import board_key
+from zenith_api.config import settings
+from zenith_api.db.models import QuestionOption
+from zenith_api.db.session import SessionLocal
+from zenith_api.main import app
+from zenith_api.redis_client import get_redis
+
+client = TestClient(app)
+
+
+def _auth(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_leaderboards_follow_submits_and_survive_cache_loss() -> None:
+    try:
+        get_redis().ping()
+    except RedisError:
+        pytest.skip("needs Redis")
+
+    admin = client.post(
+        "/auth/register",
+        json={"email": f"admin-{uuid.uuid4().hex}@example.com", "password": "Password123!"},
+    ).json()
+    h = _auth(admin["access_token"])
+    org_id = client.post("/orgs", json={"name": f"Org {uuid.uuid4().hex}"}, headers=h).json()[
+        "organization_id"
+    ]
+    batch_id = client.post(f"/orgs/{org_id}/batches", json={"name": "Batch"}, headers=h).json()[
+        "batch_id"
+    ]
+    test_id = client.post(
+        f"/orgs/{org_id}/tests", json={"batch_id": batch_id, "title": "Mock"}, headers=h
+    ).json()["test_id"]
+    questions = [
+        client.post(
+            f"/orgs/{org_id}/tests/{test_id}/questions",
+            json={
+                "prompt": f"Q{pos}",
+                "position": pos,
+                "options": [{"text": "A", "position": 1}, {"text": "B", "position": 2}],
+                "correct_position": 1,
+            },
+            headers=h,
+        ).json()["question_id"]
+        for pos in (1, 2)
+    ]
+    with SessionLocal() as db:
+        right = dict(
+            db.execute(
+                select(QuestionOption.question_id, QuestionOption.id).where(
+                    QuestionOption.question_id.in_([uuid.UUID(q) for q in questions]),
+                    QuestionOption.position == 1,
+                )
+            ).tuples().all()
+        )
+
+    def submit(n_right: int) -> dict[str, str]:
+        email = f"student-{uuid.uuid4().hex}@example.com"
+        client.post(
+            f"/orgs/{org_id}/members",
+            json={"email": email, "role": "student", "password": "Password123!"},
+            headers=h,
+        )
+        client.post(f"/orgs/{org_id}/batches/{batch_id}/members", json={"email": email}, headers=h)
+        sh = _auth(
+            client.post("/auth/login", json={"email": email, "password": "Password123!"}).json()[
+                "access_token"
+            ]
+        )
+        attempt_id = client.post(
+            f"/orgs/{org_id}/tests/{test_id}/attempts/start", headers=sh
+        ).json()["attempt_id"]
+        answers = [
+            {"question_id": q, "selected_option_id": str(right[uuid.UUID(q)])}
+            for q in questions[:n_right]
+        ]
+        client.put(
+            f"/orgs/{org_id}/attempts/{attempt_id}/answers", json={"answers": answers}, headers=sh
+        )
+        r = client.post(f"/orgs/{org_id}/attempts/{attempt_id}/submit", headers=sh)
+        assert r.json()["score"] == n_right
+        return sh
+
+    top_url = f"/orgs/{org_id}/tests/{test_id}/leaderboard"
+    first = submit(2)
+    # No board yet: the first read builds it from Postgres.
+    r = client.get(top_url, headers=first)
+    assert r.status_code == 200, r.text
+    assert r.json()["size"] == 1
+
+    # Later submits go straight into the sorted sets.
+    second = submit(1)
+    submit(2)
+    body = client.get(top_url, headers=h).json()
+    assert body["size"] == 3
+    assert [(e["score"], e["rank"]) for e in body["entries"]] == [(2, 1), (2, 1), (1, 3)]
+
+    me = client.get(f"{top_url}/me", params={"around": 1}, headers=second).json()
+    assert (me["me"]["rank"], me["size"]) == (3, 3)
+    assert [e["rank"] for e in me["neighbours"]] == [1, 3]
+
+    # Cache loss: both boards are rebuilt on the next read.
+    get_redis().delete(
+        board_key("test", uuid.UUID(test_id)), board_key("batch", uuid.UUID(batch_id))
+    )
+    batch_url = f"/orgs/{org_id}/batches/{batch_id}/leaderboard"
+    body = client.get(batch_url, headers=h).json()
+    assert [e["score"] for e in body["entries"]] == [2, 2, 1]
+    me = client.get(f"{batch_url}/me", headers=second).json()
+    assert me["me"]["rank"] == 3
+
+    outsider = client.post(
+        "/auth/register",
+        json={"email": f"outsider-{uuid.uuid4().hex}@example.com", "password": "Password123!"},
+    ).json()
+    r = client.get(top_url, headers=_auth(outsider["access_token"]))
+    assert r.status_code == 404
+
+    # Boards in use don't expire: reads and submits push the expiry back.
+    key = board_key("test", uuid.UUID(test_id))
+    for touch in (
+        lambda: client.get(top_url, headers=h),
+        lambda: client.get(f"{top_url}/me", headers=second),
+        lambda: submit(1),
+    ):
+        get_redis().expire(key, 5)
+        touch()
+        assert get_redis().ttl(key) > settings.leaderboard_ttl_seconds - 60
@@ -2,9 +2,15 @@ from __future__ import annotations
 
 import uuid
 
+import pytest
 from fastapi.testclient import TestClient
+from redis.exceptions import RedisError
 
+from zenith_api.config import settings
 from zenith_api.main import app
+from zenith_api.redis_client import get_redis
+from zenith_api.tasks import enrollment as enrollment_tasks
+from zenith_api.worker import celery_app
 
 client = TestClient(app)
 
@@ -52,3 +58,207 @@ def test_org_create_add_member_and_me() -> None:
     )
     assert r3.status_code == 200, r3.text
     assert r3.json()["role"] == "teacher"
+
+
+def test_role_change_is_visible_immediately() -> None:
+    tokens = _register(f"admin-{uuid.uuid4().hex}@example.com")
+    h = {"Authorization": f"Bearer {tokens['access_token']}"}
+    org_id = client.post("/orgs", json={"name": f"Org {uuid.uuid4().hex}"}, headers=h).json()[
+        "organization_id"
+    ]
+
+    email = f"member-{uuid.uuid4().hex}@example.com"
+    client.post(
+        f"/orgs/{org_id}/members",
+        json={"email": email, "role": "teacher", "password": "Password123!"},
+        headers=h,
+    )
+    member = client.post("/auth/login", json={"email": email, "password": "Password123!"}).json()
+    mh = {"Authorization": f"Bearer {member['access_token']}"}
+
+    # Warm the membership cache, then demote.
+    assert client.get(f"/orgs/{org_id}/me", headers=mh).json()["role"] == "teacher"
+    r = client.post(f"/orgs/{org_id}/members", json={"email": email, "role": "student"}, headers=h)
+    assert r.status_code == 200, r.text
+
+    assert client.get(f"/orgs/{org_id}/me", headers=mh).json()["role"] == "student"
+    r = client.post(f"/orgs/{org_id}/batches", json={"name": "Nope"}, headers=mh)
+    assert r.status_code == 403
+
+
+def test_role_change_in_another_worker_expires_locally(monkeypatch: pytest.MonkeyPatch) -> None:
+    from sqlalchemy import select, update
+
+    from zenith_api import cache
+    from zenith_api.auth.rbac import get_org_role
+    from zenith_api.db.models import Membership, Role
+    from zenith_api.db.session import SessionLocal
+
+    # Only the in-process tier: the demoting worker would have cleared the Redis copy.
+    monkeypatch.setattr(settings, "redis_cache_enabled", False)
+    tokens = _register(f"admin-{uuid.uuid4().hex}@example.com")
+    h = {"Authorization": f"Bearer {tokens['access_token']}"}
+    org_id = uuid.UUID(
+        client.post("/orgs", json={"name": f"Org {uuid.uuid4().hex}"}, headers=h).json()[
+            "organization_id"
+        ]
+    )
+    user_id = uuid.UUID(client.get(f"/orgs/{org_id}/me", headers=h).json()["user_id"])
+
+    with SessionLocal() as db:
+        assert get_org_role(db, org_id, user_id) == "admin"
+        # Another worker demotes the user: this process's cache is not told.
+        student = db.scalar(select(Role.id).where(Role.code == "student"))
+        db.execute(
+            update(Membership)
+            .where(Membership.organization_id == org_id, Membership.user_id == user_id)
+            .values(role_id=student)
+        )
+        db.commit()
+        assert get_org_role(db, org_id, user_id) == "admin"
+
+        now = cache.time.monotonic()
+        monkeypatch.setattr(
+            cache.time, "monotonic", lambda: now + settings.membership_local_ttl_seconds + 1
+        )
+        assert get_org_role(db, org_id, user_id) == "student"
+
+
+def _org_with_batch() -> tuple[str, str, dict[str, str]]:
+    tokens = _register(f"admin-{uuid.uuid4().hex}@example.com")
+    h = {"Authorization": f"Bearer {tokens['access_token']}"}
+    org_id = client.post("/orgs", json={"name": f"Org {uuid.uuid4().hex}"}, headers=h).json()[
+        "organization_id"
+    ]
+    batch_id = client.post(f"/orgs/{org_id}/batches", json={"name": "NEET 2027"}, headers=h).json()[
+        "batch_id"
+    ]
+    return org_id, batch_id, h
+
+
+def test_bulk_enrollment_inline() -> None:
+    org_id, batch_id, h = _org_with_batch()
+    existing = f"existing-{uuid.uuid4().hex}@example.com"
+    _register(existing)
+    new = f"new-{uuid.uuid4().hex}@example.com"
+
+    r = client.post(
+        f"/orgs/{org_id}/enrollments",
+        json={
+            "batch_id": batch_id,
+            "members": [
+                {"email": existing},
+                {"email": new, "password": "Password123!"},
+                {"email": f"nopw-{uuid.uuid4().hex}@example.com"},
+                {"email": new, "password": "Password123!"},
+            ],
+        },
+        headers=h,
+    )
+    assert r.status_code == 200, r.text
+    job = r.json()
+    assert job["status"] == "succeeded"
+    assert job["processed"] == job["total"] == 4
+    result = job["result"]
+    assert result["created_users"] == 1
+    assert result["added_members"] == 2
+    assert result["added_to_batch"] == 2
+    assert sorted((e["row"], e["msg"]) for e in result["errors"]) == [
+        (3, "Password required when creating a new user"),
+        (4, "Duplicate email"),
+    ]
+
+    student = client.post("/auth/login", json={"email": new, "password": "Password123!"}).json()
+    sh = {"Authorization": f"Bearer {student['access_token']}"}
+    assert client.get(f"/orgs/{org_id}/me", headers=sh).json()["role"] == "student"
+
+
+def test_bulk_enrollment_csv_runs_as_job(monkeypatch: pytest.MonkeyPatch) -> None:
+    try:
+        get_redis().ping()
+    except RedisError:
+        pytest.skip("needs Redis")
+    monkeypatch.setattr(settings, "enrollment_inline_max_rows", 0)
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    sent: list[tuple[object, ...]] = []
+    staged_ttls: list[int] = []
+    delay = enrollment_tasks.enroll_members.delay
+
+    def record(*args: object) -> object:
+        sent.append(args)
+        staged_ttls.append(get_redis().ttl(f"enrollment:rows:{args[0]}"))
+        return delay(*args)
+
+    monkeypatch.setattr(enrollment_tasks.enroll_members, "delay", record)
+    org_id, batch_id, h = _org_with_batch()
+
+    emails = [f"csv-{uuid.uuid4().hex}@example.com" for _ in range(3)]
+    body = "email,password\n" + "".join(f"{e},Password123!\n" for e in emails)
+    r = client.post(
+        f"/orgs/{org_id}/enrollments/csv",
+        files={"file": ("students.csv", body.encode())},
+        data={"batch_id": batch_id},
+        headers=h,
+    )
+    assert r.status_code == 202, r.text
+    job_id = r.json()["job_id"]
+
+    r = client.get(f"/orgs/{org_id}/jobs/{job_id}", headers=h)
+    assert r.status_code == 200, r.text
+    assert r.json()["status"] == "succeeded"
+    assert r.json()["result"]["added_to_batch"] == 3
+    # Passwords wait in an expiring Redis key, never go through the broker, and the key
+    # is gone once the job has run.
+    assert sent
+    assert "Password123!" not in repr(sent)
+    assert 0 < staged_ttls[0] <= settings.enrollment_staging_ttl_seconds
+    assert not get_redis().exists(f"enrollment:rows:{job_id}")
+
+    # A job whose upload expired before a worker got to it fails instead of hanging.
+    from zenith_api.db.session import SessionLocal
+    from zenith_api.jobs import create_job
+
+    with SessionLocal() as db:
+        orphan = create_job(
+            db, organization_id=uuid.UUID(org_id), kind="enrollment", total=1, created_by=None
+        )
+    with pytest.raises(LookupError):
+        enrollment_tasks.enroll_members(str(orphan.id), org_id, None, "student")
+    r = client.get(f"/orgs/{org_id}/jobs/{orphan.id}", headers=h)
+    assert r.json()["status"] == "failed"
+
+    r = client.post(
+        f"/orgs/{org_id}/enrollments/csv",
+        files={"file": ("students.csv", b"email,password\nnot-an-email,\n")},
+        headers=h,
+    )
+    assert r.status_code == 422
+    assert r.json()["detail"]["errors"][0]["row"] == 2
+
+
+def test_list_batches_and_tests_paginate() -> None:
+    org_id, batch_id, h = _org_with_batch()
+    for name in ("A", "B", "C"):
+        client.post(f"/orgs/{org_id}/batches", json={"name": name}, headers=h)
+    for i in range(5):
+        client.post(
+            f"/orgs/{org_id}/tests", json={"batch_id": batch_id, "title": f"T{i}"}, headers=h
+        )
+
+    def walk(path: str, key: str) -> list[str]:
+        seen: list[str] = []
+        cursor = None
+        while True:
+            params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+            page = client.get(path, params=params, headers=h).json()
+            assert len(page["items"]) <= 2
+            seen += [item[key] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return seen
+
+    assert walk(f"/orgs/{org_id}/batches", "name") == ["A", "B", "C", "NEET 2027"]
+    assert walk(f"/orgs/{org_id}/tests", "title") == ["T4", "T3", "T2", "T1", "T0"]
+
+    r = client.get(f"/orgs/{org_id}/tests", params={"cursor": "garbage"}, headers=h)
+    assert r.status_code == 400
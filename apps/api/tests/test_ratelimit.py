@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from zenith_api import ratelimit
+from zenith_api.config import RateLimit, settings
+from zenith_api.main import app
+
+
+def test_login_is_limited_per_ip(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(settings.rate_limits, "auth.login", RateLimit(limit=2, period_seconds=60))
+    # A fresh address per run, so buckets left in Redis by earlier runs don't interfere.
+    client = TestClient(app, client=(f"client-{uuid.uuid4().hex}", 1))
+    other = TestClient(app, client=(f"client-{uuid.uuid4().hex}", 1))
+    body = {"email": f"nobody-{uuid.uuid4().hex}@example.com", "password": "Password123!"}
+
+    assert client.post("/auth/login", json=body).status_code == 401
+    assert client.post("/auth/login", json=body).status_code == 401
+    r = client.post("/auth/login", json=body)
+    assert r.status_code == 429
+    assert 1 <= int(r.headers["Retry-After"]) <= 30
+    assert other.post("/auth/login", json=body).status_code == 401
+
+
+def test_in_process_buckets_without_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "rate_limit_redis", False)
+    monkeypatch.setitem(settings.rate_limits, "test", RateLimit(limit=3, period_seconds=3))
+    subject = f"user:{uuid.uuid4()}"
+
+    async def burst() -> list[float]:
+        return [await ratelimit.take("test", subject) for _ in range(4)]
+
+    waits = asyncio.run(burst())
+    assert waits[:3] == [0, 0, 0]
+    # One token comes back every second.
+    assert 0 < waits[3] <= 1
+
+
+def test_outsiders_cannot_drain_an_orgs_bucket(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(settings.rate_limits, "org.bulk", RateLimit(limit=1, period_seconds=60))
+    client = TestClient(app)
+
+    def register() -> dict[str, str]:
+        body = {"email": f"user-{uuid.uuid4().hex}@example.com", "password": "Password123!"}
+        token = client.post("/auth/register", json=body).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    admin, outsider = register(), register()
+    org_id = client.post("/orgs", json={"name": f"Org {uuid.uuid4().hex}"}, headers=admin).json()[
+        "organization_id"
+    ]
+    body = {"members": [{"email": f"s-{uuid.uuid4().hex}@example.com", "password": "Password123!"}]}
+
+    for _ in range(3):
+        r = client.post(f"/orgs/{org_id}/enrollments", json=body, headers=outsider)
+        assert r.status_code == 404
+    assert client.post(f"/orgs/{org_id}/enrollments", json=body, headers=admin).status_code == 200
+    assert client.post(f"/orgs/{org_id}/enrollments", json=body, headers=admin).status_code == 429
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from zenith_api.db import replica
+from zenith_api.db.session import SessionLocal, engine
+
+
+def test_recent_writer_reads_from_primary(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Point the "replica" at the primary; only the routing decision matters here.
+    monkeypatch.setattr(replica, "read_engine", engine)
+    monkeypatch.setattr(replica, "ReadSessionLocal", SessionLocal)
+    monkeypatch.setattr(replica, "_lag", None)
+    monkeypatch.setattr(replica, "_lag_checked_at", 0.0)
+
+    reader, writer = uuid.uuid4(), uuid.uuid4()
+    replica.note_write(writer)
+
+    assert replica.replica_lag() == 0
+    assert replica._use_replica(reader)
+    assert not replica._use_replica(writer)